@@ -5,6 +5,7 @@ from api.models import (
     DeviceModels, DeviceSystems, DeviceProcessors, DeviceBuilds, DeviceRAMs,
     DeviceDisks, Softwares, Devices, DeviceSoftwares, NotificationTypes, Notifications
 )
+from api.services.fulltext import DeviceSearchIndex
 
 
 class UserExtendedFilter(django_filters.FilterSet):
@@ -220,10 +221,19 @@ class DevicesFilter(django_filters.FilterSet):
     """
     Filter set for devices data.
     """
+    q = django_filters.CharFilter(method='filter_search')
+
+    def filter_search(self, queryset, name, value):
+        """
+        Full-text search over the inventory fields and related titles, ranked
+        unless an explicit ordering was requested.
+        """
+        return DeviceSearchIndex.search(queryset, value, ranked='ordering' not in self.data)
+
     class Meta:
         model = Devices
         fields = [
-            'id', 'internal_id', 'location', 'type', 'mark',
+            'id', 'internal_id', 'status', 'location', 'type', 'mark',
             'model', 'hostname', 'system', 'build', 'processor',
             'ram', 'disk', 'disk_internal_id', 'disk_serial',
             'network_ipv4', 'network_ipv6', 'network_mac',
@@ -0,0 +1,86 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import RotatedRefreshTokens
+
+
+class Command(BaseCommand):
+    """
+    Deletes the rotated refresh tokens that have expired, in short batches
+    that each commit on their own, so no lock is held for long. Progress is
+    the deletion itself: an interrupted run is resumed by running it again.
+    """
+    help = 'Prune expired refresh token rotation entries.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows deleted per statement.'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0,
+            help='Seconds to wait between batches.'
+        )
+        parser.add_argument(
+            '--legacy',
+            action='store_true',
+            help='Also prune the expired rows of the token_blacklist tables.'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        total = self.prune(
+            RotatedRefreshTokens.objects.filter(expires_at__lte=now),
+            options['batch_size'],
+            options['pause']
+        )
+        self.stdout.write(self.style.SUCCESS(f'Pruned {total} rotated refresh tokens.'))
+
+        if options['legacy'] and 'rest_framework_simplejwt.token_blacklist' in settings.INSTALLED_APPS:
+            from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+            total = self.prune(
+                OutstandingToken.objects.filter(expires_at__lte=now),
+                options['batch_size'],
+                options['pause'],
+                dependents=[(BlacklistedToken, 'token_id')]
+            )
+            self.stdout.write(self.style.SUCCESS(f'Pruned {total} outstanding tokens.'))
+
+    def prune(self, queryset, batch_size, pause, dependents=()) -> int:
+        """
+        Deletes the rows of `queryset` oldest first, `batch_size` at a time,
+        with plain DELETE statements (the dependent rows of `dependents`,
+        given as (model, column), go first).
+        """
+        model = queryset.model
+        pks = queryset.order_by('expires_at').values_list('pk', flat=True)
+        total = 0
+        while True:
+            batch = list(pks[:batch_size])
+            if not batch:
+                return total
+            placeholders = ', '.join(['%s'] * len(batch))
+            with transaction.atomic(), connection.cursor() as cursor:
+                for dependent, column in dependents:
+                    cursor.execute(
+                        f'DELETE FROM {connection.ops.quote_name(dependent._meta.db_table)} '
+                        f'WHERE {connection.ops.quote_name(column)} IN ({placeholders})',
+                        batch
+                    )
+                cursor.execute(
+                    f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)} '
+                    f'WHERE {connection.ops.quote_name(model._meta.pk.column)} IN ({placeholders})',
+                    batch
+                )
+            total += len(batch)
+            if pause:
+                time.sleep(pause)
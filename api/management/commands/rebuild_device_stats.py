@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.models import DeviceStats
+
+
+class Command(BaseCommand):
+    """
+    Re-derives the dashboard device counts (DeviceStats) from the devices.
+    """
+    help = 'Rebuild the device stats summary table.'
+
+    def handle(self, *args, **options):
+        total = DeviceStats.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} device stats groups.'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from api.models import Devices
+from api.services.fulltext import DeviceSearchIndex
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the devices full-text index from scratch, in id batches.
+    """
+    help = 'Rebuild the devices full-text search index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DeviceSearchIndex.REBUILD_BATCH_SIZE,
+            help='Devices indexed per statement.'
+        )
+
+    def handle(self, *args, **options):
+        total = DeviceSearchIndex.rebuild(Devices.objects.all(), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} devices.'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.models import Locations, LocationZones
+
+
+class Command(BaseCommand):
+    """
+    Re-derives the persisted relationship counters in bulk to fix drift.
+    """
+    help = 'Recount Locations.devices_count and LocationZones.locations_count.'
+
+    def handle(self, *args, **options):
+        locations = Locations.recount_devices()
+        zones = LocationZones.recount_locations()
+        self.stdout.write(self.style.SUCCESS(
+            f'Recounted devices for {locations} locations and locations for {zones} location zones.'
+        ))
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+from api.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('api', '0012_devices_softwares'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='devices',
+            index=models.Index(fields=['internal_id'], name='api_dev_internal_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='devices',
+            index=models.Index(fields=['hostname'], name='api_dev_hostname_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='devices',
+            index=models.Index(fields=['serial'], name='api_dev_serial_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='devices',
+            index=models.Index(fields=['network_mac'], name='api_dev_network_mac_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='devices',
+            index=models.Index(fields=['network_ipv4'], name='api_dev_network_ipv4_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='devices',
+            index=models.Index(fields=['disk_serial'], name='api_dev_disk_serial_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='devices',
+            index=models.Index(fields=['remote_id'], name='api_dev_remote_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='devices',
+            index=models.Index(fields=['status'], name='api_dev_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='devices',
+            index=models.Index(fields=['location', 'status'], name='api_dev_location_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='devices',
+            index=models.Index(fields=['type', 'status'], name='api_dev_type_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='devices',
+            index=models.Index(fields=['created_at', 'id'], name='api_dev_created_at_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='notifications',
+            index=models.Index(fields=['created_at', 'id'], name='api_notif_created_at_id_idx'),
+        ),
+    ]
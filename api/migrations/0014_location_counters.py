@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-17 22:35
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Devices = apps.get_model('api', 'Devices')
+    Locations = apps.get_model('api', 'Locations')
+    LocationZones = apps.get_model('api', 'LocationZones')
+    devices = (
+        Devices.objects.filter(location=OuterRef('pk'))
+        .order_by().values('location').annotate(total=Count('id')).values('total')
+    )
+    Locations.objects.update(devices_count=Coalesce(Subquery(devices), 0))
+    locations = (
+        Locations.objects.filter(location_zone=OuterRef('pk'))
+        .order_by().values('location_zone').annotate(total=Count('id')).values('total')
+    )
+    LocationZones.objects.update(locations_count=Coalesce(Subquery(locations), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_devices_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='locations',
+            name='devices_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='locationzones',
+            name='locations_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
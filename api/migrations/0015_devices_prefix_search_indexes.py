@@ -0,0 +1,18 @@
+from django.db import migrations
+
+from api.operations import AddPrefixSearchIndex
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on PostgreSQL
+    atomic = False
+
+    dependencies = [
+        ('api', '0014_location_counters'),
+    ]
+
+    operations = [
+        AddPrefixSearchIndex(model_name='devices', field='internal_id', name='api_dev_internal_id_pfx_idx'),
+        AddPrefixSearchIndex(model_name='devices', field='hostname', name='api_dev_hostname_pfx_idx'),
+        AddPrefixSearchIndex(model_name='devices', field='serial', name='api_dev_serial_pfx_idx'),
+    ]
@@ -0,0 +1,91 @@
+from django.db import migrations
+from django.db.models import F, Func, TextField, Value
+from django.db.models.functions import Coalesce
+
+
+# Snapshot of the index layout at this migration, kept apart from
+# api.services.fulltext so later changes there do not rewrite history
+POSTGRESQL_TABLE = 'api_devices_search'
+SQLITE_TABLE = 'api_devices_fts'
+TS_CONFIG = 'simple'
+DOCUMENT_FIELDS = (
+    'hostname', 'internal_id', 'serial', 'disk_serial', 'network_mac',
+    'network_ipv4', 'user_owner', 'sector', 'notes',
+    'type__title', 'mark__title', 'model__title', 'system__title',
+    'build__title', 'processor__title', 'ram__title', 'disk__title',
+    'location__title',
+)
+BATCH_SIZE = 5000
+
+
+def document_expression():
+    return Func(
+        *[Coalesce(F(name), Value(''), output_field=TextField()) for name in DOCUMENT_FIELDS],
+        template='(%(expressions)s)',
+        arg_joiner=" || ' ' || ",
+        output_field=TextField()
+    )
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE TABLE {POSTGRESQL_TABLE} ('
+            f'device_id integer PRIMARY KEY REFERENCES api_devices (id) '
+            f'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+            f'document tsvector NOT NULL)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX {POSTGRESQL_TABLE}_document_idx '
+            f'ON {POSTGRESQL_TABLE} USING GIN (document)'
+        )
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {SQLITE_TABLE} "
+            f"USING fts5(document, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    else:
+        return
+
+    Devices = apps.get_model('api', 'Devices')
+    devices = Devices.objects.using(connection.alias).order_by('id')
+    ids = list(devices.values_list('id', flat=True))
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start:start + BATCH_SIZE]
+        documents = devices.filter(id__gte=batch[0], id__lte=batch[-1]).order_by().annotate(
+            search_document=document_expression()
+        ).values_list('id', 'search_document')
+        sql, params = documents.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    f'INSERT INTO {POSTGRESQL_TABLE} (device_id, document) '
+                    f'SELECT source.id, to_tsvector(%s, source.search_document) FROM ({sql}) AS source',
+                    (TS_CONFIG, *params)
+                )
+            else:
+                cursor.execute(
+                    f'INSERT INTO {SQLITE_TABLE} (rowid, document) '
+                    f'SELECT source.id, source.search_document FROM ({sql}) AS source',
+                    params
+                )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {POSTGRESQL_TABLE}')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SQLITE_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_devices_prefix_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-17 23:31
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_device_stats(apps, schema_editor):
+    Devices = apps.get_model('api', 'Devices')
+    DeviceStats = apps.get_model('api', 'DeviceStats')
+    lookups = {
+        'status': 'status',
+        'type': 'type_id',
+        'location_zone': 'location__location_zone_id',
+        'system': 'system_id',
+    }
+    rows = []
+    for dimension, lookup in lookups.items():
+        groups = Devices.objects.order_by().values_list(lookup).annotate(total=Count('id'))
+        rows.extend(
+            DeviceStats(dimension=dimension, value=value, devices_count=total)
+            for value, total in groups if value is not None
+        )
+    DeviceStats.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_devices_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceStats',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('dimension', models.CharField(max_length=20)),
+                ('value', models.IntegerField()),
+                ('devices_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'api_device_stats',
+                'managed': True,
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'value'), name='api_device_stats_dim_value_uniq')],
+            },
+        ),
+        migrations.RunPython(populate_device_stats, migrations.RunPython.noop),
+    ]
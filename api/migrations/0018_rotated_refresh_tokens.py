@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 00:00
+
+import hashlib
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def copy_blacklisted_tokens(apps, schema_editor):
+    """
+    Carries the still valid blacklisted tokens over, so a token rotated
+    before this migration stays unusable.
+    """
+    BlacklistedToken = apps.get_model('token_blacklist', 'BlacklistedToken')
+    RotatedRefreshTokens = apps.get_model('api', 'RotatedRefreshTokens')
+    blacklisted = BlacklistedToken.objects.filter(
+        token__expires_at__gt=timezone.now()
+    ).values_list('token__jti', 'token__expires_at')
+    batch = []
+    for jti, expires_at in blacklisted.iterator(chunk_size=5000):
+        jti_hash = hashlib.sha256(str(jti).encode('utf-8')).hexdigest()[:32]
+        batch.append(RotatedRefreshTokens(jti_hash=jti_hash, expires_at=expires_at))
+        if len(batch) == 5000:
+            RotatedRefreshTokens.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    RotatedRefreshTokens.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_device_stats'),
+        ('token_blacklist', '0013_alter_blacklistedtoken_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RotatedRefreshTokens',
+            fields=[
+                ('jti_hash', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'db_table': 'api_rotated_refresh_tokens',
+                'managed': True,
+            },
+        ),
+        migrations.RunPython(copy_blacklisted_tokens, migrations.RunPython.noop),
+    ]
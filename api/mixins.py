@@ -0,0 +1,502 @@
+import hashlib
+
+from django.contrib.auth.models import User
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Count, Max, QuerySet
+from django.db.models.functions import Coalesce
+from django.http import Http404
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from api.models import UserProfile
+from api.services.cache import CacheService
+from api.services.catalog import CatalogCache
+from api.services.users import UserReferences
+
+
+class EagerLoadingMixin:
+    """
+    Serializer mixin that plans the related rows a serializer reads.
+
+    `select_related_fields` maps a serializer field name to the relation paths
+    it touches, so the read path loads every relation in a fixed number of
+    queries instead of one query per row and relation. Many-valued relations
+    go in `prefetch_related_fields` the same way.
+    """
+    select_related_fields = {}
+    prefetch_related_fields = {}
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None):
+        """
+        Applies select_related() and prefetch_related() for the given serializer
+        fields (all of them when None).
+        """
+        select_paths = cls._relation_paths(cls.select_related_fields, fields)
+        if select_paths:
+            queryset = queryset.select_related(*select_paths)
+        prefetch_paths = cls._relation_paths(cls.prefetch_related_fields, fields)
+        if prefetch_paths:
+            queryset = queryset.prefetch_related(*prefetch_paths)
+        return queryset
+
+    @staticmethod
+    def _relation_paths(mapping, fields):
+        paths = []
+        for field, relations in mapping.items():
+            if fields is not None and field not in fields:
+                continue
+            for relation in relations:
+                if relation not in paths:
+                    paths.append(relation)
+        return paths
+
+
+class SparseFieldsetsMixin(EagerLoadingMixin):
+    """
+    Serializer mixin for sparse fieldsets on read requests.
+
+    `?fields=a,b` keeps only the listed fields and `?exclude=a,b` drops them
+    (`fields` is applied first). The same selection narrows the queryset built
+    by `setup_sparse_queryset()`: relations behind unrequested fields are not
+    joined and unrequested columns are deferred. Unknown names are ignored and
+    `required_fields` are always returned.
+    """
+    fields_query_param = 'fields'
+    exclude_query_param = 'exclude'
+    required_fields = ('id',)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.get_sparse_fields(self.context.get('request'))
+        if selected is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in selected}
+
+    @classmethod
+    def get_sparse_fields(cls, request):
+        """
+        Returns the set of serializer field names selected by the request, or None
+        when every field is wanted.
+        """
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        params = getattr(request, 'query_params', request.GET)
+        include = cls._split_names(params.get(cls.fields_query_param))
+        exclude = cls._split_names(params.get(cls.exclude_query_param))
+        if not include and not exclude:
+            return None
+        selected = set(cls.Meta.fields)
+        if include:
+            selected &= include
+        selected -= exclude
+        return selected | set(cls.required_fields)
+
+    @classmethod
+    def setup_sparse_queryset(cls, queryset, request):
+        """
+        Applies eager loading for the selected fields and defers every other column.
+        """
+        selected = cls.get_sparse_fields(request)
+        queryset = cls.setup_eager_loading(queryset, cls.get_eager_fields(request, selected))
+        if selected is None:
+            return queryset
+        return queryset.only(*cls.get_sparse_columns(queryset.model, selected))
+
+    @classmethod
+    def get_eager_fields(cls, request, selected):
+        """
+        Serializer fields whose relations are eager loaded (all of them when None).
+        """
+        return selected
+
+    @classmethod
+    def get_sparse_columns(cls, model, selected):
+        """
+        Model fields to load for the selected serializer fields. Relations joined
+        for a field are kept so select_related() can follow them.
+        """
+        columns = [model._meta.pk.name]
+        for name in sorted(selected):
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                field = None
+            if field is not None and field.concrete and name not in columns:
+                columns.append(name)
+            for relation in cls.select_related_fields.get(name, ()):
+                relation = relation.split('__')[0]
+                if relation not in columns:
+                    columns.append(relation)
+        return columns
+
+    @staticmethod
+    def _split_names(value):
+        if not value:
+            return set()
+        return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SideloadMixin:
+    """
+    Serializer mixin for normalized list payloads.
+
+    With `?sideload=true` on a read request every field in `sideload_fields` is
+    rendered as the related primary key, and `get_included()` returns each
+    related object once per page, rendered by the field's `get_<name>` method.
+    """
+    sideload_query_param = 'sideload'
+    sideload_fields = ()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_sideloading(self.context.get('request')):
+            return fields
+        for name in self.sideload_fields:
+            if name in fields:
+                fields[name] = serializers.IntegerField(source=f'{name}_id', read_only=True)
+        return fields
+
+    @classmethod
+    def is_sideloading(cls, request):
+        if request is None or request.method not in SAFE_METHODS:
+            return False
+        params = getattr(request, 'query_params', request.GET)
+        return params.get(cls.sideload_query_param, '').lower() in ('1', 'true', 'yes')
+
+    def get_included(self, instances):
+        """
+        Returns {field: {id: object}} with the related objects of `instances`,
+        deduplicated, for the sideloaded fields this serializer renders.
+        """
+        included = {}
+        for name in self.sideload_fields:
+            if name not in self.fields:
+                continue
+            objects = included.setdefault(name, {})
+            render = getattr(self, f'get_{name}')
+            for instance in instances:
+                pk = getattr(instance, f'{name}_id')
+                if pk is not None and str(pk) not in objects:
+                    objects[str(pk)] = render(instance)
+        return included
+
+
+class UserReferenceField(serializers.Field):
+    """
+    Read-only compact user reference ({id, username, display_name, avatar}),
+    declared with the foreign key column as source.
+
+    The first reference rendered loads the users of every row of the page in
+    one query; the results are memoized on the request, so each user is read
+    once per request however many rows and fields point to it.
+    """
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        memo = UserReferences.get_memo(request if request is not None else self.root)
+        if value not in memo:
+            UserReferences.load(memo, {value} | self.get_page_user_ids())
+        return memo[value]
+
+    def get_page_user_ids(self) -> set:
+        """
+        Returns the users referenced by the rows rendered along with this one.
+        """
+        page = self.parent.parent if self.parent is not None else None
+        if not isinstance(page, serializers.ListSerializer):
+            return set()
+        rows = page.instance
+        # A list or the already evaluated queryset; a manager would query again
+        if not isinstance(rows, (list, tuple, QuerySet)):
+            return set()
+        sources = [
+            field.source for field in self.parent.fields.values()
+            if isinstance(field, UserReferenceField)
+        ]
+        return {getattr(row, source, None) for row in rows for source in sources}
+
+
+class UserReferencesMixin:
+    """
+    Serializer mixin for compact user payloads.
+
+    With `?user_refs=compact` on a read request every field in
+    `user_reference_fields` is rendered by UserReferenceField instead of the
+    nested user, and those users are not joined by the row query.
+    """
+    user_refs_query_param = 'user_refs'
+    user_reference_fields = ('creator', 'updater')
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_compact_user_refs(self.context.get('request')):
+            return fields
+        for name in self.user_reference_fields:
+            if name in fields:
+                fields[name] = UserReferenceField(source=f'{name}_id')
+        return fields
+
+    @classmethod
+    def is_compact_user_refs(cls, request):
+        if request is None or request.method not in SAFE_METHODS:
+            return False
+        params = getattr(request, 'query_params', request.GET)
+        return params.get(cls.user_refs_query_param, '').lower() == 'compact'
+
+    @classmethod
+    def get_eager_fields(cls, request, selected):
+        selected = super().get_eager_fields(request, selected)
+        if not cls.is_compact_user_refs(request):
+            return selected
+        if selected is None:
+            selected = set(cls.Meta.fields)
+        return set(selected) - set(cls.user_reference_fields)
+
+
+class CatalogUsageMixin:
+    """
+    Serializer mixin for the `devices_count` and `last_used_at` method fields of
+    catalog entries, read from CatalogCache.get_usage() once per serializer.
+    """
+    def get_usage(self, instance):
+        if not hasattr(self, '_usage'):
+            self._usage = CatalogCache.get_usage(self.Meta.model)
+        return self._usage.get(instance.pk, {})
+
+    def get_devices_count(self, instance):
+        return self.get_usage(instance).get('devices_count', 0)
+
+    def get_last_used_at(self, instance):
+        value = self.get_usage(instance).get('last_used_at')
+        return serializers.DateTimeField().to_representation(value) if value else None
+
+
+class CatalogCacheViewMixin:
+    """
+    ViewSet mixin serving list and retrieve from the catalog rows held in
+    CatalogCache.
+
+    Every row of the catalog is cached once, with the creator and updater the
+    serializer reads, versioned by the catalog and the user tables. Each
+    request paginates, checks permissions on and serializes those rows
+    itself, so there is one entry per catalog whatever the query string.
+    Requests with any parameter outside `catalog_cache_params` (filters,
+    search, ordering, count modes) read the database as usual.
+    `X-Catalog-Cache` tells whether the rows were a hit, a miss or bypassed.
+    """
+    catalog_cache_header = 'X-Catalog-Cache'
+    catalog_cache_params = ('limit', 'offset', 'fields', 'exclude', 'user_refs', 'format')
+
+    def list(self, request, *args, **kwargs):
+        rows, hit = self.get_cached_rows(request)
+        if rows is None:
+            return self.bypass_catalog_cache(super().list(request, *args, **kwargs))
+        rows = list(rows.values())
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        else:
+            response = Response(self.get_serializer(rows, many=True).data)
+        response[self.catalog_cache_header] = 'hit' if hit else 'miss'
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        rows, hit = self.get_cached_rows(request)
+        if rows is None:
+            return self.bypass_catalog_cache(super().retrieve(request, *args, **kwargs))
+        model = self.get_serializer_class().Meta.model
+        try:
+            pk = model._meta.pk.to_python(kwargs.get(self.lookup_url_kwarg or self.lookup_field))
+        except ValidationError:
+            raise Http404
+        instance = rows.get(pk)
+        if instance is None:
+            raise Http404
+        self.check_object_permissions(request, instance)
+        response = Response(self.get_serializer(instance).data)
+        response[self.catalog_cache_header] = 'hit' if hit else 'miss'
+        return response
+
+    def get_modified_summary(self, queryset):
+        parent = super()
+        if not self.is_catalog_cacheable(self.request):
+            return parent.get_modified_summary(queryset)
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        summary, hit = CatalogCache.get_or_set(
+            queryset.model,
+            ('summary', self.action, str(lookup)),
+            lambda: parent.get_modified_summary(queryset)
+        )
+        return summary
+
+    def get_etag_models(self, model):
+        models = super().get_etag_models(model)
+        return models + [item for item in CatalogCache.usage_models(model) if item not in models]
+
+    def is_catalog_cacheable(self, request):
+        return all(name in self.catalog_cache_params for name in request.query_params)
+
+    def get_cached_rows(self, request) -> tuple:
+        """
+        Returns ({pk: row}, hit) with every row of the catalog in primary key
+        order, or (None, False) when the request needs the database.
+        """
+        if not self.is_catalog_cacheable(request):
+            return None, False
+        serializer_class = self.get_serializer_class()
+        model = serializer_class.Meta.model
+        return CatalogCache.get_or_set(
+            model,
+            'rows',
+            lambda: {row.pk: row for row in serializer_class.setup_eager_loading(model.objects.order_by('pk'))},
+            depends_on=(User, UserProfile)
+        )
+
+    def bypass_catalog_cache(self, response):
+        response[self.catalog_cache_header] = 'bypass'
+        return response
+
+
+class NotModified(Exception):
+    """
+    Raised before the handler runs when the client copy is still current.
+    """
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin adding ETag and Last-Modified validators to list and
+    retrieve, answering 304 before any row is loaded.
+
+    Validators come from one aggregate over the filtered queryset (row count
+    and the latest of `etag_modified_fields`), the query parameters and the
+    write generations of the model, of the models it points to and of
+    `etag_related_models`. Those generations catch writes the aggregate
+    cannot see, such as deletions or a renamed related row.
+    If-Modified-Since is only honored on detail requests; list clients
+    should rely on the ETag.
+    """
+    etag_modified_fields = ('updated_at', 'created_at')
+    etag_related_models = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.conditional_validators = None
+        self.conditional_summary = None
+        if request.method not in ('GET', 'HEAD') or self.action not in ('list', 'retrieve'):
+            return
+        self.conditional_validators = self.get_validators(request)
+        if self.conditional_validators is not None and self.is_not_modified(request, *self.conditional_validators):
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=304)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, 'conditional_validators', None)
+        if validators is not None and response.status_code in (200, 304):
+            etag, modified = validators
+            response['ETag'] = etag
+            if modified is not None:
+                response['Last-Modified'] = http_date(modified.timestamp())
+        return response
+
+    def get_validators(self, request):
+        """
+        Returns (etag, last_modified), or None when the request has no validators
+        (e.g. a detail request for a missing row).
+        """
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        if self.action == 'retrieve':
+            lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+            try:
+                queryset = queryset.filter(**{self.lookup_field: lookup})
+            except (TypeError, ValueError, ValidationError):
+                return None
+
+        try:
+            if self.action == 'list' and not self.counts_rows(request):
+                # Cursor and estimated-count pages never scan the whole set,
+                # so they are versioned by the write generations alone
+                summary = {'count': None, 'modified': None}
+            else:
+                summary = self.get_modified_summary(queryset)
+        except (TypeError, ValueError, ValidationError):
+            return None
+        if self.action == 'retrieve' and not summary['count']:
+            return None
+        if self.action == 'list' and summary['count'] is not None:
+            # Lets the paginator reuse the row count
+            self.conditional_summary = summary
+
+        models = self.get_etag_models(queryset.model)
+        generations = CacheService.get_generations(models)
+        modified = summary.get('modified')
+        signature = hashlib.sha1(repr([
+            self.action,
+            str(self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)),
+            sorted(request.query_params.lists()),
+            request.accepted_renderer.format,
+            request.user.pk,
+            summary['count'],
+            modified.isoformat() if modified else None,
+            [generations[item] for item in models],
+        ]).encode('utf-8')).hexdigest()
+        return f'"{signature}"', modified
+
+    def counts_rows(self, request):
+        paginator = self.paginator
+        return paginator is None or getattr(paginator, 'counts_rows', lambda request: True)(request)
+
+    def get_modified_summary(self, queryset):
+        """
+        Returns {'count': ..., 'modified': ...} for the queryset in one aggregate query.
+        """
+        model = queryset.model
+        fields = [name for name in self.etag_modified_fields if self._has_field(model, name)]
+        aggregates = {'count': Count('pk')}
+        if len(fields) > 1:
+            aggregates['modified'] = Max(Coalesce(*fields))
+        elif fields:
+            aggregates['modified'] = Max(fields[0])
+        return queryset.aggregate(**aggregates)
+
+    def get_etag_models(self, model):
+        models = [model]
+        for field in model._meta.concrete_fields:
+            if field.is_relation and field.related_model not in models:
+                models.append(field.related_model)
+        for related in self.etag_related_models:
+            if related not in models:
+                models.append(related)
+        if User in models and UserProfile not in models:
+            models.append(UserProfile)
+        return models
+
+    def is_not_modified(self, request, etag, modified):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags
+        if_modified_since = request.headers.get('If-Modified-Since')
+        if self.action == 'retrieve' and if_modified_since and modified is not None:
+            since = parse_http_date_safe(if_modified_since)
+            return since is not None and int(modified.timestamp()) <= since
+        return False
+
+    @staticmethod
+    def _has_field(model, name):
+        try:
+            model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        return True
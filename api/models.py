@@ -1,8 +1,19 @@
+import hashlib
+
+from collections import Counter, defaultdict
+
 from django.contrib.auth import get_user_model
-from django.db import models
-from django.db.models.signals import post_save
+from django.db import models, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 
+from api.services.cache import CacheService
+from api.services.fulltext import DeviceSearchIndex
+from api.services.settings import SettingsCache
+from api.services.users import UserCache
+
 User = get_user_model()
 
 
@@ -41,11 +52,59 @@ def create_profile_for_user(sender, instance, created, **kwargs):
 @receiver(post_save, sender=User)
 def save_profile_for_user(sender, instance, **kwargs):
     """
-    Save the user profile when the user is saved.
+    Save the user profile when the user is saved (not for the last_login
+    stamp of a login, which leaves the profile as it is).
     """
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
     instance.profile.save()
 
 
+class TrackedFieldsMixin:
+    """
+    Remembers the stored values of `tracked_fields` so signal receivers can
+    tell what a save changed (e.g. a device moved to another location).
+    """
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_tracked_fields()
+        return instance
+
+    def remember_tracked_fields(self):
+        self._loaded_values = {
+            name: self.__dict__[name] for name in self.tracked_fields if name in self.__dict__
+        }
+
+    def get_loaded_value(self, name):
+        return getattr(self, '_loaded_values', {}).get(name)
+
+
+def save_without_counters(instance, counters, kwargs):
+    """
+    Restricts an UPDATE of `instance` to every concrete field except `counters`.
+    """
+    if instance._state.adding or kwargs.get('update_fields') is not None:
+        return
+    kwargs['update_fields'] = [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in counters
+    ]
+
+
+def adjust_counter(model, pk, field, delta):
+    """
+    Atomically adds `delta` to a counter column, never going below zero.
+    """
+    if pk is None or not delta:
+        return
+    model.objects.filter(pk=pk).update(**{field: Greatest(F(field) + delta, 0)})
+    CacheService.bump_generation(model)
+
+
 class LocationZones(models.Model):
     """
     Model for location zone data.
@@ -61,6 +120,7 @@ class LocationZones(models.Model):
     manager_phone = models.CharField(max_length=200, blank=True)
     manager_mobile = models.CharField(max_length=200, blank=True)
     sort_order = models.IntegerField(null=True, blank=True)
+    locations_count = models.PositiveIntegerField(default=0, editable=False)
     creator = models.ForeignKey(User, unique=False, on_delete=models.CASCADE, related_name='location_zones_by_creator')
     updater = models.ForeignKey(User, unique=False, on_delete=models.CASCADE, null=True, blank=True, related_name='location_zones_by_updater')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -69,15 +129,36 @@ class LocationZones(models.Model):
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # The counter is maintained with atomic UPDATEs; never write back a stale copy
+        save_without_counters(self, ['locations_count'], kwargs)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def recount_locations(cls, ids=None):
+        """
+        Re-derives locations_count with one set-based UPDATE (all zones when ids is None).
+        """
+        counts = (
+            Locations.objects.filter(location_zone=OuterRef('pk'))
+            .order_by().values('location_zone').annotate(total=Count('id')).values('total')
+        )
+        queryset = cls.objects.all() if ids is None else cls.objects.filter(pk__in=ids)
+        updated = queryset.update(locations_count=Coalesce(Subquery(counts), 0))
+        CacheService.bump_generation(cls)
+        return updated
+
     class Meta:
         managed = True
         db_table = 'api_location_zones'
 
 
-class Locations(models.Model):
+class Locations(TrackedFieldsMixin, models.Model):
     """
     Model for location data.
     """
+    tracked_fields = ('location_zone_id', 'title')
+
     id = models.AutoField(primary_key=True)
     title = models.CharField(max_length=200)
     description = models.TextField(null=True, blank=True)
@@ -103,6 +184,7 @@ class Locations(models.Model):
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
     sort_order = models.IntegerField(null=True, blank=True)
+    devices_count = models.PositiveIntegerField(default=0, editable=False)
     creator = models.ForeignKey(User, unique=False, on_delete=models.CASCADE, related_name='locations_by_creator')
     updater = models.ForeignKey(User, unique=False, on_delete=models.CASCADE, null=True, blank=True, related_name='locations_by_updater')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -111,15 +193,36 @@ class Locations(models.Model):
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # The counter is maintained with atomic UPDATEs; never write back a stale copy
+        save_without_counters(self, ['devices_count'], kwargs)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def recount_devices(cls, ids=None):
+        """
+        Re-derives devices_count with one set-based UPDATE (all locations when ids is None).
+        """
+        counts = (
+            Devices.objects.filter(location=OuterRef('pk'))
+            .order_by().values('location').annotate(total=Count('id')).values('total')
+        )
+        queryset = cls.objects.all() if ids is None else cls.objects.filter(pk__in=ids)
+        updated = queryset.update(devices_count=Coalesce(Subquery(counts), 0))
+        CacheService.bump_generation(cls)
+        return updated
+
     class Meta:
         managed = True
         db_table = 'api_locations'
 
 
-class DeviceTypes(models.Model):
+class DeviceTypes(TrackedFieldsMixin, models.Model):
     """
     Model for device types data.
     """
+    tracked_fields = ('title',)
+
     id = models.AutoField(primary_key=True)
     title = models.CharField(max_length=200)
     description = models.TextField(null=True, blank=True)
@@ -141,10 +244,12 @@ class DeviceTypes(models.Model):
         db_table = 'api_device_types'
 
 
-class DeviceMarks(models.Model):
+class DeviceMarks(TrackedFieldsMixin, models.Model):
     """
     Model for device marks data.
     """
+    tracked_fields = ('title',)
+
     id = models.AutoField(primary_key=True)
     title = models.CharField(max_length=200)
     description = models.TextField(null=True, blank=True)
@@ -166,10 +271,12 @@ class DeviceMarks(models.Model):
         db_table = 'api_device_marks'
 
 
-class DeviceModels(models.Model):
+class DeviceModels(TrackedFieldsMixin, models.Model):
     """
     Model for device models data.
     """
+    tracked_fields = ('title',)
+
     id = models.AutoField(primary_key=True)
     title = models.CharField(max_length=200)
     description = models.TextField(null=True, blank=True)
@@ -191,10 +298,12 @@ class DeviceModels(models.Model):
         db_table = 'api_device_models'
 
 
-class DeviceSystems(models.Model):
+class DeviceSystems(TrackedFieldsMixin, models.Model):
     """
     Model for device systems data.
     """
+    tracked_fields = ('title',)
+
     id = models.AutoField(primary_key=True)
     title = models.CharField(max_length=200)
     description = models.TextField(null=True, blank=True)
@@ -216,10 +325,12 @@ class DeviceSystems(models.Model):
         db_table = 'api_device_systems'
 
 
-class DeviceBuilds(models.Model):
+class DeviceBuilds(TrackedFieldsMixin, models.Model):
     """
     Model for device builds data.
     """
+    tracked_fields = ('title',)
+
     id = models.AutoField(primary_key=True)
     title = models.CharField(max_length=200)
     description = models.TextField(null=True, blank=True)
@@ -241,10 +352,12 @@ class DeviceBuilds(models.Model):
         db_table = 'api_device_builds'
 
 
-class DeviceProcessors(models.Model):
+class DeviceProcessors(TrackedFieldsMixin, models.Model):
     """
     Model for device processors data.
     """
+    tracked_fields = ('title',)
+
     id = models.AutoField(primary_key=True)
     title = models.CharField(max_length=200)
     description = models.TextField(null=True, blank=True)
@@ -266,10 +379,12 @@ class DeviceProcessors(models.Model):
         db_table = 'api_device_processors'
 
 
-class DeviceRAMs(models.Model):
+class DeviceRAMs(TrackedFieldsMixin, models.Model):
     """
     Model for device RAMs data.
     """
+    tracked_fields = ('title',)
+
     id = models.AutoField(primary_key=True)
     title = models.CharField(max_length=200)
     description = models.TextField(null=True, blank=True)
@@ -291,10 +406,12 @@ class DeviceRAMs(models.Model):
         db_table = 'api_device_rams'
 
 
-class DeviceDisks(models.Model):
+class DeviceDisks(TrackedFieldsMixin, models.Model):
     """
     Model for device disks data.
     """
+    tracked_fields = ('title',)
+
     id = models.AutoField(primary_key=True)
     title = models.CharField(max_length=200)
     description = models.TextField(null=True, blank=True)
@@ -342,10 +459,12 @@ class Softwares(models.Model):
         db_table = 'api_softwares'
 
 
-class Devices(models.Model):
+class Devices(TrackedFieldsMixin, models.Model):
     """
     Model for devices data.
     """
+    tracked_fields = ('location_id', 'status', 'type_id', 'system_id')
+
     id = models.AutoField(primary_key=True)
     internal_id = models.CharField(null=False, blank=False, max_length=200)
     status = models.PositiveIntegerField(null=False, blank=False, default=1)
@@ -382,6 +501,119 @@ class Devices(models.Model):
     class Meta:
         managed = True
         db_table = 'api_devices'
+        indexes = [
+            # Exact-match lookups exposed by DevicesFilter
+            models.Index(fields=['internal_id'], name='api_dev_internal_id_idx'),
+            models.Index(fields=['hostname'], name='api_dev_hostname_idx'),
+            models.Index(fields=['serial'], name='api_dev_serial_idx'),
+            models.Index(fields=['network_mac'], name='api_dev_network_mac_idx'),
+            models.Index(fields=['network_ipv4'], name='api_dev_network_ipv4_idx'),
+            models.Index(fields=['disk_serial'], name='api_dev_disk_serial_idx'),
+            models.Index(fields=['remote_id'], name='api_dev_remote_id_idx'),
+            models.Index(fields=['status'], name='api_dev_status_idx'),
+            # Common combinations; the FK indexes still serve location/type alone
+            models.Index(fields=['location', 'status'], name='api_dev_location_status_idx'),
+            models.Index(fields=['type', 'status'], name='api_dev_type_status_idx'),
+            # created_at lookups and the (created_at, id) keyset ordering
+            models.Index(fields=['created_at', 'id'], name='api_dev_created_at_id_idx'),
+        ]
+
+
+class DeviceStats(models.Model):
+    """
+    Device counts per value of each dashboard dimension, maintained
+    incrementally by the receivers below so the summary reads one row per
+    group instead of scanning the devices.
+    """
+    # Dimension -> device lookup holding its value
+    DIMENSIONS = {
+        'status': 'status',
+        'type': 'type_id',
+        'location_zone': 'location__location_zone_id',
+        'system': 'system_id',
+    }
+
+    id = models.AutoField(primary_key=True)
+    dimension = models.CharField(max_length=20)
+    value = models.IntegerField()
+    devices_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        managed = True
+        db_table = 'api_device_stats'
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'value'], name='api_device_stats_dim_value_uniq'),
+        ]
+
+    @classmethod
+    def adjust_groups(cls, deltas):
+        """
+        Applies {dimension: {value: delta}} with one UPDATE, creating the
+        missing rows of the groups that grow first.
+        """
+        groups = [
+            (dimension, value, delta)
+            for dimension, values in deltas.items()
+            for value, delta in values.items() if value is not None and delta
+        ]
+        if not groups:
+            return
+        cls.objects.bulk_create(
+            [cls(dimension=dimension, value=value) for dimension, value, delta in groups if delta > 0],
+            ignore_conflicts=True
+        )
+        delta = Case(
+            *[When(dimension=dimension, value=value, then=Value(delta)) for dimension, value, delta in groups],
+            default=Value(0)
+        )
+        matches = Q()
+        for dimension, value, _ in groups:
+            matches |= Q(dimension=dimension, value=value)
+        cls.objects.filter(matches).update(devices_count=Greatest(F('devices_count') + delta, 0))
+
+    @classmethod
+    def group_counts(cls, queryset, dimensions=None) -> dict:
+        """
+        Returns {dimension: {value: count}} for the devices in `queryset`, with
+        one GROUP BY per dimension.
+        """
+        counts = {}
+        for dimension in cls.DIMENSIONS if dimensions is None else dimensions:
+            groups = queryset.order_by().values_list(cls.DIMENSIONS[dimension]).annotate(total=Count('id'))
+            counts[dimension] = {value: total for value, total in groups if value is not None}
+        return counts
+
+    @classmethod
+    def get_zone(cls, location_id):
+        if location_id is None:
+            return None
+        return Locations.objects.filter(pk=location_id).values_list('location_zone_id', flat=True).first()
+
+    @classmethod
+    def get_device_zone(cls, device):
+        """
+        Returns the zone of a device, from its location when that is loaded.
+        """
+        if device.location_id is not None and Devices.location.is_cached(device):
+            location = device.location
+            if location is not None and location.pk == device.location_id:
+                return location.location_zone_id
+        return cls.get_zone(device.location_id)
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Re-derives every group from the devices. Returns the number of groups.
+        """
+        rows = [
+            cls(dimension=dimension, value=value, devices_count=total)
+            for dimension, groups in cls.group_counts(Devices.objects.all()).items()
+            for value, total in groups.items()
+        ]
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows)
+        return len(rows)
 
 
 class DeviceSoftwares(models.Model):
@@ -445,6 +677,9 @@ class Notifications(models.Model):
     class Meta:
         managed = True
         db_table = 'api_notifications'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='api_notif_created_at_id_idx'),
+        ]
 
 
 class AppSettings(models.Model):
@@ -482,6 +717,13 @@ class AppSettings(models.Model):
 
     @classmethod
     def get_solo(cls):
+        """
+        Returns the cached singleton; cheap enough for hot validation paths.
+        """
+        return SettingsCache.get(cls)
+
+    @classmethod
+    def load_solo(cls):
         obj, created = cls.objects.get_or_create(pk=1)
         return obj
 
@@ -509,5 +751,237 @@ class UserSettings(models.Model):
 
     @classmethod
     def get_solo(cls):
+        """
+        Returns the cached singleton; cheap enough for hot validation paths.
+        """
+        return SettingsCache.get(cls)
+
+    @classmethod
+    def load_solo(cls):
         obj, created = cls.objects.get_or_create(pk=1)
         return obj
+
+
+class RotatedRefreshTokens(models.Model):
+    """
+    Refresh tokens already used for a rotation (or revoked), which must not be
+    accepted again. Only the hashed jti and the expiry are kept, and a row is
+    useless once its token expires, so `prune_refresh_tokens` deletes it.
+    """
+    jti_hash = models.CharField(primary_key=True, max_length=32)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        managed = True
+        db_table = 'api_rotated_refresh_tokens'
+
+    @staticmethod
+    def hash_jti(jti) -> str:
+        return hashlib.sha256(str(jti).encode('utf-8')).hexdigest()[:32]
+
+    @classmethod
+    def is_rotated(cls, jti) -> bool:
+        return cls.objects.filter(jti_hash=cls.hash_jti(jti)).exists()
+
+    @classmethod
+    def rotate(cls, jti, expires_at) -> None:
+        """
+        Records a used token with one INSERT, without model signals.
+        """
+        cls.objects.bulk_create([cls(jti_hash=cls.hash_jti(jti), expires_at=expires_at)], ignore_conflicts=True)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_cache_generation(sender, **kwargs):
+    """
+    Invalidate cached data versioned against the written model.
+    """
+    if sender._meta.app_label != 'api' and sender is not User:
+        return
+    CacheService.bump_generation(sender)
+
+
+@receiver(post_save, sender=AppSettings)
+@receiver(post_delete, sender=AppSettings)
+@receiver(post_save, sender=UserSettings)
+@receiver(post_delete, sender=UserSettings)
+def invalidate_settings_cache(sender, **kwargs):
+    """
+    Drop the cached settings singleton, again on commit in case another worker
+    reloaded the old row before the transaction finished.
+    """
+    SettingsCache.invalidate(sender)
+    transaction.on_commit(lambda: SettingsCache.invalidate(sender))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """
+    Drop the cached copies and summaries of a saved (deactivated, password
+    changed) or deleted user or profile, again on commit in case another
+    worker reloaded the old row before the transaction finished. The
+    last_login stamp of each login only drops the summaries, as the cached
+    user does not hold it.
+    """
+    user_id = instance.pk if sender is User else instance.user_id
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'last_login'}:
+        UserCache.invalidate_summary(user_id)
+        transaction.on_commit(lambda: UserCache.invalidate_summary(user_id))
+        return
+    UserCache.invalidate(user_id)
+    transaction.on_commit(lambda: UserCache.invalidate(user_id))
+
+
+@receiver(pre_save)
+def load_tracked_fields(sender, instance, raw=False, **kwargs):
+    """
+    Fetch the stored tracked values of instances that were not loaded from the database.
+    """
+    if raw or not isinstance(instance, TrackedFieldsMixin) or instance._state.adding:
+        return
+    loaded = getattr(instance, '_loaded_values', {})
+    missing = [name for name in instance.tracked_fields if name not in loaded]
+    if missing:
+        stored = sender.objects.filter(pk=instance.pk).values(*missing).first() or {}
+        instance._loaded_values = {**loaded, **stored}
+
+
+@receiver(post_save, sender=Devices)
+def count_device_location(sender, instance, created, **kwargs):
+    """
+    Keep Locations.devices_count in step when a device is created or moved.
+    """
+    previous = None if created else instance.get_loaded_value('location_id')
+    if created or previous != instance.location_id:
+        adjust_counter(Locations, previous, 'devices_count', -1)
+        adjust_counter(Locations, instance.location_id, 'devices_count', 1)
+
+
+@receiver(post_delete, sender=Devices)
+def uncount_device_location(sender, instance, **kwargs):
+    """
+    Keep Locations.devices_count in step when a device is deleted.
+    """
+    adjust_counter(Locations, instance.location_id, 'devices_count', -1)
+
+
+@receiver(post_save, sender=Locations)
+def count_location_zone(sender, instance, created, **kwargs):
+    """
+    Keep LocationZones.locations_count in step when a location is created or moved.
+    """
+    previous = None if created else instance.get_loaded_value('location_zone_id')
+    if created or previous != instance.location_zone_id:
+        adjust_counter(LocationZones, previous, 'locations_count', -1)
+        adjust_counter(LocationZones, instance.location_zone_id, 'locations_count', 1)
+
+
+@receiver(post_delete, sender=Locations)
+def uncount_location_zone(sender, instance, **kwargs):
+    """
+    Keep LocationZones.locations_count in step when a location is deleted.
+    """
+    adjust_counter(LocationZones, instance.location_zone_id, 'locations_count', -1)
+
+
+@receiver(post_save, sender=Devices)
+def index_device(sender, instance, raw=False, using='default', **kwargs):
+    """
+    Keep the full-text index row of a device current.
+    """
+    if not raw:
+        DeviceSearchIndex.refresh(Devices.objects.using(using).filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Devices)
+def unindex_device(sender, instance, using='default', **kwargs):
+    """
+    Drop the full-text index row of a deleted device.
+    """
+    DeviceSearchIndex.remove([instance.pk], using=using)
+
+
+@receiver(post_save)
+def reindex_renamed_relation(sender, instance, created, raw=False, using='default', **kwargs):
+    """
+    Re-index the devices of a catalog entry or location whose title changed.
+    """
+    if raw or created or 'title' not in getattr(sender, 'tracked_fields', ()):
+        return
+    if instance.get_loaded_value('title') == instance.title:
+        return
+    for name in DeviceSearchIndex.RELATIONS:
+        if Devices._meta.get_field(name).related_model is sender:
+            DeviceSearchIndex.refresh(Devices.objects.using(using).filter(**{name: instance.pk}))
+
+
+@receiver(post_save, sender=Devices)
+def count_device_stats(sender, instance, created, raw=False, **kwargs):
+    """
+    Keep DeviceStats in step when a device is created or one of its dimensions changes.
+    """
+    if raw:
+        return
+    fields = {'status': 'status', 'type': 'type_id', 'system': 'system_id'}
+    deltas = defaultdict(Counter)
+    if created:
+        for dimension, name in fields.items():
+            deltas[dimension][getattr(instance, name)] += 1
+        deltas['location_zone'][DeviceStats.get_device_zone(instance)] += 1
+        DeviceStats.adjust_groups(deltas)
+        return
+    for dimension, name in fields.items():
+        previous, value = instance.get_loaded_value(name), getattr(instance, name)
+        if previous != value:
+            deltas[dimension][previous] -= 1
+            deltas[dimension][value] += 1
+    previous_location = instance.get_loaded_value('location_id')
+    if previous_location != instance.location_id:
+        deltas['location_zone'][DeviceStats.get_zone(previous_location)] -= 1
+        deltas['location_zone'][DeviceStats.get_device_zone(instance)] += 1
+    DeviceStats.adjust_groups(deltas)
+
+
+@receiver(post_delete, sender=Devices)
+def uncount_device_stats(sender, instance, **kwargs):
+    """
+    Keep DeviceStats in step when a device is deleted.
+    """
+    DeviceStats.adjust_groups({
+        'status': {instance.status: -1},
+        'type': {instance.type_id: -1},
+        'system': {instance.system_id: -1},
+        'location_zone': {DeviceStats.get_device_zone(instance): -1},
+    })
+
+
+@receiver(post_save, sender=Locations)
+def move_location_device_stats(sender, instance, created, raw=False, **kwargs):
+    """
+    Move the devices of a location between zone groups when the location
+    changes zone, counted by the stored Locations.devices_count.
+    """
+    if raw or created:
+        return
+    previous = instance.get_loaded_value('location_zone_id')
+    if previous == instance.location_zone_id:
+        return
+    total = Locations.objects.filter(pk=instance.pk).values_list('devices_count', flat=True).first() or 0
+    deltas = defaultdict(Counter)
+    deltas['location_zone'][previous] -= total
+    deltas['location_zone'][instance.location_zone_id] += total
+    DeviceStats.adjust_groups(deltas)
+
+
+@receiver(post_save)
+def remember_tracked_fields(sender, instance, raw=False, **kwargs):
+    """
+    The saved values become the baseline for the next save of the same instance.
+    """
+    if not raw and isinstance(instance, TrackedFieldsMixin):
+        instance.remember_tracked_fields()
@@ -0,0 +1,118 @@
+from django.db import migrations, models
+from django.db.models.functions import Collate, Upper
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    Adds an index with CREATE INDEX CONCURRENTLY on PostgreSQL, so the table
+    stays writable while the index is built. Other backends fall back to a
+    plain CREATE INDEX. Migrations using it must set `atomic = False`.
+    """
+
+    def describe(self):
+        return 'Concurrently create index %s on field(s) %s of model %s' % (
+            self.index.name,
+            ', '.join(self.index.fields),
+            self.model_name,
+        )
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        self._ensure_not_in_transaction(schema_editor)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        self._ensure_not_in_transaction(schema_editor)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+    @staticmethod
+    def _ensure_not_in_transaction(schema_editor):
+        if schema_editor.connection.in_atomic_block:
+            raise Exception(
+                'The AddIndexConcurrently operation cannot be executed inside '
+                'a transaction (set atomic = False on the Migration class).'
+            )
+
+
+class AddPrefixSearchIndex(migrations.operations.base.Operation):
+    """
+    Adds the index serving case-insensitive prefix searches on one column.
+    Its expression is a copy of SearchService.prefix_key() as the migrations
+    using it were written, so a later change there does not alter what they
+    create. It is created concurrently on PostgreSQL (migrations using it
+    must set `atomic = False`). The index is not part of the model state,
+    since its expression depends on the backend.
+    """
+    reduces_to_sql = False
+    reversible = True
+
+    def __init__(self, model_name, field, name):
+        self.model_name = model_name
+        self.field = field
+        self.name = name
+
+    def deconstruct(self):
+        return (
+            self.__class__.__name__,
+            [],
+            {'model_name': self.model_name, 'field': self.field, 'name': self.name},
+        )
+
+    def describe(self):
+        return 'Create prefix search index %s on field %s of model %s' % (
+            self.name,
+            self.field,
+            self.model_name,
+        )
+
+    @property
+    def migration_name_fragment(self):
+        return self.name.lower()
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        concurrently = self._concurrently(schema_editor)
+        schema_editor.add_index(model, self.get_index(schema_editor.connection), **concurrently)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        concurrently = self._concurrently(schema_editor)
+        schema_editor.remove_index(model, self.get_index(schema_editor.connection), **concurrently)
+
+    @staticmethod
+    def key_expression(field, vendor):
+        if vendor == 'postgresql':
+            return Collate(Upper(field), 'C')
+        if vendor == 'sqlite':
+            return Collate(models.F(field), 'nocase')
+        if vendor == 'oracle':
+            return Upper(field)
+        return models.F(field)
+
+    def get_index(self, connection):
+        return models.Index(
+            self.key_expression(self.field, connection.vendor),
+            models.F('id'),
+            name=self.name
+        )
+
+    @staticmethod
+    def _concurrently(schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return {}
+        AddIndexConcurrently._ensure_not_in_transaction(schema_editor)
+        return {'concurrently': True}
@@ -1,11 +1,36 @@
-from rest_framework.pagination import LimitOffsetPagination
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.apps import apps
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework import serializers
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api.services.cache import CacheService
 
 
 """
 Default Pagination class for the API.
 """
 class DefaultLimitOffsetPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination whose total count strategy is chosen with the
+    `count` query parameter:
+    - exact (default): COUNT(*) over the filtered queryset.
+    - none: no count; `next` is decided by fetching one extra row.
+    - estimate: planner estimate on PostgreSQL, falling back to the cached
+      exact count for small results and on other backends.
+    - cached: exact count cached per query signature until the next write
+      to any table the query reads.
+    `count_type` in the response tells clients whether `count` is exact.
+    """
     default_limit = getattr(settings, 'REST_FRAMEWORK', {}).get('PAGE_SIZE')
     min_limit = 1
     max_limit = 100
@@ -14,4 +39,270 @@ class DefaultLimitOffsetPagination(LimitOffsetPagination):
     ordering_query_param = 'ordering'
     min_page_size = 1
     max_page_size = 100
-    page_size_query_param = 'page_size'    
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    count_modes = ('exact', 'none', 'estimate', 'cached')
+    default_count_mode = 'exact'
+    count_cache_timeout = 60 * 60
+    estimate_exact_threshold = 10000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        self.count_mode = self.get_count_mode(request)
+        self.count_type = 'exact'
+        self.has_more = None
+        if self.count_mode == 'exact':
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+
+        if self.count_mode == 'none':
+            self.count = None
+            self.count_type = None
+        elif self.count_mode == 'estimate':
+            self.count, self.count_type = self.get_estimated_count(queryset)
+        else:
+            self.count = self.get_cached_count(queryset)
+
+        results = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_more = len(results) > self.limit
+        return results[:self.limit]
+
+    def counts_rows(self, request):
+        """
+        Tells whether this request runs an exact COUNT over the queryset.
+        """
+        return self.get_count_mode(request) == 'exact'
+
+    def get_count(self, queryset):
+        """
+        Reuses the row count the view already computed for its conditional GET
+        validators (see ConditionalGetMixin) instead of running COUNT twice.
+        """
+        summary = getattr(getattr(self, 'view', None), 'conditional_summary', None)
+        if summary is not None:
+            return summary['count']
+        return super().get_count(queryset)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['count_type'] = self.count_type
+        return response
+
+    def get_next_link(self):
+        if self.has_more is None:
+            return super().get_next_link()
+        if not self.has_more:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param, self.default_count_mode)
+        return mode if mode in self.count_modes else self.default_count_mode
+
+    def get_cached_count(self, queryset):
+        """
+        Exact count cached per normalized query, keyed by the generations of every
+        table the query reads so any write invalidates it.
+        """
+        queryset = queryset.order_by()
+        sql, params = queryset.query.sql_with_params()
+        tables = {alias.table_name for alias in queryset.query.alias_map.values()}
+        models = [model for model in apps.get_models() if model._meta.db_table in tables]
+        key = CacheService.versioned_key('count', models, sql, params)
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, self.count_cache_timeout)
+        return count
+
+    def get_estimated_count(self, queryset):
+        """
+        Returns (count, count_type) using the PostgreSQL planner row estimate.
+        """
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return self.get_cached_count(queryset), 'exact'
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        if estimate < self.estimate_exact_threshold:
+            return self.get_cached_count(queryset), 'exact'
+        return estimate, 'estimated'
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema['properties']['count']['nullable'] = True
+        schema['properties']['count_type'] = {
+            'type': 'string',
+            'nullable': True,
+            'enum': ['exact', 'estimated'],
+        }
+        return schema
+
+
+"""
+Limit/offset pagination with an opt-in keyset (cursor) mode.
+"""
+class CursorLimitOffsetPagination(DefaultLimitOffsetPagination):
+    """
+    Keeps the limit/offset contract for existing clients. Sending the `cursor`
+    query parameter (empty for the first page) switches to keyset pagination
+    over `cursor_ordering`, which must be a stable and indexed ordering ending
+    in a unique field. The view may override it with its own `cursor_ordering`.
+    """
+    cursor_query_param = 'cursor'
+    cursor_ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.ordering = tuple(getattr(view, 'cursor_ordering', self.cursor_ordering))
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip('-')) for name in self.ordering
+        ]
+        position, reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self._flip(name) for name in ordering)
+        queryset = self._load_ordering_fields(queryset.order_by(*ordering))
+        if position is not None:
+            queryset = queryset.filter(self._keyset_filter(ordering, position))
+
+        results = list(queryset[:self.limit + 1])
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if reverse:
+            results.reverse()
+
+        self.next_position = None
+        self.previous_position = None
+        if results:
+            first, last = results[0], results[-1]
+            if reverse:
+                self.previous_position = self._position(first) if has_more else None
+                self.next_position = self._position(last)
+            else:
+                self.previous_position = self._position(first) if position is not None else None
+                self.next_position = self._position(last) if has_more else None
+        return results
+
+    def counts_rows(self, request):
+        if self.cursor_query_param in request.query_params:
+            return False
+        return super().counts_rows(request)
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.use_cursor:
+            return super().get_previous_link()
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def decode_cursor(self, request):
+        """
+        Returns the (position, reverse) pair encoded in the cursor query parameter.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padding = '=' * (-len(encoded) % 4)
+            payload = json.loads(urlsafe_b64decode(encoded + padding).decode('ascii'))
+            values = payload['p']
+            if len(values) != len(self.fields):
+                raise ValueError('Cursor does not match the ordering.')
+            position = [field.to_python(value) for field, value in zip(self.fields, values)]
+            return position, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise serializers.ValidationError({self.cursor_query_param: [self.invalid_cursor_message]})
+
+    def encode_cursor(self, position, reverse):
+        """
+        Builds the URL for the given position, keeping the remaining query parameters.
+        """
+        payload = {'p': position}
+        if reverse:
+            payload['r'] = 1
+        encoded = urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('ascii')
+        ).decode('ascii').rstrip('=')
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def _position(self, instance):
+        return [field.value_to_string(instance) for field in self.fields]
+
+    def _load_ordering_fields(self, queryset):
+        """
+        Keeps the cursor fields loaded when the queryset was narrowed with only(),
+        so building the cursors does not refetch deferred columns row by row.
+        """
+        field_names, defer = queryset.query.deferred_loading
+        if defer:
+            return queryset
+        return queryset.only(*field_names, *(field.name for field in self.fields))
+
+    def _keyset_filter(self, ordering, position):
+        """
+        Rows strictly after `position` for the given ordering, as a row-value comparison
+        expanded to (a > x) OR (a = x AND b > y) ...
+        """
+        condition = Q()
+        equal = Q()
+        for name, value in zip(ordering, position):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    @staticmethod
+    def _flip(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append({
+            'name': self.cursor_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Opaque keyset cursor. Send it empty to start cursor pagination.',
+            'schema': {
+                'type': 'string',
+            },
+        })
+        return parameters
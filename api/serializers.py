@@ -1,7 +1,11 @@
-from django.contrib.auth.models import User
+import csv
+
+from django.contrib.auth.models import User, update_last_login
 from django.utils import timezone
 from rest_framework import serializers
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import UntypedToken
 from rest_framework_simplejwt.serializers import (
     TokenObtainPairSerializer,
     TokenRefreshSerializer,
@@ -10,11 +14,15 @@ from rest_framework_simplejwt.serializers import (
 from rest_framework.validators import UniqueTogetherValidator
 
 from api.services.auth import AuthService
+from api.services.catalog import CatalogCache
+from api.services.devices import DevicesService
+from api.services.search import SearchService
+from api.services.users import UserCache
 from api.models import (
     UserProfile, Locations, LocationZones, DeviceTypes, DeviceMarks,
     DeviceModels, DeviceSystems, DeviceBuilds, DeviceProcessors,
     DeviceRAMs, DeviceDisks, Softwares, DeviceSoftwares, Devices,
-    NotificationTypes, Notifications, AppSettings, UserSettings
+    NotificationTypes, Notifications, AppSettings, UserSettings, RotatedRefreshTokens
 )
 from api.filters import (
     LocationsFilter, LocationZonesFilter, DeviceTypesFilter,
@@ -25,6 +33,8 @@ from api.filters import (
     NotificationsFilter
 )
 from api.pagination import DefaultLimitOffsetPagination
+from api.tokens import RotatingRefreshToken
+from api.mixins import SparseFieldsetsMixin, SideloadMixin, CatalogUsageMixin, UserReferencesMixin
 
 
 class AuthCustomSerializer(serializers.Serializer):
@@ -132,39 +142,62 @@ class AuthCustomSerializer(serializers.Serializer):
 
 
 class AuthTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = RotatingRefreshToken
+
     def validate(self, attrs):
-        data = super().validate(attrs)
-        user = self.user
+        # TokenObtainSerializer.validate() checks the credentials and sets self.user
+        super(TokenObtainPairSerializer, self).validate(attrs)
+        return self.for_user(self.user)
+
+    @classmethod
+    def for_user(cls, user) -> dict:
+        """
+        Issues the token pair of an already authenticated user.
+        """
+        refresh = cls.get_token(user)
+        access = refresh.access_token
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
 
         # Custom data to include in the response
-        data['user'] = UserSerializer(user).data
-        data['exp'] = data.get('access', None) and AccessToken(data['access']).payload.get('exp', None)
-        return data
+        return {
+            'refresh': str(refresh),
+            'access': str(access),
+            'user': UserSerializer(user).data,
+            'exp': access.payload.get('exp', None),
+        }
 
 
 class AuthTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Rotates the refresh token without user or profile queries when the user
+    is cached: the user comes from UserCache and its summary is cached under
+    the same version, so both follow any change of the user or its profile.
+    """
+    token_class = RotatingRefreshToken
+
     def validate(self, attrs):
-        from rest_framework_simplejwt.exceptions import TokenError
         try:
-            data = super().validate(attrs)
-            access_token = data.get('access', None)
-
-            user = None
-            token_obj = None
-            if access_token:
-                try:
-                    token_obj = AccessToken(access_token)
-                    user_id = token_obj.get('user_id')
-                    user = User.objects.filter(id=user_id).first()
-                except TokenError as e:
-                    raise serializers.ValidationError({'detail': str(e)})
-            else:
-                raise serializers.ValidationError({'detail': 'Access token is required.'})
+            refresh = self.token_class(attrs['refresh'])
+            user_id = refresh.payload.get(jwt_settings.USER_ID_CLAIM, None)
+            user = UserCache.get(user_id) if user_id else None
+            if user_id and (user is None or not jwt_settings.USER_AUTHENTICATION_RULE(user)):
+                raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+            access = refresh.access_token
+            data = {'access': str(access)}
+            if jwt_settings.ROTATE_REFRESH_TOKENS:
+                if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                    refresh.blacklist()
+                refresh.set_jti()
+                refresh.set_exp()
+                refresh.set_iat()
+                refresh.outstand()
+                data['refresh'] = str(refresh)
 
             if user:
-                data['user'] = UserSerializer(user).data
-                data['exp'] = token_obj.payload.get('exp', None)
-
+                data['user'] = UserCache.get_summary(user, lambda instance: dict(UserSerializer(instance).data))
+                data['exp'] = access.payload.get('exp', None)
             return data
         except TokenError as e:
             raise serializers.ValidationError({'detail': str(e)})
@@ -172,7 +205,10 @@ class AuthTokenRefreshSerializer(TokenRefreshSerializer):
 
 class AuthTokenVerifySerializer(TokenVerifySerializer):
     def validate(self, attrs):
-        return super().validate(attrs)
+        token = UntypedToken(attrs['token'])
+        if jwt_settings.BLACKLIST_AFTER_ROTATION and RotatedRefreshTokens.is_rotated(token.get(jwt_settings.JTI_CLAIM)):
+            raise serializers.ValidationError('Token is blacklisted')
+        return {}
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -189,6 +225,9 @@ class UserSerializer(serializers.ModelSerializer):
         """
         Customize the representation of the user data.
         """
+        if isinstance(instance, User):
+            # A user from UserCache loads its other fields in one query
+            UserCache.load_deferred(instance)
         data = super().to_representation(instance)
         if hasattr(instance, "id"):
             data["id"] = instance.id
@@ -198,7 +237,13 @@ class UserSerializer(serializers.ModelSerializer):
         data["last_name"] = getattr(instance, "last_name", data.get("last_name", None))
         data["is_staff"] = getattr(instance, "is_staff", False)
         data["is_superuser"] = getattr(instance, "is_superuser", False)
-        user_profile = UserProfile.objects.filter(user=instance).first() if hasattr(instance, "id") else None
+        user_profile = None
+        if hasattr(instance, "id"):
+            # Reuses the profile loaded by select_related('...__profile') when present
+            try:
+                user_profile = instance.profile
+            except UserProfile.DoesNotExist:
+                user_profile = None
         if user_profile:
             data["avatar"] = user_profile.avatar.url if user_profile.avatar else None
         return data
@@ -324,10 +369,17 @@ class UserExtendedSerializer(serializers.ModelSerializer):
         return data
 
 
-class LocationZonesSerializer(serializers.ModelSerializer):
+class LocationZonesSerializer(UserReferencesMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for location zones.
     """
+    select_related_fields = {
+        'creator': ('creator__profile',),
+        'updater': ('updater__profile',),
+    }
+    prefetch_related_fields = {
+        'locations': ('locations',),
+    }
     creator = UserSerializer(read_only=True)
     updater = UserSerializer(read_only=True)
     locations = serializers.StringRelatedField(many=True, read_only=True)
@@ -337,9 +389,9 @@ class LocationZonesSerializer(serializers.ModelSerializer):
         fields = ('id', 'title', 'description', 'code_name', 'status',
             'is_core', 'manager', 'manager_email', 'manager_phone',
             'manager_mobile', 'sort_order', 'creator', 'updater',
-            'created_at', 'updated_at', 'locations')
+            'created_at', 'updated_at', 'locations', 'locations_count')
         read_only_fields = ('is_core', 'creator', 'created_at',
-                            'updater', 'updated_at')
+                            'updater', 'updated_at', 'locations_count')
         
     title = serializers.CharField(required=False)
 
@@ -350,6 +402,8 @@ class LocationZonesSerializer(serializers.ModelSerializer):
         super().__init__(*args, **kwargs)
         action = self.context.get('action')
 
+        if 'title' not in self.fields:
+            return
         if action == 'locations':
             self.fields['title'].required = False
         else:
@@ -378,7 +432,7 @@ class LocationZonesSerializer(serializers.ModelSerializer):
         """
         Returns the queryset for location zones, applying filters using LocationZonesFilter.
         """
-        queryset = LocationZones.objects.all()
+        queryset = cls.setup_sparse_queryset(LocationZones.objects.all(), request)
         filterset = LocationZonesFilter(request.GET, queryset=queryset)
         return filterset.qs
 
@@ -435,20 +489,28 @@ class LocationZonesSerializer(serializers.ModelSerializer):
             )
             return serializer.data, None
         return None, serializer.errors
-    
-    def to_representation(self, instance):
-        """
-        Customize the representation of the location zone data.
-        """
-        data = super().to_representation(instance)
-        data["locations_count"] = Locations.objects.filter(location_zone=instance).count()
-        return data
 
 
-class LocationsSerializer(serializers.ModelSerializer):
+class LocationsSerializer(UserReferencesMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for locations.
     """
+    select_related_fields = {
+        'location_zone': ('location_zone',),
+        'creator': ('creator__profile',),
+        'updater': ('updater__profile',),
+    }
+    export_fields = (
+        ('id', 'id'), ('title', 'title'), ('code_name', 'code_name'),
+        ('status', 'status'), ('location_zone', 'location_zone__title'),
+        ('manager', 'manager'), ('manager_email', 'manager_email'),
+        ('phone', 'phone'), ('address', 'address'), ('city', 'city'),
+        ('state', 'state'), ('zip_code', 'zip_code'), ('country', 'country'),
+        ('latitude', 'latitude'), ('longitude', 'longitude'),
+        ('devices_count', 'devices_count'), ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    )
+
     location_zone = serializers.SerializerMethodField()
     creator = UserSerializer(read_only=True)
     updater = UserSerializer(read_only=True)
@@ -468,9 +530,10 @@ class LocationsSerializer(serializers.ModelSerializer):
                   'collaborator_phone', 'collaborator_mobile', 'phone',
                   'mobile', 'address', 'city', 'state', 'zip_code',
                   'country', 'latitude', 'longitude', 'sort_order',
-                  'creator', 'updater', 'created_at', 'updated_at')
+                  'devices_count', 'creator', 'updater', 'created_at',
+                  'updated_at')
         read_only_fields = ('is_core', 'creator', 'created_at',
-                            'updater', 'updated_at')
+                            'updater', 'updated_at', 'devices_count')
 
     def get_location_zone(self, obj):
         return {
@@ -500,10 +563,18 @@ class LocationsSerializer(serializers.ModelSerializer):
         """
         Returns the queryset for locations, applying filters using LocationsFilter.
         """
-        queryset = Locations.objects.all()
+        queryset = cls.setup_sparse_queryset(Locations.objects.all(), request)
         filterset = LocationsFilter(request.GET, queryset=queryset)
         return filterset.qs
 
+    @classmethod
+    def get_export_queryset(cls, request):
+        """
+        Returns the filtered locations to export, in primary key order.
+        """
+        filterset = LocationsFilter(request.GET, queryset=Locations.objects.order_by('id'))
+        return filterset.qs
+
     @classmethod
     def create_location(cls, request):
         """
@@ -538,27 +609,26 @@ class LocationsSerializer(serializers.ModelSerializer):
             return serializer.data, None
         return None, serializer.errors
 
-    def to_representation(self, instance):
-        """
-        Customize the representation of the location data.
-        """
-        data = super().to_representation(instance)
-        data["devices_count"] = Devices.objects.filter(location=instance).count()
-        return data
 
-
-class DeviceTypesSerializer(serializers.ModelSerializer):
+class DeviceTypesSerializer(CatalogUsageMixin, UserReferencesMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for device types.
     """
+    select_related_fields = {
+        'creator': ('creator__profile',),
+        'updater': ('updater__profile',),
+    }
     creator = UserSerializer(read_only=True)
     updater = UserSerializer(read_only=True)
+    devices_count = serializers.SerializerMethodField()
+    last_used_at = serializers.SerializerMethodField()
 
     class Meta:
         model = DeviceTypes
         fields = ('id', 'title', 'description', 'code_name', 'status',
                   'is_core', 'is_deprecated', 'sort_order', 'creator',
-                  'updater', 'created_at', 'updated_at')
+                  'updater', 'created_at', 'updated_at', 'devices_count',
+                  'last_used_at')
         read_only_fields = ('is_core', 'creator', 'created_at',
                             'updater', 'updated_at')
 
@@ -583,7 +653,7 @@ class DeviceTypesSerializer(serializers.ModelSerializer):
         """
         Returns the queryset for device types, applying filters using DeviceTypesFilter.
         """
-        queryset = DeviceTypes.objects.all()
+        queryset = cls.setup_sparse_queryset(DeviceTypes.objects.all(), request)
         filterset = DeviceTypesFilter(request.GET, queryset=queryset)
         return filterset.qs
 
@@ -622,18 +692,25 @@ class DeviceTypesSerializer(serializers.ModelSerializer):
         return None, serializer.errors
 
 
-class DeviceMarksSerializer(serializers.ModelSerializer):
+class DeviceMarksSerializer(CatalogUsageMixin, UserReferencesMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for device marks.
     """
+    select_related_fields = {
+        'creator': ('creator__profile',),
+        'updater': ('updater__profile',),
+    }
     creator = UserSerializer(read_only=True)
     updater = UserSerializer(read_only=True)
+    devices_count = serializers.SerializerMethodField()
+    last_used_at = serializers.SerializerMethodField()
 
     class Meta:
         model = DeviceMarks
         fields = ('id', 'title', 'description', 'code_name', 'status',
                   'is_core', 'is_deprecated', 'sort_order', 'creator',
-                  'updater', 'created_at', 'updated_at')
+                  'updater', 'created_at', 'updated_at', 'devices_count',
+                  'last_used_at')
         read_only_fields = ('is_core', 'creator', 'created_at',
                             'updater', 'updated_at')
 
@@ -658,7 +735,7 @@ class DeviceMarksSerializer(serializers.ModelSerializer):
         """
         Returns the queryset for device marks, applying filters using DeviceMarksFilter.
         """
-        queryset = DeviceMarks.objects.all()
+        queryset = cls.setup_sparse_queryset(DeviceMarks.objects.all(), request)
         filterset = DeviceMarksFilter(request.GET, queryset=queryset)
         return filterset.qs
 
@@ -697,18 +774,25 @@ class DeviceMarksSerializer(serializers.ModelSerializer):
         return None, serializer.errors
 
 
-class DeviceModelsSerializer(serializers.ModelSerializer):
+class DeviceModelsSerializer(CatalogUsageMixin, UserReferencesMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for device models.
     """
+    select_related_fields = {
+        'creator': ('creator__profile',),
+        'updater': ('updater__profile',),
+    }
     creator = UserSerializer(read_only=True)
     updater = UserSerializer(read_only=True)
+    devices_count = serializers.SerializerMethodField()
+    last_used_at = serializers.SerializerMethodField()
 
     class Meta:
         model = DeviceModels
         fields = ('id', 'title', 'description', 'code_name', 'status',
                   'is_core', 'is_deprecated', 'sort_order', 'creator',
-                  'updater', 'created_at', 'updated_at')
+                  'updater', 'created_at', 'updated_at', 'devices_count',
+                  'last_used_at')
         read_only_fields = ('is_core', 'creator', 'created_at',
                             'updater', 'updated_at')
 
@@ -733,7 +817,7 @@ class DeviceModelsSerializer(serializers.ModelSerializer):
         """
         Returns the queryset for device models, applying filters using DeviceModelsFilter.
         """
-        queryset = DeviceModels.objects.all()
+        queryset = cls.setup_sparse_queryset(DeviceModels.objects.all(), request)
         filterset = DeviceModelsFilter(request.GET, queryset=queryset)
         return filterset.qs
 
@@ -772,18 +856,25 @@ class DeviceModelsSerializer(serializers.ModelSerializer):
         return None, serializer.errors
 
 
-class DeviceSystemsSerializer(serializers.ModelSerializer):
+class DeviceSystemsSerializer(CatalogUsageMixin, UserReferencesMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for device systems.
     """
+    select_related_fields = {
+        'creator': ('creator__profile',),
+        'updater': ('updater__profile',),
+    }
     creator = UserSerializer(read_only=True)
     updater = UserSerializer(read_only=True)
+    devices_count = serializers.SerializerMethodField()
+    last_used_at = serializers.SerializerMethodField()
 
     class Meta:
         model = DeviceSystems
         fields = ('id', 'title', 'description', 'code_name', 'status',
                   'is_core', 'is_deprecated', 'sort_order', 'creator',
-                  'updater', 'created_at', 'updated_at')
+                  'updater', 'created_at', 'updated_at', 'devices_count',
+                  'last_used_at')
         read_only_fields = ('is_core', 'creator', 'created_at',
                             'updater', 'updated_at')
 
@@ -808,7 +899,7 @@ class DeviceSystemsSerializer(serializers.ModelSerializer):
         """
         Returns the queryset for device system, applying filters using DeviceSystemsFilter.
         """
-        queryset = DeviceSystems.objects.all()
+        queryset = cls.setup_sparse_queryset(DeviceSystems.objects.all(), request)
         filterset = DeviceSystemsFilter(request.GET, queryset=queryset)
         return filterset.qs
 
@@ -847,18 +938,25 @@ class DeviceSystemsSerializer(serializers.ModelSerializer):
         return None, serializer.errors
 
 
-class DeviceBuildsSerializer(serializers.ModelSerializer):
+class DeviceBuildsSerializer(CatalogUsageMixin, UserReferencesMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for device builds.
     """
+    select_related_fields = {
+        'creator': ('creator__profile',),
+        'updater': ('updater__profile',),
+    }
     creator = UserSerializer(read_only=True)
     updater = UserSerializer(read_only=True)
+    devices_count = serializers.SerializerMethodField()
+    last_used_at = serializers.SerializerMethodField()
 
     class Meta:
         model = DeviceBuilds
         fields = ('id', 'title', 'description', 'code_name', 'status',
                   'is_core', 'is_deprecated', 'sort_order', 'creator',
-                  'updater', 'created_at', 'updated_at')
+                  'updater', 'created_at', 'updated_at', 'devices_count',
+                  'last_used_at')
         read_only_fields = ('is_core', 'creator', 'created_at',
                             'updater', 'updated_at')
 
@@ -888,7 +986,7 @@ class DeviceBuildsSerializer(serializers.ModelSerializer):
         """
         Returns the queryset for device builds, applying filters using DeviceBuildsFilter.
         """
-        queryset = DeviceBuilds.objects.all()
+        queryset = cls.setup_sparse_queryset(DeviceBuilds.objects.all(), request)
         filterset = DeviceBuildsFilter(request.GET, queryset=queryset)
         return filterset.qs
 
@@ -927,18 +1025,25 @@ class DeviceBuildsSerializer(serializers.ModelSerializer):
         return None, serializer.errors
 
 
-class DeviceProcessorsSerializer(serializers.ModelSerializer):
+class DeviceProcessorsSerializer(CatalogUsageMixin, UserReferencesMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for device processors.
     """
+    select_related_fields = {
+        'creator': ('creator__profile',),
+        'updater': ('updater__profile',),
+    }
     creator = UserSerializer(read_only=True)
     updater = UserSerializer(read_only=True)
+    devices_count = serializers.SerializerMethodField()
+    last_used_at = serializers.SerializerMethodField()
 
     class Meta:
         model = DeviceProcessors
         fields = ('id', 'title', 'description', 'code_name', 'status',
                   'is_core', 'is_deprecated', 'sort_order', 'creator',
-                  'updater', 'created_at', 'updated_at')
+                  'updater', 'created_at', 'updated_at', 'devices_count',
+                  'last_used_at')
         read_only_fields = ('is_core', 'creator', 'created_at',
                             'updater', 'updated_at')
 
@@ -963,7 +1068,7 @@ class DeviceProcessorsSerializer(serializers.ModelSerializer):
         """
         Returns the queryset for device processors, applying filters using DeviceProcessorsFilter.
         """
-        queryset = DeviceProcessors.objects.all()
+        queryset = cls.setup_sparse_queryset(DeviceProcessors.objects.all(), request)
         filterset = DeviceProcessorsFilter(request.GET, queryset=queryset)
         return filterset.qs
 
@@ -1002,18 +1107,25 @@ class DeviceProcessorsSerializer(serializers.ModelSerializer):
         return None, serializer.errors
 
 
-class DeviceRAMsSerializer(serializers.ModelSerializer):
+class DeviceRAMsSerializer(CatalogUsageMixin, UserReferencesMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for device RAMs.
     """
+    select_related_fields = {
+        'creator': ('creator__profile',),
+        'updater': ('updater__profile',),
+    }
     creator = UserSerializer(read_only=True)
     updater = UserSerializer(read_only=True)
+    devices_count = serializers.SerializerMethodField()
+    last_used_at = serializers.SerializerMethodField()
 
     class Meta:
         model = DeviceRAMs
         fields = ('id', 'title', 'description', 'code_name', 'status',
                   'is_core', 'is_deprecated', 'sort_order', 'creator',
-                  'updater', 'created_at', 'updated_at')
+                  'updater', 'created_at', 'updated_at', 'devices_count',
+                  'last_used_at')
         read_only_fields = ('is_core', 'creator', 'created_at',
                             'updater', 'updated_at')
 
@@ -1038,7 +1150,7 @@ class DeviceRAMsSerializer(serializers.ModelSerializer):
         """
         Returns the queryset for device RAMs, applying filters using DeviceRAMsFilter.
         """
-        queryset = DeviceRAMs.objects.all()
+        queryset = cls.setup_sparse_queryset(DeviceRAMs.objects.all(), request)
         filterset = DeviceRAMsFilter(request.GET, queryset=queryset)
         return filterset.qs
 
@@ -1077,18 +1189,25 @@ class DeviceRAMsSerializer(serializers.ModelSerializer):
         return None, serializer.errors
 
 
-class DeviceDisksSerializer(serializers.ModelSerializer):
+class DeviceDisksSerializer(CatalogUsageMixin, UserReferencesMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for device disks.
     """
+    select_related_fields = {
+        'creator': ('creator__profile',),
+        'updater': ('updater__profile',),
+    }
     creator = UserSerializer(read_only=True)
     updater = UserSerializer(read_only=True)
+    devices_count = serializers.SerializerMethodField()
+    last_used_at = serializers.SerializerMethodField()
 
     class Meta:
         model = DeviceDisks
         fields = ('id', 'title', 'description', 'code_name', 'status',
                   'is_core', 'is_deprecated', 'sort_order', 'creator',
-                  'updater', 'created_at', 'updated_at')
+                  'updater', 'created_at', 'updated_at', 'devices_count',
+                  'last_used_at')
         read_only_fields = ('is_core', 'creator', 'created_at',
                             'updater', 'updated_at')
 
@@ -1113,7 +1232,7 @@ class DeviceDisksSerializer(serializers.ModelSerializer):
         """
         Returns the queryset for device disks, applying filters using DeviceDisksFilter.
         """
-        queryset = DeviceDisks.objects.all()
+        queryset = cls.setup_sparse_queryset(DeviceDisks.objects.all(), request)
         filterset = DeviceDisksFilter(request.GET, queryset=queryset)
         return filterset.qs
 
@@ -1151,18 +1270,32 @@ class DeviceDisksSerializer(serializers.ModelSerializer):
             return serializer.data, None
         return None, serializer.errors
 
-class SoftwaresSerializer(serializers.ModelSerializer):
+class SoftwaresSerializer(CatalogUsageMixin, UserReferencesMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for softwares.
     """
+    select_related_fields = {
+        'creator': ('creator__profile',),
+        'updater': ('updater__profile',),
+    }
+    export_fields = (
+        ('id', 'id'), ('title', 'title'), ('version', 'version'),
+        ('code_name', 'code_name'), ('status', 'status'),
+        ('is_deprecated', 'is_deprecated'), ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    )
+
     creator = UserSerializer(read_only=True)
     updater = UserSerializer(read_only=True)
+    devices_count = serializers.SerializerMethodField()
+    last_used_at = serializers.SerializerMethodField()
 
     class Meta:
         model = Softwares
         fields = ('id', 'title', 'description', 'version', 'code_name',
                   'status', 'is_core', 'is_deprecated', 'sort_order',
-                  'creator', 'updater', 'created_at', 'updated_at')
+                  'creator', 'updater', 'created_at', 'updated_at',
+                  'devices_count', 'last_used_at')
         read_only_fields = ('is_core', 'creator', 'created_at',
                             'updater', 'updated_at')
 
@@ -1187,10 +1320,18 @@ class SoftwaresSerializer(serializers.ModelSerializer):
         """
         Returns the queryset for softwares, applying filters using SoftwaresFilter.
         """
-        queryset = Softwares.objects.all()
+        queryset = cls.setup_sparse_queryset(Softwares.objects.all(), request)
         filterset = SoftwaresFilter(request.GET, queryset=queryset)
         return filterset.qs
 
+    @classmethod
+    def get_export_queryset(cls, request):
+        """
+        Returns the filtered softwares to export, in primary key order.
+        """
+        filterset = SoftwaresFilter(request.GET, queryset=Softwares.objects.order_by('id'))
+        return filterset.qs
+
     @classmethod
     def create_software(cls, request):
         """
@@ -1226,10 +1367,54 @@ class SoftwaresSerializer(serializers.ModelSerializer):
         return None, serializer.errors
 
 
-class DevicesSerializer(serializers.ModelSerializer):
+class CatalogPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field for catalog models, validated against CatalogCache
+    instead of querying the table for every value.
+    """
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        instance = CatalogCache.get_instance(self.get_queryset().model, data)
+        if instance is None:
+            self.fail('does_not_exist', pk_value=data)
+        return instance
+
+
+class DevicesSerializer(SideloadMixin, UserReferencesMixin, SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for devices.
     """
+    sideload_fields = ('type', 'mark', 'model', 'system', 'build',
+                       'processor', 'ram', 'disk', 'location')
+    select_related_fields = {
+        'type': ('type',),
+        'mark': ('mark',),
+        'model': ('model',),
+        'system': ('system',),
+        'build': ('build',),
+        'processor': ('processor',),
+        'ram': ('ram',),
+        'disk': ('disk',),
+        'location': ('location',),
+        'creator': ('creator__profile',),
+        'updater': ('updater__profile',),
+    }
+    export_fields = (
+        ('id', 'id'), ('internal_id', 'internal_id'), ('hostname', 'hostname'),
+        ('status', 'status'), ('type', 'type__title'), ('mark', 'mark__title'),
+        ('model', 'model__title'), ('system', 'system__title'),
+        ('build', 'build__title'), ('processor', 'processor__title'),
+        ('ram', 'ram__title'), ('disk', 'disk__title'),
+        ('disk_internal_id', 'disk_internal_id'), ('disk_serial', 'disk_serial'),
+        ('network_ipv4', 'network_ipv4'), ('network_ipv6', 'network_ipv6'),
+        ('network_mac', 'network_mac'), ('remote_id', 'remote_id'),
+        ('serial', 'serial'), ('location', 'location__title'),
+        ('user_owner', 'user_owner'), ('notes', 'notes'),
+        ('creator', 'creator__username'), ('updater', 'updater__username'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    )
+
     type = serializers.SerializerMethodField()
     mark = serializers.SerializerMethodField()
     model = serializers.SerializerMethodField()
@@ -1242,49 +1427,49 @@ class DevicesSerializer(serializers.ModelSerializer):
     creator = UserSerializer(read_only=True)
     updater = UserSerializer(read_only=True)
     
-    type_id = serializers.PrimaryKeyRelatedField(
+    type_id = CatalogPrimaryKeyRelatedField(
         queryset=DeviceTypes.objects.all(), 
         source='type',
         write_only=True
     )
     
-    mark_id = serializers.PrimaryKeyRelatedField(
+    mark_id = CatalogPrimaryKeyRelatedField(
         queryset=DeviceMarks.objects.all(), 
         source='mark',
         write_only=True
     )
     
-    model_id = serializers.PrimaryKeyRelatedField(
+    model_id = CatalogPrimaryKeyRelatedField(
         queryset=DeviceModels.objects.all(),
         source='model',
         write_only=True
     )
     
-    system_id = serializers.PrimaryKeyRelatedField(
+    system_id = CatalogPrimaryKeyRelatedField(
         queryset=DeviceSystems.objects.all(),
         source='system',
         write_only=True
     )
     
-    build_id = serializers.PrimaryKeyRelatedField(
+    build_id = CatalogPrimaryKeyRelatedField(
         queryset=DeviceBuilds.objects.all(),
         source='build',
         write_only=True
     )
     
-    processor_id = serializers.PrimaryKeyRelatedField(
+    processor_id = CatalogPrimaryKeyRelatedField(
         queryset=DeviceProcessors.objects.all(),
         source='processor',
         write_only=True
     )
     
-    ram_id = serializers.PrimaryKeyRelatedField(
+    ram_id = CatalogPrimaryKeyRelatedField(
         queryset=DeviceRAMs.objects.all(),
         source='ram',
         write_only=True
     )
     
-    disk_id = serializers.PrimaryKeyRelatedField(
+    disk_id = CatalogPrimaryKeyRelatedField(
         queryset=DeviceDisks.objects.all(),
         source='disk',
         write_only=True
@@ -1384,11 +1569,20 @@ class DevicesSerializer(serializers.ModelSerializer):
     def get_queryset(cls, request):
         """
         Returns the queryset for devices, applying filters using DevicesFilter.
+        Every relation read by the serializer is joined up front.
         """
-        queryset = Devices.objects.all()
+        queryset = cls.setup_sparse_queryset(Devices.objects.all(), request)
         filterset = DevicesFilter(request.GET, queryset=queryset)
         return filterset.qs
 
+    @classmethod
+    def get_export_queryset(cls, request):
+        """
+        Returns the filtered devices to export, in primary key order.
+        """
+        filterset = DevicesFilter(request.GET, queryset=Devices.objects.order_by('id'))
+        return filterset.qs
+
     @classmethod
     def create_device(cls, request):
         """
@@ -1423,6 +1617,63 @@ class DevicesSerializer(serializers.ModelSerializer):
             return serializer.data, None
         return None, serializer.errors
 
+    @classmethod
+    def import_devices(cls, request):
+        """
+        Imports devices from an uploaded CSV `file` or a JSON array of rows.
+        Catalog references may be ids or titles. With ?dry_run=true rows are
+        only validated.
+        """
+        if 'file' in request.FILES:
+            try:
+                rows = DevicesService.read_csv(request.FILES['file'])
+            except (UnicodeDecodeError, csv.Error):
+                return None, {'detail': 'The file is not a valid UTF-8 CSV file.'}
+        elif isinstance(request.data, list):
+            rows = request.data
+        elif isinstance(request.data.get('rows'), list):
+            rows = request.data['rows']
+        else:
+            return None, {'detail': 'Expected a CSV file or a list of rows.'}
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        report, has_errors = DevicesService.import_devices(rows, request.user, dry_run=dry_run)
+        if has_errors:
+            return None, report
+        return report, None
+
+    @classmethod
+    def bulk_update_devices(cls, request):
+        """
+        Updates many devices at once. Expects `changes` plus either `ids` or a
+        `filter` object with DevicesFilter parameters.
+        """
+        data = request.data if isinstance(request.data, dict) else {}
+        changes = data.get('changes')
+        if not isinstance(changes, dict) or not changes:
+            return None, {'changes': ['Expected an object with the fields to change.']}
+
+        ids = data.get('ids')
+        filters = data.get('filter')
+        if ids is not None:
+            if not isinstance(ids, list) or not ids or not all(str(pk).isdigit() for pk in ids):
+                return None, {'ids': ['Expected a list of device ids.']}
+            queryset = Devices.objects.filter(pk__in=ids)
+        elif isinstance(filters, dict) and filters:
+            filterset = DevicesFilter(filters, queryset=Devices.objects.all())
+            unknown = set(filters) - set(filterset.filters)
+            if unknown:
+                return None, {'filter': [f'Unknown filters: {", ".join(sorted(unknown))}.']}
+            if not filterset.is_valid():
+                return None, {'filter': filterset.errors}
+            queryset = filterset.qs
+        else:
+            return None, {'detail': 'Expected a list of ids or a filter.'}
+
+        values, errors = DevicesService.clean_changes(changes)
+        if errors:
+            return None, errors
+        return {'updated': DevicesService.bulk_update(queryset, values, request.user)}, None
+
 
 class DeviceSoftwaresSerializer(serializers.ModelSerializer):
     """
@@ -1481,7 +1732,7 @@ class DeviceSoftwaresSerializer(serializers.ModelSerializer):
         return instance
 
     
-class NotificationTypesSerializer(serializers.ModelSerializer):
+class NotificationTypesSerializer(UserReferencesMixin, serializers.ModelSerializer):
     """
     Serializer for notification types.
     """
@@ -1554,7 +1805,7 @@ class NotificationTypesSerializer(serializers.ModelSerializer):
             return serializer.data, None
         return None, serializer.errors
 
-class NotificationsSerializer(serializers.ModelSerializer):
+class NotificationsSerializer(UserReferencesMixin, serializers.ModelSerializer):
     """
     Serializer for notifications.
     """
@@ -1647,3 +1898,34 @@ class UserSettingsSerializer(serializers.ModelSerializer):
             'date_format_month', 'date_format_year', 'timezone', 'time_24h')
         read_only_fields = ('id',)
 
+
+class AutocompleteSerializer(serializers.Serializer):
+    """
+    Serializer for the type-ahead search query parameters.
+    """
+    q = serializers.CharField(trim_whitespace=True)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=SearchService.MAX_LIMIT,
+        default=SearchService.DEFAULT_LIMIT
+    )
+
+    def validate_q(self, value):
+        settings = AppSettings.get_solo()
+        if len(value) < settings.search_min_input_length:
+            raise serializers.ValidationError(
+                f'Ensure this field has at least {settings.search_min_input_length} characters.'
+            )
+        if len(value) > settings.search_max_input_length:
+            raise serializers.ValidationError(
+                f'Ensure this field has no more than {settings.search_max_input_length} characters.'
+            )
+        return value
+
+    @classmethod
+    def search(cls, request, source):
+        serializer = cls(data=request.query_params)
+        if not serializer.is_valid():
+            return None, serializer.errors
+        results = SearchService.search(source, serializer.validated_data['q'], serializer.validated_data['limit'])
+        return {'results': results}, None
@@ -8,10 +8,11 @@ from django.utils.encoding import force_bytes
 from django.core.mail import send_mail
 from rest_framework import serializers, status
 from rest_framework.exceptions import AuthenticationFailed
-from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from rest_framework_simplejwt.tokens import AccessToken
 
 from api.models import UserProfile
 from api.services.mail import MailService
+from api.tokens import RotatingRefreshToken
 
 
 class AuthService:
@@ -107,8 +108,6 @@ class AuthService:
                 raise serializers.ValidationError('Invalid username or password.')
             if not user.is_active:
                 raise AuthenticationFailed('User is inactive. Hold on while we reactivate your account.')
-
-            user.password = data['password']
             data['user'] = user
 
         elif action == 'refresh_token':
@@ -166,16 +165,10 @@ class AuthService:
 
     @staticmethod
     def login(cls, UserSerializer) -> dict:
-        validated_data = cls.validated_data
-        username = validated_data.get('username')
-        password = validated_data.get('password')
-        user = authenticate(username=username, password=password)
-        if not user:
-            raise AuthenticationFailed("Invalid credentials.")
-        if not user.is_active:
-            raise AuthenticationFailed("User is inactive. Hold on while we reactivate your account.")
+        # The credentials were checked once in validate()
+        user = cls.validated_data['user']
         access_token = AccessToken.for_user(user)
-        refresh_token = RefreshToken.for_user(user)
+        refresh_token = RotatingRefreshToken.for_user(user)
         user_data = UserSerializer(user).data
         return {
             'access': str(access_token),
@@ -233,14 +226,9 @@ class AuthService:
 
     @staticmethod
     def access_token(cls, AuthTokenObtainPairSerializer) -> dict:
-        user = cls.validated_data['user']
-        serializer_token = AuthTokenObtainPairSerializer(data={
-            'username': user.username,
-            'password': cls.validated_data.get('password')
-        })
-        if serializer_token.is_valid():
-            return serializer_token.validated_data
-        return {"error": "Invalid credentials."}
+        # The credentials were checked once in validate(), so the tokens are
+        # issued without running the password hasher again
+        return AuthTokenObtainPairSerializer.for_user(cls.validated_data['user'])
 
     @staticmethod
     def refresh_token(cls, AuthTokenRefreshSerializer) -> dict:
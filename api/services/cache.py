@@ -0,0 +1,63 @@
+import hashlib
+from uuid import uuid4
+
+from django.core.cache import cache
+
+
+class CacheService:
+    """
+    Write generations for models, used to version cached data.
+
+    Every model has an opaque generation token that changes on each write
+    (see the post_save/post_delete receivers in api.models). Cache keys that
+    embed the generations of the models they were computed from become
+    unreachable as soon as one of those models is written, so nothing has
+    to be deleted explicitly.
+    """
+    KEY_PREFIX = 'sm'
+
+    @classmethod
+    def generation_key(cls, model) -> str:
+        return f'{cls.KEY_PREFIX}:generation:{model._meta.label_lower}'
+
+    @classmethod
+    def get_generation(cls, model) -> str:
+        return cls.get_generations([model])[model]
+
+    @classmethod
+    def get_generations(cls, models) -> dict:
+        """
+        Returns {model: generation} for the given models, creating missing tokens.
+        """
+        keys = {cls.generation_key(model): model for model in models}
+        found = cache.get_many(list(keys))
+        generations = {}
+        for key, model in keys.items():
+            token = found.get(key)
+            if token is None:
+                cache.add(key, uuid4().hex, timeout=None)
+                token = cache.get(key)
+            generations[model] = token
+        return generations
+
+    @classmethod
+    def bump_generation(cls, *models) -> None:
+        """
+        Invalidates everything cached against the given models. Bulk writes that
+        bypass model signals (QuerySet.update(), bulk_create()) must call it.
+        """
+        cache.set_many(
+            {cls.generation_key(model): uuid4().hex for model in models},
+            timeout=None
+        )
+
+    @classmethod
+    def versioned_key(cls, namespace, models, *parts) -> str:
+        """
+        Builds a cache key bound to the current generations of `models`.
+        """
+        generations = cls.get_generations(models)
+        signature = hashlib.sha1(
+            repr([generations[model] for model in models] + list(parts)).encode('utf-8')
+        ).hexdigest()
+        return f'{cls.KEY_PREFIX}:{namespace}:{signature}'
@@ -0,0 +1,199 @@
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Count, F, Max
+from django.db.models.functions import Coalesce
+
+from api.models import (
+    DeviceTypes, DeviceMarks, DeviceModels, DeviceSystems, DeviceBuilds,
+    DeviceProcessors, DeviceRAMs, DeviceDisks, Softwares, Devices, DeviceSoftwares
+)
+from api.services.cache import CacheService
+
+
+class CatalogCache:
+    """
+    Per-process LRU cache for the catalog tables.
+
+    Entries are keyed by the write generations of the models they were built
+    from (see CacheService), so a write in any process makes them unreachable
+    and they age out of the LRU. At most `MAX_ENTRIES` entries are kept.
+    """
+    CATALOGS = {
+        'device_types': DeviceTypes,
+        'device_marks': DeviceMarks,
+        'device_models': DeviceModels,
+        'device_systems': DeviceSystems,
+        'device_builds': DeviceBuilds,
+        'device_processors': DeviceProcessors,
+        'device_rams': DeviceRAMs,
+        'device_disks': DeviceDisks,
+        'softwares': Softwares,
+    }
+    MODELS = tuple(CATALOGS.values())
+    DEVICE_RELATIONS = {
+        DeviceTypes: 'type',
+        DeviceMarks: 'mark',
+        DeviceModels: 'model',
+        DeviceSystems: 'system',
+        DeviceBuilds: 'build',
+        DeviceProcessors: 'processor',
+        DeviceRAMs: 'ram',
+        DeviceDisks: 'disk',
+    }
+    BOOTSTRAP_FIELDS = ('id', 'title', 'code_name', 'status', 'is_deprecated', 'sort_order')
+    MAX_ENTRIES = getattr(settings, 'CATALOG_CACHE_MAX_ENTRIES', 256)
+
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+    hits = 0
+    misses = 0
+    evictions = 0
+
+    @classmethod
+    def get_or_set(cls, model, key, compute, depends_on=(), generations=None) -> tuple:
+        """
+        Returns (value, hit) for `key` under the current generations of `model`
+        and `depends_on`, calling `compute()` on a miss. Generations already
+        fetched by the caller may be passed in.
+        """
+        models = [model, *depends_on]
+        if generations is None:
+            generations = CacheService.get_generations(models)
+        entry_key = (
+            model._meta.label_lower,
+            tuple(generations[item] for item in models),
+            key
+        )
+        with cls._lock:
+            if entry_key in cls._entries:
+                cls._entries.move_to_end(entry_key)
+                cls.hits += 1
+                return cls._entries[entry_key], True
+            cls.misses += 1
+
+        value = compute()
+        with cls._lock:
+            cls._entries[entry_key] = value
+            cls._entries.move_to_end(entry_key)
+            while len(cls._entries) > cls.MAX_ENTRIES:
+                cls._entries.popitem(last=False)
+                cls.evictions += 1
+        return value, False
+
+    @classmethod
+    def get_instances(cls, model) -> dict:
+        """
+        Returns {pk: instance} with every row of a catalog model.
+        """
+        instances, hit = cls.get_or_set(
+            model,
+            'instances',
+            lambda: {instance.pk: instance for instance in model.objects.all()}
+        )
+        return instances
+
+    @classmethod
+    def get_instance(cls, model, pk):
+        """
+        Returns a copy of the cached row with primary key `pk`, or None.
+        """
+        try:
+            pk = model._meta.pk.to_python(pk)
+        except ValidationError:
+            return None
+        instance = cls.get_instances(model).get(pk)
+        if instance is None:
+            return None
+        return copy.copy(instance)
+
+    @classmethod
+    def usage_models(cls, model) -> tuple:
+        """
+        Models whose writes change the usage of `model` entries.
+        """
+        if model is Softwares:
+            return (Devices, DeviceSoftwares)
+        if model in cls.DEVICE_RELATIONS:
+            return (Devices,)
+        return ()
+
+    @classmethod
+    def get_usage(cls, model) -> dict:
+        """
+        Returns {pk: {'devices_count': ..., 'last_used_at': ...}} for the entries
+        of a catalog used by at least one device, from one GROUP BY query cached
+        until the next device write. `last_used_at` is the latest device write
+        (or installation, for softwares) referencing the entry.
+        """
+        if model is Softwares:
+            rows = DeviceSoftwares.objects.order_by().values_list('software').annotate(
+                devices_count=Count('id'),
+                last_used_at=Max('installed_at')
+            )
+        else:
+            rows = Devices.objects.order_by().values_list(cls.DEVICE_RELATIONS[model]).annotate(
+                devices_count=Count('id'),
+                last_used_at=Max(Coalesce('updated_at', 'created_at'))
+            )
+        usage, hit = cls.get_or_set(
+            model,
+            'usage',
+            lambda: {
+                pk: {'devices_count': count, 'last_used_at': last_used_at}
+                for pk, count, last_used_at in rows
+            },
+            depends_on=cls.usage_models(model)
+        )
+        return usage
+
+    @classmethod
+    def get_bootstrap(cls) -> tuple:
+        """
+        Returns (version, catalogs) with the compact rows of every catalog. The
+        version hashes the catalog generations, so it changes on any write.
+        """
+        generations = CacheService.get_generations(cls.MODELS)
+        version = hashlib.sha1(
+            ''.join(generations[model] for model in cls.MODELS).encode('utf-8')
+        ).hexdigest()
+        catalogs = {}
+        for name, model in cls.CATALOGS.items():
+            rows, hit = cls.get_or_set(
+                model,
+                'bootstrap',
+                lambda model=model: cls._compact_rows(model),
+                generations=generations
+            )
+            catalogs[name] = rows
+        return version, catalogs
+
+    @classmethod
+    def _compact_rows(cls, model) -> list:
+        fields = [name for name in cls.BOOTSTRAP_FIELDS if any(f.name == name for f in model._meta.fields)]
+        if model is Softwares:
+            fields.append('version')
+        return list(
+            model.objects.order_by(F('sort_order').asc(nulls_last=True), 'title', 'id').values(*fields)
+        )
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            return {
+                'hits': cls.hits,
+                'misses': cls.misses,
+                'evictions': cls.evictions,
+                'size': len(cls._entries),
+                'max_entries': cls.MAX_ENTRIES,
+            }
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._entries.clear()
+            cls.hits = cls.misses = cls.evictions = 0
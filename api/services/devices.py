@@ -0,0 +1,291 @@
+import csv
+import io
+
+from collections import Counter
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from api.models import (
+    Locations, DeviceTypes, DeviceMarks, DeviceModels, DeviceSystems,
+    DeviceBuilds, DeviceProcessors, DeviceRAMs, DeviceDisks, Devices, DeviceStats
+)
+from api.services.cache import CacheService
+from api.services.fulltext import DeviceSearchIndex
+
+
+class DevicesService:
+    """
+    Set-based operations over many devices at once.
+    """
+    RELATIONS = {
+        'type': DeviceTypes,
+        'mark': DeviceMarks,
+        'model': DeviceModels,
+        'system': DeviceSystems,
+        'build': DeviceBuilds,
+        'processor': DeviceProcessors,
+        'ram': DeviceRAMs,
+        'disk': DeviceDisks,
+        'location': Locations,
+    }
+    IMPORT_FIELDS = (
+        'internal_id', 'hostname', 'status', 'disk_internal_id', 'disk_serial',
+        'network_ipv4', 'network_ipv6', 'network_mac', 'remote_id', 'serial',
+        'sector', 'user_owner', 'notes', 'sort_order',
+    )
+    IMPORT_MAX_ROWS = 10000
+    IMPORT_BATCH_SIZE = 500
+    BULK_UPDATE_FIELDS = ('status', 'sector', 'user_owner', 'notes', 'sort_order')
+    # DeviceStats dimension -> the device column it follows
+    STATS_FIELDS = {
+        'status': 'status',
+        'type': 'type_id',
+        'location_zone': 'location_id',
+        'system': 'system_id',
+    }
+
+    @staticmethod
+    def read_csv(upload) -> list:
+        """
+        Returns the rows of an uploaded CSV file as dicts keyed by the header.
+        """
+        content = upload.read()
+        if isinstance(content, bytes):
+            content = content.decode('utf-8-sig')
+        return list(csv.DictReader(io.StringIO(content)))
+
+    @classmethod
+    def resolve_references(cls, rows) -> dict:
+        """
+        Returns {relation: {reference: id or None}} for every relation value in
+        `rows`, with one query per catalog. References are ('id', pk) for
+        integer values and `<relation>_id` columns, and ('title', text) for
+        other text; titles shared by several entries resolve to None
+        (ambiguous).
+        """
+        resolved = {}
+        for name, model in cls.RELATIONS.items():
+            ids, titles = set(), set()
+            for row in rows:
+                reference = cls._relation_reference(row, name)
+                if reference is None:
+                    continue
+                kind, value = reference
+                if kind == 'title':
+                    titles.add(value)
+                elif isinstance(value, int):
+                    ids.add(value)
+            references = {}
+            if ids or titles:
+                found = model.objects.filter(Q(pk__in=ids) | Q(title__in=titles)).values_list('id', 'title')
+                for pk, title in found:
+                    if pk in ids:
+                        references[('id', pk)] = pk
+                    if title in titles:
+                        references[('title', title)] = None if ('title', title) in references else pk
+            resolved[name] = references
+        return resolved
+
+    @classmethod
+    def get_reference_error(cls, resolved, reference) -> list:
+        message = 'Ambiguous title.' if reference in resolved else 'Not found.'
+        return [f'{message} ({reference[1]})']
+
+    @classmethod
+    def build_device(cls, row, resolved, user, now):
+        """
+        Returns (device, errors) for one import row. Validation runs in Python only;
+        relations were resolved beforehand.
+        """
+        errors = {}
+        values = {}
+        for name in cls.IMPORT_FIELDS:
+            value = row.get(name)
+            if isinstance(value, str):
+                value = value.strip()
+            if value not in (None, ''):
+                values[name] = value
+        values.setdefault('status', 1)
+        for name in cls.RELATIONS:
+            reference = cls._relation_reference(row, name)
+            if reference is None:
+                errors[name] = ['This field is required.']
+                continue
+            pk = resolved[name].get(reference)
+            if pk is None:
+                errors[name] = cls.get_reference_error(resolved[name], reference)
+                continue
+            values[f'{name}_id'] = pk
+
+        device = Devices(creator=user, created_at=now, updater=None, updated_at=None, **values)
+        try:
+            device.full_clean(
+                exclude=list(cls.RELATIONS) + ['creator', 'updater'],
+                validate_unique=False,
+                validate_constraints=False
+            )
+        except ValidationError as e:
+            errors.update(e.message_dict)
+        return device, errors
+
+    @classmethod
+    def import_devices(cls, rows, user, dry_run=False) -> tuple:
+        """
+        Validates every row and, when all of them are valid, inserts them with
+        batched bulk_create() calls in one transaction.
+        Returns (report, has_errors).
+        """
+        report = {'dry_run': dry_run, 'total': len(rows), 'valid': 0, 'created': 0, 'errors': []}
+        if len(rows) > cls.IMPORT_MAX_ROWS:
+            report['errors'].append({
+                'row': None,
+                'errors': {'detail': [f'At most {cls.IMPORT_MAX_ROWS} rows per import.']}
+            })
+            return report, True
+
+        resolved = cls.resolve_references(rows)
+        now = timezone.now()
+        devices = []
+        for index, row in enumerate(rows, start=1):
+            if not isinstance(row, dict):
+                report['errors'].append({'row': index, 'errors': {'detail': ['Expected an object.']}})
+                continue
+            device, errors = cls.build_device(row, resolved, user, now)
+            if errors:
+                report['errors'].append({'row': index, 'errors': errors})
+            devices.append(device)
+        report['valid'] = len(rows) - len(report['errors'])
+
+        if report['errors'] or dry_run:
+            return report, bool(report['errors'])
+
+        # One transaction for the whole import: a failing batch rolls back the
+        # batches before it along with the counters and stats
+        try:
+            with transaction.atomic():
+                for start in range(0, len(devices), cls.IMPORT_BATCH_SIZE):
+                    batch = Devices.objects.bulk_create(devices[start:start + cls.IMPORT_BATCH_SIZE])
+                    DeviceSearchIndex.refresh(Devices.objects.filter(pk__in=[device.pk for device in batch]))
+                # bulk_create() skips the signals that keep counters, stats, caches and the search index current
+                Locations.recount_devices({device.location_id for device in devices})
+                DeviceStats.adjust_groups(cls.stats_counts(devices))
+        except IntegrityError as e:
+            report['errors'].append({'row': None, 'errors': {'detail': [f'Nothing was imported: {e}']}})
+            return report, True
+        report['created'] = len(devices)
+        CacheService.bump_generation(Devices)
+        return report, False
+
+    @classmethod
+    def clean_changes(cls, changes) -> tuple:
+        """
+        Returns (values, errors) for a bulk update: model field values keyed by
+        column, with relations resolved by id or title.
+        """
+        values, errors = {}, {}
+        allowed = set(cls.BULK_UPDATE_FIELDS) | set(cls.RELATIONS)
+        for name in changes:
+            key = name[:-3] if name.endswith('_id') and name[:-3] in cls.RELATIONS else name
+            if key not in allowed:
+                errors[name] = ['This field cannot be changed in bulk.']
+
+        resolved = cls.resolve_references([changes])
+        for name in cls.RELATIONS:
+            reference = cls._relation_reference(changes, name)
+            if reference is None:
+                continue
+            pk = resolved[name].get(reference)
+            if pk is None:
+                errors[name] = cls.get_reference_error(resolved[name], reference)
+            else:
+                values[f'{name}_id'] = pk
+
+        for name in cls.BULK_UPDATE_FIELDS:
+            if name not in changes:
+                continue
+            field = Devices._meta.get_field(name)
+            value = changes[name]
+            if value == '' and field.null:
+                value = None
+            try:
+                values[name] = field.clean(value, None)
+            except ValidationError as e:
+                errors[name] = e.messages
+        return values, errors
+
+    @classmethod
+    def bulk_update(cls, queryset, values, user) -> int:
+        """
+        Applies `values` to every device in `queryset` with one set-based UPDATE
+        and returns the number of affected rows.
+        """
+        indexed = set(DeviceSearchIndex.DOCUMENT_FIELDS) | {f'{name}_id' for name in DeviceSearchIndex.RELATIONS}
+        with transaction.atomic():
+            previous_locations = set()
+            if 'location_id' in values:
+                previous_locations = set(queryset.order_by().values_list('location_id', flat=True).distinct())
+            ids = []
+            if indexed & set(values):
+                ids = list(queryset.order_by('id').values_list('id', flat=True))
+            dimensions = [name for name, field in cls.STATS_FIELDS.items() if field in values]
+            stats = DeviceStats.group_counts(queryset, dimensions)
+            updated = queryset.update(updater=user, updated_at=timezone.now(), **values)
+            for start in range(0, len(ids), cls.IMPORT_BATCH_SIZE):
+                DeviceSearchIndex.refresh(Devices.objects.filter(pk__in=ids[start:start + cls.IMPORT_BATCH_SIZE]))
+            for dimension, groups in stats.items():
+                value = values[cls.STATS_FIELDS[dimension]]
+                if dimension == 'location_zone':
+                    value = DeviceStats.get_zone(value)
+                groups = Counter({group: -count for group, count in groups.items()})
+                groups[value] += updated
+                stats[dimension] = groups
+            DeviceStats.adjust_groups(stats)
+
+        # QuerySet.update() skips the signals that keep counters, stats, caches and the search index current
+        if previous_locations:
+            Locations.recount_devices(previous_locations | {values['location_id']})
+        CacheService.bump_generation(Devices)
+        return updated
+
+    @classmethod
+    def stats_counts(cls, devices) -> dict:
+        """
+        Returns the DeviceStats groups of `devices` as {dimension: {value: count}}.
+        """
+        zones = dict(
+            Locations.objects.filter(pk__in={device.location_id for device in devices})
+            .values_list('pk', 'location_zone_id')
+        )
+        counts = {dimension: Counter() for dimension in cls.STATS_FIELDS}
+        for device in devices:
+            counts['status'][device.status] += 1
+            counts['type'][device.type_id] += 1
+            counts['location_zone'][zones.get(device.location_id)] += 1
+            counts['system'][device.system_id] += 1
+        return counts
+
+    @staticmethod
+    def _relation_reference(row, name):
+        """
+        Returns the ('id', pk) or ('title', text) reference of a relation in
+        `row`, or None. Only integers and `<name>_id` columns are ids, so a
+        title made of digits still matches by title.
+        """
+        if not isinstance(row, dict):
+            return None
+        by_id = name not in row
+        value = row.get(f'{name}_id') if by_id else row.get(name)
+        if isinstance(value, str):
+            value = value.strip()
+        if value in (None, '') or isinstance(value, bool):
+            return None
+        if isinstance(value, int):
+            return ('id', value)
+        if not isinstance(value, str):
+            return None
+        if by_id:
+            return ('id', int(value) if value.isdigit() else value)
+        return ('title', value)
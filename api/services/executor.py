@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+
+class AuthExecutorBusy(Exception):
+    """
+    Raised when the auth executor queue is full.
+    """
+
+
+class AuthExecutor:
+    """
+    Bounded thread pool for the auth endpoints that hash passwords.
+
+    Under ASGI, Django runs every sync view of a worker on one shared thread,
+    so a login burst (one PBKDF2 hash each) would stall the ordinary API
+    reads queued behind it. Those endpoints run here instead: at most
+    `MAX_WORKERS` at a time, with up to `MAX_QUEUE` more waiting and the rest
+    rejected at once. Queue and run times are kept for metrics().
+
+    Each pool thread holds its own database connection, cleaned up around
+    every call as Django does for a request. With `MAX_WORKERS = 0` the calls
+    run inline on the shared sync thread, as a plain sync view would.
+    """
+    MAX_WORKERS = getattr(settings, 'AUTH_EXECUTOR_WORKERS', 2)
+    MAX_QUEUE = getattr(settings, 'AUTH_EXECUTOR_QUEUE', 32)
+
+    _executor = None
+    _lock = threading.Lock()
+    _stats = {}
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=cls.MAX_WORKERS, thread_name_prefix='auth-executor')
+            return cls._executor
+
+    @classmethod
+    async def run(cls, func, *args, **kwargs):
+        """
+        Runs func(*args, **kwargs) in the pool and returns its result along
+        with the seconds it waited for a thread. Raises AuthExecutorBusy when
+        the queue is full.
+        """
+        if cls.MAX_WORKERS <= 0:
+            return await sync_to_async(func, thread_sensitive=True)(*args, **kwargs), 0.0
+
+        with cls._lock:
+            if cls._stats.get('pending', 0) >= cls.MAX_WORKERS + cls.MAX_QUEUE:
+                cls._record(rejected=1)
+                raise AuthExecutorBusy()
+            cls._record(pending=1)
+        queued_at = time.monotonic()
+        timings = {}
+
+        def call():
+            started_at = time.monotonic()
+            timings['queue'] = started_at - queued_at
+            close_old_connections()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                close_old_connections()
+                timings['run'] = time.monotonic() - started_at
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(cls.get_executor(), call)
+        finally:
+            with cls._lock:
+                cls._record(pending=-1, completed=1)
+                cls._record_time('queue', timings.get('queue', time.monotonic() - queued_at))
+                cls._record_time('run', timings.get('run', 0.0))
+        return result, timings['queue']
+
+    @classmethod
+    def _record(cls, **deltas) -> None:
+        for name, delta in deltas.items():
+            cls._stats[name] = cls._stats.get(name, 0) + delta
+
+    @classmethod
+    def _record_time(cls, name, seconds) -> None:
+        cls._stats[f'{name}_total'] = cls._stats.get(f'{name}_total', 0.0) + seconds
+        cls._stats[f'{name}_max'] = max(cls._stats.get(f'{name}_max', 0.0), seconds)
+
+    @classmethod
+    def metrics(cls) -> dict:
+        """
+        Returns the pool size and limits, the calls pending (queued or
+        running), completed and rejected, and the average and maximum queue
+        and run times in milliseconds since the worker started.
+        """
+        with cls._lock:
+            stats = dict(cls._stats)
+        completed = stats.get('completed', 0)
+        return {
+            'workers': cls.MAX_WORKERS,
+            'queue_limit': cls.MAX_QUEUE,
+            'pending': stats.get('pending', 0),
+            'completed': completed,
+            'rejected': stats.get('rejected', 0),
+            'queue_time_avg_ms': round(stats.get('queue_total', 0.0) / completed * 1000, 2) if completed else 0.0,
+            'queue_time_max_ms': round(stats.get('queue_max', 0.0) * 1000, 2),
+            'run_time_avg_ms': round(stats.get('run_total', 0.0) / completed * 1000, 2) if completed else 0.0,
+            'run_time_max_ms': round(stats.get('run_max', 0.0) * 1000, 2),
+        }
+
+    @classmethod
+    def reset_metrics(cls) -> None:
+        with cls._lock:
+            cls._stats = {'pending': cls._stats.get('pending', 0)}
@@ -0,0 +1,170 @@
+from django.db import connections
+from django.db.models import F, Func, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+
+class DeviceSearchIndex:
+    """
+    Full-text index over the device inventory fields and the titles of the
+    related catalogs, kept in a shadow table:
+    - PostgreSQL: `api_devices_search` (device_id, tsvector) with a GIN index.
+    - SQLite: the FTS5 table `api_devices_fts`, keyed by the device id (rowid).
+    Other backends have no index and fall back to icontains lookups.
+
+    Rows are rebuilt with set-based INSERT ... SELECT statements, so refreshing
+    every device of a renamed catalog is one statement. The receivers in
+    api.models keep the index current on device and catalog writes; bulk
+    paths call refresh() themselves and `rebuild_search_index` rebuilds it.
+    """
+    POSTGRESQL_TABLE = 'api_devices_search'
+    SQLITE_TABLE = 'api_devices_fts'
+    TS_CONFIG = 'simple'
+    DOCUMENT_FIELDS = (
+        'hostname', 'internal_id', 'serial', 'disk_serial', 'network_mac',
+        'network_ipv4', 'user_owner', 'sector', 'notes',
+        'type__title', 'mark__title', 'model__title', 'system__title',
+        'build__title', 'processor__title', 'ram__title', 'disk__title',
+        'location__title',
+    )
+    RELATIONS = tuple(name.split('__')[0] for name in DOCUMENT_FIELDS if '__' in name)
+    MAX_TERMS = 8
+    REBUILD_BATCH_SIZE = 5000
+
+    @classmethod
+    def is_supported(cls, connection) -> bool:
+        return connection.vendor in ('postgresql', 'sqlite')
+
+    @classmethod
+    def refresh(cls, queryset) -> None:
+        """
+        Rebuilds the index rows of every device in `queryset`.
+        """
+        connection = connections[queryset.db]
+        if not cls.is_supported(connection):
+            return
+        documents = queryset.order_by().annotate(
+            search_document=cls.document_expression()
+        ).values_list('id', 'search_document')
+        sql, params = documents.query.sql_with_params()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    f'INSERT INTO {cls.POSTGRESQL_TABLE} (device_id, document) '
+                    f'SELECT source.id, to_tsvector(%s, source.search_document) FROM ({sql}) AS source '
+                    f'ON CONFLICT (device_id) DO UPDATE SET document = EXCLUDED.document',
+                    (cls.TS_CONFIG, *params)
+                )
+            else:
+                ids_sql, ids_params = queryset.order_by().values('id').query.sql_with_params()
+                cursor.execute(f'DELETE FROM {cls.SQLITE_TABLE} WHERE rowid IN ({ids_sql})', ids_params)
+                cursor.execute(
+                    f'INSERT INTO {cls.SQLITE_TABLE} (rowid, document) '
+                    f'SELECT source.id, source.search_document FROM ({sql}) AS source',
+                    params
+                )
+
+    @classmethod
+    def remove(cls, ids, using='default') -> None:
+        """
+        Drops the index rows of the given device ids.
+        """
+        connection = connections[using]
+        ids = list(ids)
+        if not ids or not cls.is_supported(connection):
+            return
+        table, column = (
+            (cls.POSTGRESQL_TABLE, 'device_id') if connection.vendor == 'postgresql'
+            else (cls.SQLITE_TABLE, 'rowid')
+        )
+        placeholders = ', '.join(['%s'] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table} WHERE {column} IN ({placeholders})', ids)
+
+    @classmethod
+    def rebuild(cls, queryset, batch_size=None) -> int:
+        """
+        Empties the index and refreshes it in id batches, keeping each
+        statement short on large tables. Returns the number of devices indexed.
+        """
+        connection = connections[queryset.db]
+        if not cls.is_supported(connection):
+            return 0
+        table = cls.POSTGRESQL_TABLE if connection.vendor == 'postgresql' else cls.SQLITE_TABLE
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table}')
+        batch_size = batch_size or cls.REBUILD_BATCH_SIZE
+        ids = queryset.order_by('id').values_list('id', flat=True)
+        total, last_id = 0, None
+        while True:
+            batch = ids if last_id is None else ids.filter(id__gt=last_id)
+            batch = list(batch[:batch_size])
+            if not batch:
+                return total
+            cls.refresh(queryset.filter(id__gte=batch[0], id__lte=batch[-1]))
+            total += len(batch)
+            last_id = batch[-1]
+
+    @classmethod
+    def search(cls, queryset, text, ranked=True):
+        """
+        Narrows `queryset` to the devices matching every term of `text`, as
+        prefixes. With `ranked`, the rows are annotated with `search_rank`
+        (higher is better) and ordered by it.
+        """
+        terms = text.split()[:cls.MAX_TERMS]
+        if not terms:
+            return queryset
+        connection = connections[queryset.db]
+        if not cls.is_supported(connection):
+            return cls._fallback_search(queryset, terms)
+
+        device_id = f'{connection.ops.quote_name(queryset.model._meta.db_table)}.{connection.ops.quote_name("id")}'
+        if connection.vendor == 'postgresql':
+            query = ' & '.join(
+                "'" + term.replace('\\', '\\\\').replace("'", "''") + "':*" for term in terms
+            )
+            matches = RawSQL(
+                f'SELECT device_id FROM {cls.POSTGRESQL_TABLE} WHERE document @@ to_tsquery(%s, %s)',
+                (cls.TS_CONFIG, query)
+            )
+            rank = RawSQL(
+                f'SELECT ts_rank(document, to_tsquery(%s, %s)) FROM {cls.POSTGRESQL_TABLE} '
+                f'WHERE device_id = {device_id}',
+                (cls.TS_CONFIG, query)
+            )
+        else:
+            query = ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
+            matches = RawSQL(f'SELECT rowid FROM {cls.SQLITE_TABLE} WHERE {cls.SQLITE_TABLE} MATCH %s', (query,))
+            # FTS5 ranks with bm25(), where lower is better
+            rank = RawSQL(
+                f'SELECT -rank FROM {cls.SQLITE_TABLE} WHERE {cls.SQLITE_TABLE} MATCH %s AND rowid = {device_id}',
+                (query,)
+            )
+
+        queryset = queryset.filter(id__in=matches)
+        if ranked:
+            queryset = queryset.annotate(search_rank=rank).order_by('-search_rank', '-id')
+        return queryset
+
+    @classmethod
+    def _fallback_search(cls, queryset, terms):
+        for term in terms:
+            condition = Q()
+            for name in cls.DOCUMENT_FIELDS:
+                condition |= Q(**{f'{name}__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+    @classmethod
+    def document_expression(cls):
+        """
+        The document text: every field joined with spaces in one flat || chain
+        (nested Concat() pairs overflow the SQLite parser at this width).
+        """
+        return Func(
+            *[Coalesce(F(name), Value(''), output_field=TextField()) for name in cls.DOCUMENT_FIELDS],
+            template='(%(expressions)s)',
+            arg_joiner=" || ' ' || ",
+            output_field=TextField()
+        )
@@ -0,0 +1,115 @@
+from django.db import connections
+from django.db.models import F
+from django.db.models.functions import Collate, Upper
+
+from api.models import Devices
+from api.services.catalog import CatalogCache
+
+
+class SearchService:
+    """
+    Case-insensitive prefix search for the type-ahead pickers.
+
+    Catalogs are small and already cached per process (see CatalogCache), so
+    they are matched in memory. Devices are matched in the database, one
+    query per searched column, each served by the prefix index built on
+    `prefix_key()` (see AddPrefixSearchIndex) and stopped after `limit` rows.
+    """
+    CATALOG_FIELDS = ('title', 'code_name')
+    CATALOG_VALUES = ('id', 'title', 'code_name')
+    DEVICE_FIELDS = ('internal_id', 'hostname', 'serial')
+    DEVICE_VALUES = ('id', 'internal_id', 'hostname', 'serial', 'status')
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 50
+
+    @classmethod
+    def sources(cls) -> dict:
+        """
+        Returns {source: model} keyed by the URL names of the searchable resources.
+        """
+        sources = {name.replace('_', '-'): model for name, model in CatalogCache.CATALOGS.items()}
+        sources['devices'] = Devices
+        return sources
+
+    @staticmethod
+    def prefix_key(field, vendor):
+        """
+        Returns the expression the prefix indexes are built on, which searches
+        filter and order by so the index serves both:
+        - PostgreSQL: UPPER(field) in the "C" collation, where LIKE 'ABC%' is
+          an index range scan (the equivalent of text_pattern_ops).
+        - SQLite: field COLLATE NOCASE, which the LIKE optimization requires.
+        - Oracle: UPPER(field), matching its istartswith lookup.
+        - MySQL: the column itself; the default collations are case-insensitive.
+        """
+        if vendor == 'postgresql':
+            return Collate(Upper(field), 'C')
+        if vendor == 'sqlite':
+            return Collate(F(field), 'nocase')
+        if vendor == 'oracle':
+            return Upper(field)
+        return F(field)
+
+    @classmethod
+    def search(cls, source, term, limit) -> list:
+        model = cls.sources()[source]
+        if model is Devices:
+            return cls.search_devices(term, limit)
+        return cls.search_catalog(model, term, limit)
+
+    @classmethod
+    def search_catalog(cls, model, term, limit) -> list:
+        """
+        Returns the first `limit` catalog rows whose title or code_name starts with `term`.
+        """
+        rows, hit = CatalogCache.get_or_set(model, 'autocomplete', lambda: cls._catalog_rows(model))
+        needle = term.casefold()
+        matches = []
+        for keys, row in rows:
+            if any(key.startswith(needle) for key in keys):
+                matches.append(row)
+                if len(matches) == limit:
+                    break
+        return matches
+
+    @classmethod
+    def search_devices(cls, term, limit) -> list:
+        """
+        Returns the first `limit` devices whose internal_id, hostname or serial
+        starts with `term`, ordered by the matched value.
+        """
+        matches = {}
+        for field in cls.DEVICE_FIELDS:
+            queryset = cls.prefix_queryset(Devices.objects.all(), field, term)
+            for row in queryset.values(*cls.DEVICE_VALUES)[:limit]:
+                key = (row[field].casefold(), row['id'])
+                if row['id'] not in matches or key < matches[row['id']][0]:
+                    matches[row['id']] = (key, row)
+        ordered = sorted(matches.values(), key=lambda match: match[0])
+        return [row for key, row in ordered[:limit]]
+
+    @classmethod
+    def prefix_queryset(cls, queryset, field, term):
+        """
+        Narrows `queryset` to the rows whose `field` starts with `term`, in prefix index order.
+        """
+        vendor = connections[queryset.db].vendor
+        queryset = queryset.alias(search_key=cls.prefix_key(field, vendor))
+        if vendor in ('postgresql', 'oracle'):
+            queryset = queryset.filter(search_key__startswith=term.upper())
+        else:
+            queryset = queryset.filter(**{f'{field}__istartswith': term})
+        return queryset.order_by('search_key', 'id')
+
+    @classmethod
+    def _catalog_rows(cls, model) -> list:
+        """
+        Returns [(search keys, row)] for every catalog row, ordered by title.
+        """
+        rows = []
+        for instance in CatalogCache.get_instances(model).values():
+            row = {name: getattr(instance, name) for name in cls.CATALOG_VALUES}
+            keys = tuple(row[name].casefold() for name in cls.CATALOG_FIELDS if row[name])
+            rows.append((keys, row))
+        rows.sort(key=lambda item: ((item[1]['title'] or '').casefold(), item[1]['id']))
+        return rows
@@ -0,0 +1,86 @@
+import copy
+import threading
+import time
+
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+from api.services.cache import CacheService
+
+
+class SettingsCache:
+    """
+    Cache for the settings singletons (AppSettings, UserSettings).
+
+    The row lives in the shared cache under the model's current version, an
+    opaque token replaced on every save (see the receivers in api.models), so
+    a row written back by a reader that loaded it just before a save is never
+    read again. Each worker memoizes the row for `LOCAL_TTL` seconds so hot
+    paths read it without any I/O. A save in a worker drops its own copy at
+    once; the other workers reload the row within `LOCAL_TTL` seconds.
+    """
+    LOCAL_TTL = getattr(settings, 'SETTINGS_CACHE_LOCAL_TTL', 5)
+    # Rows of replaced versions are unreachable and expire after this
+    TTL = 24 * 3600
+
+    _local = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def version_key(cls, model) -> str:
+        return f'{CacheService.KEY_PREFIX}:settings:{model._meta.label_lower}:version'
+
+    @classmethod
+    def key(cls, model, version) -> str:
+        return f'{CacheService.KEY_PREFIX}:settings:{model._meta.label_lower}:{version}'
+
+    @classmethod
+    def get_version(cls, model) -> str:
+        key = cls.version_key(model)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, uuid4().hex, timeout=None)
+            version = cache.get(key)
+        return version
+
+    @classmethod
+    def get(cls, model):
+        """
+        Returns a copy of the singleton row of `model`, creating it when missing.
+        """
+        now = time.monotonic()
+        entry = cls._local.get(model)
+        if entry is None or entry[0] <= now:
+            version = cls.get_version(model)
+            instance = cache.get(cls.key(model, version))
+            if instance is None:
+                # A row read across a save (the one creating it included) is
+                # read again under the new version before it is shared
+                for _ in range(2):
+                    instance = model.load_solo()
+                    current = cls.get_version(model)
+                    if current == version:
+                        cache.set(cls.key(model, version), instance, timeout=cls.TTL)
+                        break
+                    version = current
+            entry = (now + cls.LOCAL_TTL, instance)
+            with cls._lock:
+                cls._local[model] = entry
+        return copy.copy(entry[1])
+
+    @classmethod
+    def invalidate(cls, model) -> None:
+        """
+        Replaces the version of `model` in the shared cache and drops the row
+        of this worker.
+        """
+        cache.set(cls.version_key(model), uuid4().hex, timeout=None)
+        with cls._lock:
+            cls._local.pop(model, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._local.clear()
@@ -0,0 +1,48 @@
+from api.models import DeviceStats, DeviceSystems, DeviceTypes, LocationZones
+from api.services.catalog import CatalogCache
+
+
+class StatsService:
+    """
+    Dashboard summary of the device inventory, read from DeviceStats so its
+    cost follows the number of groups rather than the number of devices.
+    """
+    # Dimension -> model its values point to; status values are plain integers
+    TITLED_DIMENSIONS = {
+        'type': DeviceTypes,
+        'location_zone': LocationZones,
+        'system': DeviceSystems,
+    }
+
+    @classmethod
+    def get_summary(cls) -> dict:
+        """
+        Returns the device total and, per dimension, the non-empty groups
+        ordered by count: [{value, title, devices_count}].
+        """
+        groups = {dimension: [] for dimension in DeviceStats.DIMENSIONS}
+        rows = DeviceStats.objects.filter(devices_count__gt=0).order_by('-devices_count', 'value')
+        for dimension, value, devices_count in rows.values_list('dimension', 'value', 'devices_count'):
+            if dimension in groups:
+                groups[dimension].append({'value': value, 'title': None, 'devices_count': devices_count})
+
+        for dimension, model in cls.TITLED_DIMENSIONS.items():
+            titles = cls.get_titles(model, [group['value'] for group in groups[dimension]])
+            for group in groups[dimension]:
+                group['title'] = titles.get(group['value'])
+
+        summary = {'total': sum(group['devices_count'] for group in groups['status'])}
+        summary.update(groups)
+        return summary
+
+    @staticmethod
+    def get_titles(model, ids) -> dict:
+        """
+        Returns {pk: title}, from the catalog cache where the model is cached.
+        """
+        if not ids:
+            return {}
+        if model in CatalogCache.MODELS:
+            instances = CatalogCache.get_instances(model)
+            return {pk: instances[pk].title for pk in ids if pk in instances}
+        return dict(model.objects.filter(pk__in=ids).values_list('pk', 'title'))
@@ -0,0 +1,164 @@
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from api.services.cache import CacheService
+
+
+class UserCache:
+    """
+    Short-lived shared cache of the users resolved from access tokens.
+
+    Entries are keyed by the user id and the user's current cache version, an
+    opaque token replaced on every save or delete of the user (see the
+    receivers in api.models). Replacing it makes every cached copy
+    unreachable at once in all workers, including a copy written by a reader
+    that loaded the row just before the change. The serialized summaries
+    returned with tokens are versioned the same way.
+    """
+    TTL = getattr(settings, 'USER_CACHE_TTL', 60)
+    # The columns authentication reads; the others (the password hash among
+    # them) stay out of the cache and load on first access
+    FIELDS = ('id', 'username', 'is_active', 'is_staff', 'is_superuser')
+
+    @classmethod
+    def version_key(cls, user_id) -> str:
+        return f'{CacheService.KEY_PREFIX}:user:{user_id}:version'
+
+    @classmethod
+    def key(cls, user_id, version) -> str:
+        return f'{CacheService.KEY_PREFIX}:user:{user_id}:{version}'
+
+    @classmethod
+    def summary_version_key(cls, user_id) -> str:
+        return f'{CacheService.KEY_PREFIX}:user:{user_id}:summary_version'
+
+    @staticmethod
+    def get_token(key) -> str:
+        token = cache.get(key)
+        if token is None:
+            cache.add(key, uuid4().hex, timeout=None)
+            token = cache.get(key)
+        return token
+
+    @classmethod
+    def get_version(cls, user_id) -> str:
+        return cls.get_token(cls.version_key(user_id))
+
+    @classmethod
+    def get(cls, user_id):
+        """
+        Returns the user with primary key `user_id`, or None when it does not
+        exist. Only `FIELDS` are loaded; the other fields are deferred.
+        """
+        key = cls.key(user_id, cls.get_version(user_id))
+        entry = cache.get(key)
+        if entry is None:
+            values = User.objects.filter(pk=user_id).values(*cls.FIELDS, 'password').first()
+            if values is None:
+                return None
+            password = values.pop('password')
+            entry = {'values': values, 'password_digest': None}
+            if jwt_settings.CHECK_REVOKE_TOKEN:
+                entry['password_digest'] = get_md5_hash_password(password)
+            cache.set(key, entry, timeout=cls.TTL)
+        # from_db() takes the values in the model's column order
+        names = [field.attname for field in User._meta.concrete_fields if field.attname in entry['values']]
+        user = User.from_db(User.objects.db, names, [entry['values'][name] for name in names])
+        user._password_digest = entry['password_digest']
+        return user
+
+    @staticmethod
+    def get_password_digest(user) -> str:
+        """
+        Returns the digest of the password hash carried by revocable tokens.
+        """
+        digest = getattr(user, '_password_digest', None)
+        return digest if digest is not None else get_md5_hash_password(user.password)
+
+    @staticmethod
+    def load_deferred(user) -> None:
+        """
+        Loads the fields a cached user left deferred, with one query.
+        """
+        deferred = user.get_deferred_fields()
+        if deferred:
+            user.refresh_from_db(fields=deferred)
+
+    @classmethod
+    def get_summary(cls, user, serialize) -> dict:
+        """
+        Returns `serialize(user)`, cached under the same version as the user
+        and a summary version of its own, so it is rebuilt once the user or
+        its profile changes, last_login stamps included.
+        """
+        summary_version = cls.get_token(cls.summary_version_key(user.pk))
+        key = f'{cls.key(user.pk, cls.get_version(user.pk))}:summary:{summary_version}'
+        summary = cache.get(key)
+        if summary is None:
+            summary = serialize(user)
+            cache.set(key, summary, timeout=cls.TTL)
+        return summary
+
+    @classmethod
+    def invalidate(cls, user_id) -> None:
+        cache.set(cls.version_key(user_id), uuid4().hex, timeout=None)
+
+    @classmethod
+    def invalidate_summary(cls, user_id) -> None:
+        cache.set(cls.summary_version_key(user_id), uuid4().hex, timeout=None)
+
+
+class UserReferences:
+    """
+    Compact references to users ({id, username, display_name, avatar}) for
+    the creator/updater fields, loaded in batches and memoized per request so
+    every user is read once however many rows point to it.
+    """
+    MEMO_ATTRIBUTE = '_user_references'
+
+    @classmethod
+    def get_memo(cls, owner) -> dict:
+        """
+        Returns the {user id: reference} memo kept on `owner` (the request, or
+        the serializer when there is none).
+        """
+        memo = getattr(owner, cls.MEMO_ATTRIBUTE, None)
+        if memo is None:
+            memo = {}
+            setattr(owner, cls.MEMO_ATTRIBUTE, memo)
+        return memo
+
+    @classmethod
+    def load(cls, memo, ids) -> None:
+        """
+        Adds the references of the given user ids missing from `memo`, with one query.
+        """
+        missing = {pk for pk in ids if pk is not None and pk not in memo}
+        if not missing:
+            return
+        users = User.objects.filter(pk__in=missing).select_related('profile').only(
+            'id', 'username', 'first_name', 'last_name', 'profile__avatar'
+        )
+        for user in users:
+            memo[user.pk] = cls.render(user)
+        for pk in missing - set(memo):
+            memo[pk] = None
+
+    @staticmethod
+    def render(user) -> dict:
+        try:
+            avatar = user.profile.avatar
+        except ObjectDoesNotExist:
+            avatar = None
+        return {
+            'id': user.pk,
+            'username': user.username,
+            'display_name': user.get_full_name() or user.username,
+            'avatar': avatar.url if avatar else None,
+        }
@@ -0,0 +1,75 @@
+import pytest
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+
+from api.models import (
+    LocationZones, Locations, DeviceTypes, DeviceMarks, DeviceModels,
+    DeviceSystems, DeviceBuilds, DeviceProcessors, DeviceRAMs, DeviceDisks, Devices
+)
+from api.services.catalog import CatalogCache
+from api.services.executor import AuthExecutor
+from api.services.settings import SettingsCache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Cached data is versioned by write generations that survive the test
+    database rollback, so every test starts from empty caches.
+    """
+    for cache in caches.all():
+        cache.clear()
+    CatalogCache.clear()
+    SettingsCache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    """
+    Uploaded files go to a per-test directory, never into the source tree.
+    """
+    settings.MEDIA_ROOT = str(tmp_path / 'media')
+
+
+@pytest.fixture(autouse=True)
+def inline_auth_executor(monkeypatch):
+    """
+    AuthExecutor threads open their own database connections, which do not
+    see the data of the test transaction, so auth views run inline unless a
+    test opts back in.
+    """
+    monkeypatch.setattr(AuthExecutor, 'MAX_WORKERS', 0)
+
+
+@pytest.fixture
+def device_relations(db):
+    """
+    One row of every relation a device requires, keyed by its Devices field,
+    so a test can call Devices.objects.create(**device_relations, ...).
+    """
+    creator = User.objects.create(username='relationscreator')
+    zone = LocationZones.objects.create(title='Zone A', creator=creator)
+    return {
+        'location': Locations.objects.create(title='Warehouse', location_zone=zone, creator=creator),
+        'type': DeviceTypes.objects.create(title='Laptop', creator=creator),
+        'mark': DeviceMarks.objects.create(title='Lenovo', creator=creator),
+        'model': DeviceModels.objects.create(title='ThinkPad', creator=creator),
+        'system': DeviceSystems.objects.create(title='Linux', creator=creator),
+        'build': DeviceBuilds.objects.create(title='Stable', creator=creator),
+        'processor': DeviceProcessors.objects.create(title='Ryzen', creator=creator),
+        'ram': DeviceRAMs.objects.create(title='16GB', creator=creator),
+        'disk': DeviceDisks.objects.create(title='NVMe', creator=creator),
+    }
+
+
+@pytest.fixture
+def create_device(device_relations):
+    """
+    Returns a function creating a device of `creator` on `device_relations`;
+    keyword arguments set any other field or replace a relation.
+    """
+    def create(creator, **values):
+        return Devices.objects.create(creator=creator, **{**device_relations, **values})
+    return create
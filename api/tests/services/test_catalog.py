@@ -0,0 +1,94 @@
+import pytest
+
+from django.contrib.auth.models import User
+
+from api.models import DeviceTypes, DeviceMarks, DeviceBuilds, Softwares, Devices, DeviceSoftwares
+from api.services.catalog import CatalogCache
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username='cataloguser', password='testpass123')
+
+@pytest.mark.django_db
+def test_get_or_set_counts_hits_and_misses(user):
+    calls = []
+    compute = lambda: calls.append(1) or 'value'
+    assert CatalogCache.get_or_set(DeviceTypes, 'key', compute) == ('value', False)
+    assert CatalogCache.get_or_set(DeviceTypes, 'key', compute) == ('value', True)
+    assert len(calls) == 1
+    stats = CatalogCache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['size'] == 1
+
+@pytest.mark.django_db
+def test_writes_invalidate_entries(user, django_assert_num_queries):
+    laptop = DeviceTypes.objects.create(title='Laptop', creator=user)
+    assert CatalogCache.get_instance(DeviceTypes, laptop.id).title == 'Laptop'
+    with django_assert_num_queries(0):
+        assert CatalogCache.get_instance(DeviceTypes, str(laptop.id)).title == 'Laptop'
+    laptop.title = 'Notebook'
+    laptop.save()
+    assert CatalogCache.get_instance(DeviceTypes, laptop.id).title == 'Notebook'
+    laptop.delete()
+    assert CatalogCache.get_instance(DeviceTypes, laptop.id) is None
+
+@pytest.mark.django_db
+def test_writes_only_invalidate_their_catalog(user, django_assert_num_queries):
+    laptop = DeviceTypes.objects.create(title='Laptop', creator=user)
+    CatalogCache.get_instance(DeviceTypes, laptop.id)
+    DeviceMarks.objects.create(title='Acme', creator=user)
+    with django_assert_num_queries(0):
+        CatalogCache.get_instance(DeviceTypes, laptop.id)
+
+@pytest.mark.django_db
+def test_get_instance_returns_copies(user):
+    laptop = DeviceTypes.objects.create(title='Laptop', creator=user)
+    CatalogCache.get_instance(DeviceTypes, laptop.id).title = 'Changed'
+    assert CatalogCache.get_instance(DeviceTypes, laptop.id).title == 'Laptop'
+    assert CatalogCache.get_instance(DeviceTypes, 'abc') is None
+
+@pytest.mark.django_db
+def test_size_is_bounded(user, monkeypatch):
+    monkeypatch.setattr(CatalogCache, 'MAX_ENTRIES', 3)
+    for index in range(5):
+        CatalogCache.get_or_set(DeviceTypes, index, lambda: index)
+    stats = CatalogCache.stats()
+    assert stats['size'] == 3
+    assert stats['evictions'] == 2
+    assert CatalogCache.get_or_set(DeviceTypes, 0, lambda: 'recomputed') == ('recomputed', False)
+    assert CatalogCache.get_or_set(DeviceTypes, 4, lambda: 'recomputed') == (4, True)
+
+@pytest.mark.django_db
+def test_get_usage_groups_devices_in_one_query(user, create_device, django_assert_num_queries):
+    build = DeviceBuilds.objects.create(title='22H2', creator=user)
+    unused = DeviceBuilds.objects.create(title='21H1', creator=user)
+    first = create_device(user, internal_id='DEV1', build=build)
+    second = create_device(user, internal_id='DEV2', build=build)
+    with django_assert_num_queries(1):
+        usage = CatalogCache.get_usage(DeviceBuilds)
+    assert usage[build.id]['devices_count'] == 2
+    assert usage[build.id]['last_used_at'] == max(second.updated_at, first.updated_at)
+    assert unused.id not in usage
+    with django_assert_num_queries(0):
+        CatalogCache.get_usage(DeviceBuilds)
+
+@pytest.mark.django_db
+def test_get_usage_is_invalidated_by_device_writes(user, create_device):
+    build = DeviceBuilds.objects.create(title='22H2', creator=user)
+    device = create_device(user, internal_id='DEV1', build=build)
+    assert CatalogCache.get_usage(DeviceBuilds)[build.id]['devices_count'] == 1
+    create_device(user, internal_id='DEV2', build=build)
+    assert CatalogCache.get_usage(DeviceBuilds)[build.id]['devices_count'] == 2
+    Devices.objects.filter(pk=device.pk).delete()
+    assert CatalogCache.get_usage(DeviceBuilds)[build.id]['devices_count'] == 1
+
+@pytest.mark.django_db
+def test_get_usage_of_softwares(user, create_device):
+    office = Softwares.objects.create(title='Office', version='2024', creator=user)
+    for internal_id in ('DEV1', 'DEV2'):
+        DeviceSoftwares.objects.create(device=create_device(user, internal_id=internal_id), software=office)
+    usage = CatalogCache.get_usage(Softwares)
+    assert usage[office.id]['devices_count'] == 2
+    assert usage[office.id]['last_used_at'] is not None
@@ -0,0 +1,48 @@
+import pytest
+
+from django.contrib.auth.models import User
+
+from api.models import DeviceTypes
+from api.services.devices import DevicesService
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username='serviceuser', password='testpass123')
+
+@pytest.mark.django_db
+def test_resolve_references_by_id_and_title(user, django_assert_num_queries):
+    laptop = DeviceTypes.objects.create(title='Laptop', creator=user)
+    desktop = DeviceTypes.objects.create(title='Desktop', creator=user)
+    DeviceTypes.objects.create(title='Printer', creator=user)
+    DeviceTypes.objects.create(title='Printer', creator=user)
+    rows = [{'type': 'Laptop'}, {'type': desktop.id}, {'type_id': str(laptop.id)}, {'type': 'Printer'}]
+    with django_assert_num_queries(1):
+        resolved = DevicesService.resolve_references(rows)
+    assert resolved['type'] == {
+        ('title', 'Laptop'): laptop.id,
+        ('id', desktop.id): desktop.id,
+        ('id', laptop.id): laptop.id,
+        ('title', 'Printer'): None,
+    }
+    assert resolved['mark'] == {}
+
+@pytest.mark.django_db
+def test_resolve_references_matches_digit_titles_by_title(user):
+    year = DeviceTypes.objects.create(title='2024', creator=user)
+    other = DeviceTypes.objects.create(title='Other', creator=user)
+    rows = [{'type': '2024'}, {'type': str(other.id)}, {'type_id': str(other.id)}]
+    resolved = DevicesService.resolve_references(rows)
+    assert resolved['type'] == {('title', '2024'): year.id, ('id', other.id): other.id}
+
+@pytest.mark.django_db
+def test_build_device_reports_ambiguous_and_missing_references(user):
+    DeviceTypes.objects.create(title='Printer', creator=user)
+    DeviceTypes.objects.create(title='Printer', creator=user)
+    row = {'internal_id': 'SRV1', 'type': 'Printer', 'mark': 'Unknown'}
+    resolved = DevicesService.resolve_references([row])
+    device, errors = DevicesService.build_device(row, resolved, user, None)
+    assert errors['type'] == ['Ambiguous title. (Printer)']
+    assert errors['mark'] == ['Not found. (Unknown)']
+    assert errors['location'] == ['This field is required.']
+    assert 'internal_id' not in errors
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.services.executor import AuthExecutor, AuthExecutorBusy
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    monkeypatch.setattr(AuthExecutor, 'MAX_WORKERS', 2)
+    monkeypatch.setattr(AuthExecutor, 'MAX_QUEUE', 8)
+    monkeypatch.setattr(AuthExecutor, '_executor', None)
+    AuthExecutor.reset_metrics()
+    yield AuthExecutor
+    if AuthExecutor._executor is not None:
+        AuthExecutor._executor.shutdown(wait=True)
+
+def slow_calls(count, seconds=0.05):
+    state = {'running': 0, 'peak': 0}
+    lock = threading.Lock()
+
+    def call(index):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(seconds)
+        with lock:
+            state['running'] -= 1
+        return index
+
+    async def run_all():
+        return await asyncio.gather(
+            *[AuthExecutor.run(call, index) for index in range(count)],
+            return_exceptions=True
+        )
+    return state, asyncio.run(run_all())
+
+
+"""
+AuthExecutor tests
+"""
+def test_run_limits_concurrency_and_measures_queue_time(executor):
+    state, results = slow_calls(5)
+    assert [result for result, queued in results] == [0, 1, 2, 3, 4]
+    assert state['peak'] == 2
+    metrics = executor.metrics()
+    assert metrics['completed'] == 5
+    assert metrics['pending'] == 0
+    assert metrics['queue_time_max_ms'] >= 40
+    assert metrics['run_time_avg_ms'] >= 40
+
+def test_run_rejects_when_queue_is_full(executor, monkeypatch):
+    monkeypatch.setattr(AuthExecutor, 'MAX_QUEUE', 1)
+    state, results = slow_calls(4)
+    assert sum(isinstance(result, AuthExecutorBusy) for result in results) == 1
+    assert executor.metrics()['rejected'] == 1
+    assert executor.metrics()['completed'] == 3
+
+def test_run_inline_without_workers(monkeypatch):
+    monkeypatch.setattr(AuthExecutor, 'MAX_WORKERS', 0)
+    result, queued = asyncio.run(AuthExecutor.run(threading.get_ident))
+    assert queued == 0.0
+
+@pytest.mark.django_db(transaction=True)
+def test_login_runs_in_executor(executor):
+    User.objects.create_user(username='testuser', password='testpass')
+    response = APIClient().post(reverse('auth-login'), {"username": "testuser", "password": "testpass"})
+    assert response.status_code == status.HTTP_200_OK
+    assert "access" in response.json()
+    assert response['Server-Timing'].startswith('auth-queue;dur=')
+    assert executor.metrics()['completed'] == 1
+
+@pytest.mark.django_db
+def test_executor_metrics_requires_admin(admin_user, django_user_model):
+    client = APIClient()
+    url = reverse('auth-executor-metrics')
+    client.force_authenticate(user=django_user_model.objects.create_user(username='plainuser', password='x'))
+    assert client.get(url).status_code == status.HTTP_403_FORBIDDEN
+    client.force_authenticate(user=admin_user)
+    response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert set(response.data) >= {'workers', 'pending', 'rejected', 'queue_time_avg_ms', 'queue_time_max_ms'}
@@ -0,0 +1,70 @@
+import json
+import pytest
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import AsyncRequestFactory, RequestFactory
+
+from api.services.export import ExportService
+
+
+@pytest.fixture
+def users(db):
+    return [User.objects.create(username=f'exportuser{index}') for index in range(5)]
+
+@pytest.mark.django_db
+def test_stream_csv_is_lazy(users, django_assert_num_queries):
+    with django_assert_num_queries(0):
+        stream = ExportService.stream_csv(User.objects.order_by('id'), ['id', 'username'], ['id', 'username'])
+        header = next(stream)
+    assert header == 'id,username\r\n'
+    with django_assert_num_queries(1):
+        rows = list(stream)
+    assert rows[0] == f'{users[0].id},exportuser0\r\n'
+    assert len(rows) == 5
+
+@pytest.mark.django_db
+def test_stream_ndjson_serializes_dates(users):
+    rows = list(ExportService.stream_ndjson(User.objects.order_by('id'), ['name', 'joined'], ['username', 'date_joined']))
+    assert len(rows) == 5
+    assert all(row.endswith('\n') for row in rows)
+    first = json.loads(rows[0])
+    assert first['name'] == 'exportuser0'
+    assert first['joined'].startswith(str(users[0].date_joined.year))
+
+@pytest.mark.django_db
+def test_stream_response_headers(users):
+    response = ExportService.stream_response(RequestFactory().get('/'), User.objects.all(), [('id', 'id')], 'ndjson', 'users')
+    assert response['Content-Type'] == 'application/x-ndjson'
+    assert response['Content-Disposition'] == 'attachment; filename="users.ndjson"'
+    assert not response.is_async
+
+@pytest.mark.django_db
+def test_stream_response_is_async_and_lazy_under_asgi(users, monkeypatch):
+    monkeypatch.setattr(ExportService, 'ASYNC_CHUNK_LINES', 2)
+    read = []
+    iter_rows = ExportService.iter_rows
+
+    def counting_iter_rows(queryset, columns):
+        for row in iter_rows(queryset, columns):
+            read.append(row)
+            yield row
+
+    monkeypatch.setattr(ExportService, 'iter_rows', counting_iter_rows)
+    response = ExportService.stream_response(
+        AsyncRequestFactory().get('/'), User.objects.order_by('id'), [('name', 'username')], 'csv', 'users'
+    )
+    assert response.is_async
+
+    async def consume():
+        chunks = []
+        async for chunk in response.streaming_content:
+            chunks.append((chunk, len(read)))
+        return chunks
+
+    chunks = async_to_sync(consume)()
+    assert chunks == [
+        (b'name\r\nexportuser0\r\n', 1),
+        (b'exportuser1\r\nexportuser2\r\n', 3),
+        (b'exportuser3\r\nexportuser4\r\n', 5),
+    ]
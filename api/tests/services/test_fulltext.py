@@ -0,0 +1,103 @@
+import pytest
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+
+from api.models import Devices
+from api.services.devices import DevicesService
+from api.services.fulltext import DeviceSearchIndex
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username='fulltextuser', password='testpass123')
+
+def search(text):
+    return list(DeviceSearchIndex.search(Devices.objects.all(), text).values_list('internal_id', flat=True))
+
+def indexed_count():
+    table = DeviceSearchIndex.SQLITE_TABLE if connection.vendor == 'sqlite' else DeviceSearchIndex.POSTGRESQL_TABLE
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {table}')
+        return cursor.fetchone()[0]
+
+pytestmark = pytest.mark.skipif(
+    not DeviceSearchIndex.is_supported(connection),
+    reason='The full-text index needs PostgreSQL or SQLite'
+)
+
+@pytest.mark.django_db
+def test_search_matches_fields_and_related_titles(user, create_device):
+    create_device(user, internal_id='INV-1', hostname='web-01', network_ipv4='10.0.0.15', notes='Front desk')
+    create_device(user, internal_id='INV-2', hostname='db-01', network_mac='00:1a:2b:3c:4d:5e')
+    assert search('web') == ['INV-1']
+    assert search('10.0.0.15') == ['INV-1']
+    assert search('00:1a:2b') == ['INV-2']
+    assert search('front DESK') == ['INV-1']
+    assert sorted(search('lenovo thinkpad')) == ['INV-1', 'INV-2']
+    assert search('warehouse db') == ['INV-2']
+    assert search('nothing') == []
+
+@pytest.mark.django_db
+def test_search_ranks_better_matches_first(user, create_device):
+    create_device(user, internal_id='INV-1', notes='printer')
+    create_device(user, internal_id='INV-2', hostname='printer', sector='printer', notes='printer printer')
+    queryset = DeviceSearchIndex.search(Devices.objects.all(), 'printer')
+    assert [device.internal_id for device in queryset] == ['INV-2', 'INV-1']
+    assert queryset[0].search_rank > queryset[1].search_rank
+
+@pytest.mark.django_db
+def test_search_input_is_not_query_syntax(user, create_device):
+    create_device(user, internal_id='INV-1', hostname='o\'brien "pc"')
+    assert search('o\'brien') == ['INV-1']
+    assert search('"pc" OR') == []
+    assert search('NEAR( * -') == []
+
+@pytest.mark.django_db
+def test_index_follows_device_writes(user, create_device):
+    device = create_device(user, internal_id='INV-1', hostname='alpha')
+    device.hostname = 'bravo'
+    device.save()
+    assert search('alpha') == []
+    assert search('bravo') == ['INV-1']
+    device.delete()
+    assert search('bravo') == []
+    assert indexed_count() == 0
+
+@pytest.mark.django_db
+def test_index_follows_renamed_relations(user, create_device, device_relations):
+    create_device(user, internal_id='INV-1')
+    device_relations['type'].title = 'Notebook'
+    device_relations['type'].save()
+    device_relations['location'].title = 'Office'
+    device_relations['location'].save()
+    assert search('laptop') == []
+    assert search('notebook office') == ['INV-1']
+
+@pytest.mark.django_db
+def test_index_follows_bulk_writes(user, device_relations):
+    rows = [
+        {'internal_id': f'BULK-{index}', 'hostname': f'bulk-{index}', **{name: item.title for name, item in device_relations.items()}}
+        for index in range(3)
+    ]
+    report, has_errors = DevicesService.import_devices(rows, user)
+    assert not has_errors
+    assert sorted(search('bulk')) == ['BULK-0', 'BULK-1', 'BULK-2']
+    DevicesService.bulk_update(Devices.objects.filter(internal_id='BULK-1'), {'user_owner': 'jdoe'}, user)
+    assert search('jdoe') == ['BULK-1']
+
+@pytest.mark.django_db
+def test_rebuild_search_index_command(user, create_device):
+    create_device(user, internal_id='INV-1', hostname='alpha')
+    create_device(user, internal_id='INV-2', hostname='bravo')
+    create_device(user, internal_id='INV-3', hostname='charlie')
+    # QuerySet.update() bypasses the signals
+    Devices.objects.filter(internal_id='INV-1').update(hostname='delta')
+    DeviceSearchIndex.remove([Devices.objects.get(internal_id='INV-3').pk])
+    call_command('rebuild_search_index', '--batch-size', '2', stdout=StringIO())
+    assert indexed_count() == 3
+    assert search('delta') == ['INV-1']
+    assert search('charlie') == ['INV-3']
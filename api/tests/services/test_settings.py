@@ -0,0 +1,61 @@
+import pytest
+
+from api.models import AppSettings, UserSettings
+from api.services.settings import SettingsCache
+
+
+"""
+SettingsCache tests
+"""
+@pytest.mark.django_db
+def test_get_solo_is_memoized(django_assert_num_queries):
+    AppSettings.get_solo()
+    with django_assert_num_queries(0):
+        settings = AppSettings.get_solo()
+    assert settings.pk == 1
+    assert settings.search_min_input_length == 2
+
+@pytest.mark.django_db
+def test_get_solo_reloads_from_shared_cache(django_assert_num_queries):
+    UserSettings.get_solo()
+    SettingsCache.clear()
+    with django_assert_num_queries(0):
+        settings = UserSettings.get_solo()
+    assert settings.default_language == 'en'
+
+@pytest.mark.django_db
+def test_get_solo_returns_copies():
+    settings = AppSettings.get_solo()
+    settings.number_of_alerts = 99
+    assert AppSettings.get_solo().number_of_alerts == 5
+
+@pytest.mark.django_db
+def test_save_invalidates_cached_settings():
+    settings = AppSettings.get_solo()
+    settings.search_min_input_length = 4
+    settings.save()
+    assert AppSettings.get_solo().search_min_input_length == 4
+    AppSettings.objects.all().delete()
+    assert AppSettings.get_solo().search_min_input_length == 2
+
+@pytest.mark.django_db
+def test_row_loaded_across_a_save_is_reloaded(monkeypatch, django_assert_num_queries):
+    AppSettings.load_solo()
+    load_solo = AppSettings.load_solo
+    saves = []
+
+    def load_then_save():
+        # Another worker saves between this read and the cache write
+        row = load_solo()
+        if not saves:
+            fresh = load_solo()
+            fresh.search_min_input_length = 4
+            fresh.save()
+            saves.append(fresh)
+        return row
+
+    monkeypatch.setattr(AppSettings, 'load_solo', load_then_save)
+    assert AppSettings.get_solo().search_min_input_length == 4
+    SettingsCache.clear()
+    with django_assert_num_queries(0):
+        assert AppSettings.get_solo().search_min_input_length == 4
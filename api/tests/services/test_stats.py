@@ -0,0 +1,130 @@
+import pytest
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.models import LocationZones, Locations, DeviceTypes, DeviceSystems, Devices, DeviceStats
+from api.services.devices import DevicesService
+from api.services.stats import StatsService
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username='statsuser', password='testpass123')
+
+def stats():
+    return {
+        dimension: dict(
+            DeviceStats.objects.filter(dimension=dimension, devices_count__gt=0).values_list('value', 'devices_count')
+        )
+        for dimension in DeviceStats.DIMENSIONS
+    }
+
+def expected():
+    return DeviceStats.group_counts(Devices.objects.all())
+
+
+"""
+DeviceStats tests
+"""
+@pytest.mark.django_db
+def test_stats_follow_device_create_update_delete(user, create_device, device_relations):
+    other_type = DeviceTypes.objects.create(title='Desktop', creator=user)
+    first = create_device(user, internal_id='INV-1')
+    create_device(user, internal_id='INV-2', status=2)
+    zone = device_relations['location'].location_zone_id
+    assert stats() == {
+        'status': {1: 1, 2: 1},
+        'type': {device_relations['type'].pk: 2},
+        'location_zone': {zone: 2},
+        'system': {device_relations['system'].pk: 2},
+    }
+    first.type = other_type
+    first.status = 2
+    first.save()
+    assert stats()['type'] == {device_relations['type'].pk: 1, other_type.pk: 1}
+    assert stats()['status'] == {2: 2}
+    first.delete()
+    assert stats() == expected()
+
+@pytest.mark.django_db
+def test_stats_follow_device_moves_and_zone_changes(user, create_device, device_relations):
+    other_zone = LocationZones.objects.create(title='Zone B', creator=user)
+    other_location = Locations.objects.create(title='Office', location_zone=other_zone, creator=user)
+    device = create_device(user, internal_id='INV-1')
+    create_device(user, internal_id='INV-2')
+    device.location = other_location
+    device.save()
+    assert stats()['location_zone'] == {device_relations['location'].location_zone_id: 1, other_zone.pk: 1}
+    device_relations['location'].location_zone = other_zone
+    device_relations['location'].save()
+    assert stats()['location_zone'] == {other_zone.pk: 2}
+    assert stats() == expected()
+
+@pytest.mark.django_db
+def test_stats_follow_bulk_writes(user, device_relations):
+    other_system = DeviceSystems.objects.create(title='Windows', creator=user)
+    rows = [
+        {'internal_id': f'BULK-{index}', **{name: item.title for name, item in device_relations.items()}}
+        for index in range(3)
+    ]
+    report, has_errors = DevicesService.import_devices(rows, user)
+    assert not has_errors
+    assert stats() == expected()
+    DevicesService.bulk_update(
+        Devices.objects.filter(internal_id__in=['BULK-0', 'BULK-1']),
+        {'status': 3, 'system_id': other_system.pk},
+        user
+    )
+    assert stats()['system'] == {device_relations['system'].pk: 1, other_system.pk: 2}
+    assert stats() == expected()
+
+@pytest.mark.django_db
+def test_device_write_adjusts_stats_in_one_update(user, create_device):
+    device = create_device(user, internal_id='INV-1')
+    with CaptureQueriesContext(connection) as context:
+        create_device(user, internal_id='INV-2')
+    assert len([query for query in context.captured_queries if 'api_device_stats' in query['sql']]) == 2
+    assert not [query for query in context.captured_queries if query['sql'].startswith('SELECT "api_locations"."location_zone_id"')]
+    device.status = 2
+    with CaptureQueriesContext(connection) as context:
+        device.save()
+    assert len([query for query in context.captured_queries if 'UPDATE "api_device_stats"' in query['sql']]) == 1
+    assert stats() == expected()
+
+@pytest.mark.django_db
+def test_rebuild_device_stats_command(user, create_device):
+    create_device(user, internal_id='INV-1')
+    create_device(user, internal_id='INV-2')
+    # QuerySet.update() bypasses the signals
+    Devices.objects.filter(internal_id='INV-1').update(status=5)
+    DeviceStats.objects.filter(dimension='type').delete()
+    assert stats() != expected()
+    call_command('rebuild_device_stats', stdout=StringIO())
+    assert stats() == expected()
+
+
+"""
+StatsService tests
+"""
+@pytest.mark.django_db
+def test_get_summary_reads_groups_with_titles(user, create_device, device_relations, django_assert_max_num_queries):
+    create_device(user, internal_id='INV-1')
+    create_device(user, internal_id='INV-2', status=2)
+    StatsService.get_summary()
+    with django_assert_max_num_queries(2):
+        summary = StatsService.get_summary()
+    assert summary['total'] == 2
+    assert summary['status'] == [
+        {'value': 1, 'title': None, 'devices_count': 1},
+        {'value': 2, 'title': None, 'devices_count': 1},
+    ]
+    assert summary['type'] == [{'value': device_relations['type'].pk, 'title': 'Laptop', 'devices_count': 2}]
+    assert summary['location_zone'] == [
+        {'value': device_relations['location'].location_zone_id, 'title': 'Zone A', 'devices_count': 2}
+    ]
+    assert summary['system'] == [{'value': device_relations['system'].pk, 'title': 'Linux', 'devices_count': 2}]
@@ -0,0 +1,120 @@
+import pytest
+
+from django.contrib.auth.models import User, update_last_login
+from django.core.cache import cache
+
+from api.services.users import UserCache, UserReferences
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username='cacheduser', password='testpass123')
+
+
+"""
+UserCache tests
+"""
+@pytest.mark.django_db
+def test_get_is_cached(user, django_assert_num_queries):
+    UserCache.get(user.pk)
+    with django_assert_num_queries(0):
+        cached = UserCache.get(user.pk)
+    assert cached.username == 'cacheduser'
+
+@pytest.mark.django_db
+def test_get_missing_user_returns_none():
+    assert UserCache.get(999999) is None
+
+@pytest.mark.django_db
+def test_save_invalidates_cached_user(user):
+    UserCache.get(user.pk)
+    user.is_active = False
+    user.save()
+    assert UserCache.get(user.pk).is_active is False
+    user.set_password('newpass456')
+    user.save()
+    assert UserCache.get(user.pk).check_password('newpass456')
+
+@pytest.mark.django_db
+def test_delete_invalidates_cached_user(user):
+    user_id = user.pk
+    UserCache.get(user_id)
+    user.delete()
+    assert UserCache.get(user_id) is None
+
+@pytest.mark.django_db
+def test_cached_entry_holds_only_the_auth_fields(user):
+    UserCache.get(user.pk)
+    entry = cache.get(UserCache.key(user.pk, UserCache.get_version(user.pk)))
+    assert entry['values'] == {
+        'id': user.pk, 'username': 'cacheduser', 'is_active': True, 'is_staff': False, 'is_superuser': False
+    }
+    assert user.password not in str(entry)
+
+@pytest.mark.django_db
+def test_cached_user_loads_the_other_fields_on_demand(user, django_assert_num_queries):
+    User.objects.filter(pk=user.pk).update(email='cached@example.com', first_name='Cached')
+    UserCache.get(user.pk)
+    cached = UserCache.get(user.pk)
+    assert cached.get_deferred_fields() >= {'password', 'email', 'first_name'}
+    with django_assert_num_queries(1):
+        UserCache.load_deferred(cached)
+    assert (cached.email, cached.first_name) == ('cached@example.com', 'Cached')
+
+@pytest.mark.django_db
+def test_saving_a_cached_user_keeps_its_other_fields(user):
+    User.objects.filter(pk=user.pk).update(email='kept@example.com')
+    cached = UserCache.get(user.pk)
+    cached.set_password('newpass456')
+    cached.save()
+    user.refresh_from_db()
+    assert user.email == 'kept@example.com'
+    assert user.check_password('newpass456')
+
+@pytest.mark.django_db
+def test_last_login_update_keeps_cached_user(user):
+    version = UserCache.get_version(user.pk)
+    update_last_login(None, user)
+    assert UserCache.get_version(user.pk) == version
+
+@pytest.mark.django_db
+def test_last_login_update_rebuilds_summary(user):
+    def serialize(instance):
+        return {'last_login': instance.last_login}
+
+    assert UserCache.get_summary(user, serialize) == {'last_login': None}
+    update_last_login(None, user)
+    assert UserCache.get_summary(user, serialize) == {'last_login': user.last_login}
+
+@pytest.mark.django_db
+def test_invalidate_skips_copies_cached_under_older_versions(user):
+    version = UserCache.get_version(user.pk)
+    UserCache.invalidate(user.pk)
+    assert UserCache.get_version(user.pk) != version
+
+
+"""
+UserReferences tests
+"""
+@pytest.mark.django_db
+def test_references_are_loaded_once_per_memo(user, django_assert_num_queries):
+    other = User.objects.create_user(username='otheruser', password='testpass123', first_name='Other', last_name='User')
+    memo = {}
+    with django_assert_num_queries(1):
+        UserReferences.load(memo, [user.pk, other.pk, 999999, None])
+    with django_assert_num_queries(0):
+        UserReferences.load(memo, [user.pk, other.pk, 999999])
+    assert memo[user.pk] == {'id': user.pk, 'username': 'cacheduser', 'display_name': 'cacheduser', 'avatar': None}
+    assert memo[other.pk]['display_name'] == 'Other User'
+    assert memo[999999] is None
+    assert None not in memo
+
+def test_memo_is_kept_on_its_owner():
+    class Owner:
+        pass
+
+    owner = Owner()
+    memo = UserReferences.get_memo(owner)
+    memo[1] = None
+    assert UserReferences.get_memo(owner) is memo
+    assert UserReferences.get_memo(Owner()) == {}
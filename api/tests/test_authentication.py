@@ -0,0 +1,63 @@
+import pytest
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.services.users import UserCache
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user(db):
+    user = User.objects.create_user(username='testuser', password='testpass', email='test@example.com')
+    return user
+
+def authenticate(api_client, user):
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+
+"""
+CachedJWTAuthentication tests
+"""
+@pytest.mark.django_db
+def test_authenticated_user_is_cached(api_client, user):
+    authenticate(api_client, user)
+    url = reverse('stats-list')
+    api_client.get(url)
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert not [query for query in context.captured_queries if 'auth_user' in query['sql']]
+
+@pytest.mark.django_db
+def test_deactivated_user_is_rejected_at_once(api_client, user):
+    authenticate(api_client, user)
+    url = reverse('stats-list')
+    assert api_client.get(url).status_code == status.HTTP_200_OK
+    user.is_active = False
+    user.save()
+    assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+@pytest.mark.django_db
+def test_deleted_user_is_rejected_at_once(api_client, user):
+    authenticate(api_client, user)
+    url = reverse('stats-list')
+    assert api_client.get(url).status_code == status.HTTP_200_OK
+    user.delete()
+    assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+@pytest.mark.django_db
+def test_password_change_refreshes_cached_user(api_client, user):
+    authenticate(api_client, user)
+    data = {"id": user.id, "current_password": "testpass", "password": "newpass123", "repeat_password": "newpass123"}
+    response = api_client.post(reverse('auth-change-password'), data)
+    assert response.status_code == status.HTTP_200_OK
+    assert UserCache.get(user.pk).check_password('newpass123')
@@ -0,0 +1,90 @@
+import pytest
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils import timezone
+
+from api.filters import DevicesFilter
+from api.models import Devices, DeviceTypes, LocationZones, Locations, Notifications
+from api.services.search import SearchService
+
+
+"""
+EXPLAIN-based checks that the indexed Devices filters (the exact-match
+lookups below and the location/type + status combinations) and the keyset
+and prefix search orderings are served by their index. The remaining
+filters, such as sector or user_owner, are not indexed.
+"""
+DEVICES_FILTERS = [
+    ({'internal_id': 'DEV1'}, 'api_dev_internal_id_idx'),
+    ({'hostname': 'host1'}, 'api_dev_hostname_idx'),
+    ({'serial': 'SN1'}, 'api_dev_serial_idx'),
+    ({'network_mac': '00:11:22:33:44:55'}, 'api_dev_network_mac_idx'),
+    ({'network_ipv4': '10.0.0.1'}, 'api_dev_network_ipv4_idx'),
+    ({'disk_serial': 'DSN1'}, 'api_dev_disk_serial_idx'),
+    ({'remote_id': 'RID1'}, 'api_dev_remote_id_idx'),
+    ({'status': 1}, 'api_dev_status_idx'),
+    ({'created_at': '2025-01-01T00:00:00Z'}, 'api_dev_created_at_id_idx'),
+    ({'location': 'location', 'status': 1}, 'api_dev_location_status_idx'),
+    ({'type': 'type', 'status': 1}, 'api_dev_type_status_idx'),
+]
+
+
+def explain(queryset):
+    """
+    Returns the query plan, forcing index usage on PostgreSQL where tiny test
+    tables would otherwise always be scanned sequentially.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+        try:
+            return queryset.explain()
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = on')
+    return queryset.explain()
+
+def uses_index(plan, index_name):
+    if connection.vendor == 'sqlite':
+        return f'INDEX {index_name}' in plan
+    return index_name in plan
+
+@pytest.fixture
+def relations(db):
+    user = User.objects.create_user(username='indexuser', password='indexpass')
+    zone = LocationZones.objects.create(title='ZoneIndex', creator=user)
+    return {
+        'location': Locations.objects.create(title='LocIndex', location_zone=zone, creator=user).id,
+        'type': DeviceTypes.objects.create(title='TypeIndex', creator=user).id,
+    }
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params, index_name", DEVICES_FILTERS)
+def test_devices_filter_uses_index(relations, params, index_name):
+    params = {key: relations.get(value, value) if key in relations else value for key, value in params.items()}
+    filterset = DevicesFilter(params, queryset=Devices.objects.all())
+    assert filterset.is_valid(), filterset.errors
+    plan = explain(filterset.qs)
+    assert uses_index(plan, index_name), plan
+
+@pytest.mark.django_db
+def test_devices_keyset_ordering_uses_index():
+    queryset = Devices.objects.filter(created_at__lt=timezone.now()).order_by('-created_at', '-id')
+    plan = explain(queryset)
+    assert uses_index(plan, 'api_dev_created_at_id_idx'), plan
+
+@pytest.mark.django_db
+def test_notifications_keyset_ordering_uses_index():
+    queryset = Notifications.objects.filter(created_at__lt=timezone.now()).order_by('-created_at', '-id')
+    plan = explain(queryset)
+    assert uses_index(plan, 'api_notif_created_at_id_idx'), plan
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("field", SearchService.DEVICE_FIELDS)
+def test_devices_prefix_search_uses_index(field):
+    queryset = SearchService.prefix_queryset(Devices.objects.all(), field, 'ab')[:10]
+    plan = explain(queryset)
+    assert uses_index(plan, f'api_dev_{field}_pfx_idx'), plan
+    if connection.vendor == 'sqlite':
+        assert 'TEMP B-TREE' not in plan, plan
@@ -1,6 +1,8 @@
 import pytest
 
+from io import StringIO
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 
 from api.models import (
     UserProfile, LocationZones, Locations, DeviceTypes,
@@ -280,3 +282,71 @@ def test_user_settings_singleton():
     assert user_settings.date_format_year == 'numeric'
     assert user_settings.time_24h == 1
     assert user_settings.timezone == 'America/New_York'
+
+def create_counted_device(user, location, catalog):
+    return Devices.objects.create(internal_id='DEVCOUNT', creator=user, **{**catalog, 'location': location})
+
+@pytest.fixture
+def counted_catalog(device_relations):
+    user = User.objects.create_user(username='counter', password='pass')
+    return user, device_relations
+
+@pytest.mark.django_db
+def test_location_counters_follow_create_move_and_delete(counted_catalog):
+    user, catalog = counted_catalog
+    zone_a = LocationZones.objects.create(title='Zone A', creator=user)
+    zone_b = LocationZones.objects.create(title='Zone B', creator=user)
+    first = Locations.objects.create(title='First', location_zone=zone_a, creator=user)
+    second = Locations.objects.create(title='Second', location_zone=zone_a, creator=user)
+    zone_a.refresh_from_db()
+    assert zone_a.locations_count == 2
+
+    device = create_counted_device(user, first, catalog)
+    create_counted_device(user, first, catalog)
+    first.refresh_from_db()
+    assert first.devices_count == 2
+
+    # Moving a device loaded from the database
+    device = Devices.objects.get(pk=device.pk)
+    device.location = second
+    device.save()
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert (first.devices_count, second.devices_count) == (1, 1)
+
+    device.delete()
+    second.refresh_from_db()
+    assert second.devices_count == 0
+
+    second.location_zone = zone_b
+    second.save()
+    zone_a.refresh_from_db()
+    zone_b.refresh_from_db()
+    assert (zone_a.locations_count, zone_b.locations_count) == (1, 1)
+
+@pytest.mark.django_db
+def test_location_save_does_not_overwrite_counter(counted_catalog):
+    user, catalog = counted_catalog
+    zone = LocationZones.objects.create(title='Zone Stale', creator=user)
+    location = Locations.objects.create(title='Stale', location_zone=zone, creator=user)
+    create_counted_device(user, location, catalog)
+    location.title = 'Stale renamed'
+    location.save()
+    location.refresh_from_db()
+    assert location.title == 'Stale renamed'
+    assert location.devices_count == 1
+
+@pytest.mark.django_db
+def test_recount_relations_command_fixes_drift(counted_catalog):
+    user, catalog = counted_catalog
+    zone = LocationZones.objects.create(title='Zone Drift', creator=user)
+    location = Locations.objects.create(title='Drift', location_zone=zone, creator=user)
+    create_counted_device(user, location, catalog)
+    # Bulk operations bypass the signals
+    Locations.objects.update(devices_count=7)
+    LocationZones.objects.update(locations_count=0)
+    call_command('recount_relations', stdout=StringIO())
+    location.refresh_from_db()
+    zone.refresh_from_db()
+    assert location.devices_count == 1
+    assert zone.locations_count == 1
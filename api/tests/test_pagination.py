@@ -1,8 +1,15 @@
 import pytest
 
+from datetime import timedelta
+from urllib.parse import urlparse, parse_qs
+
 from django.conf import settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
 from rest_framework.test import APIRequestFactory
-from api.pagination import DefaultLimitOffsetPagination
+from api.pagination import DefaultLimitOffsetPagination, CursorLimitOffsetPagination
 
 
 @pytest.fixture
@@ -32,3 +39,123 @@ def test_min_and_max_page_size(pagination):
 
 def test_page_size_query_param(pagination):
     assert pagination.page_size_query_param == 'page_size'
+
+
+"""
+CursorLimitOffsetPagination tests
+"""
+class UsersCursorView:
+    cursor_ordering = ('-date_joined', '-id')
+
+
+@pytest.fixture
+def users(db):
+    joined = timezone.now()
+    items = []
+    for index in range(7):
+        user = User.objects.create(username=f'cursoruser{index}', date_joined=joined - timedelta(minutes=index // 2))
+        items.append(user)
+    return items
+
+def paginate(url, params=None):
+    request = Request(APIRequestFactory().get(url, params or {}))
+    paginator = CursorLimitOffsetPagination()
+    page = paginator.paginate_queryset(User.objects.all(), request, view=UsersCursorView())
+    return paginator, page, paginator.get_paginated_response([user.id for user in page]).data
+
+def query_of(link):
+    return {key: values[0] for key, values in parse_qs(urlparse(link).query).items()}
+
+@pytest.mark.django_db
+def test_cursor_pagination_is_opt_in(users):
+    paginator, page, data = paginate('/users/', {'limit': 3})
+    assert data['count'] == 7
+    assert 'previous' in data
+
+@pytest.mark.django_db
+def test_cursor_pagination_walks_every_row_once(users):
+    expected = [user.id for user in sorted(users, key=lambda u: (u.date_joined, u.id), reverse=True)]
+    seen = []
+    params = {'limit': 3, 'cursor': ''}
+    while True:
+        paginator, page, data = paginate('/users/', params)
+        assert 'count' not in data
+        seen.extend(data['results'])
+        if not data['next']:
+            break
+        params = query_of(data['next'])
+    assert seen == expected
+
+@pytest.mark.django_db
+def test_cursor_pagination_previous_link(users):
+    paginator, page, first = paginate('/users/', {'limit': 3, 'cursor': ''})
+    assert first['previous'] is None
+    paginator, page, second = paginate('/users/', query_of(first['next']))
+    paginator, page, back = paginate('/users/', query_of(second['previous']))
+    assert back['results'] == first['results']
+
+@pytest.mark.django_db
+def test_cursor_pagination_ignores_concurrent_inserts(users):
+    paginator, page, first = paginate('/users/', {'limit': 3, 'cursor': ''})
+    User.objects.create(username='cursorlate', date_joined=timezone.now() + timedelta(minutes=5))
+    paginator, page, second = paginate('/users/', query_of(first['next']))
+    assert not set(first['results']) & set(second['results'])
+    assert len(second['results']) == 3
+
+@pytest.mark.django_db
+def test_cursor_pagination_rejects_invalid_cursor():
+    with pytest.raises(ValidationError) as error:
+        paginate('/users/', {'cursor': 'not-a-cursor'})
+    assert error.value.status_code == 400
+    assert 'cursor' in error.value.detail
+
+
+"""
+DefaultLimitOffsetPagination count modes tests
+"""
+def paginate_users(params):
+    request = Request(APIRequestFactory().get('/users/', params))
+    paginator = DefaultLimitOffsetPagination()
+    page = paginator.paginate_queryset(User.objects.order_by('id'), request)
+    return paginator.get_paginated_response([user.id for user in page]).data
+
+@pytest.mark.django_db
+def test_count_mode_exact_is_default(users):
+    data = paginate_users({'limit': 3})
+    assert data['count'] == 7
+    assert data['count_type'] == 'exact'
+
+@pytest.mark.django_db
+def test_count_mode_none_skips_count(users, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        data = paginate_users({'limit': 3, 'count': 'none'})
+    assert data['count'] is None
+    assert data['count_type'] is None
+    assert data['next'] is not None
+    data = paginate_users({'limit': 3, 'offset': 6, 'count': 'none'})
+    assert len(data['results']) == 1
+    assert data['next'] is None
+
+@pytest.mark.django_db
+def test_count_mode_cached_is_invalidated_on_write(users, django_assert_num_queries):
+    data = paginate_users({'limit': 3, 'count': 'cached'})
+    assert data['count'] == 7
+    assert data['count_type'] == 'exact'
+    with django_assert_num_queries(1):
+        data = paginate_users({'limit': 3, 'count': 'cached'})
+    assert data['count'] == 7
+    User.objects.create(username='cursorcount')
+    data = paginate_users({'limit': 3, 'count': 'cached'})
+    assert data['count'] == 8
+
+@pytest.mark.django_db
+def test_count_mode_estimate_reports_count_type(users):
+    data = paginate_users({'limit': 3, 'count': 'estimate'})
+    assert data['count_type'] in ['exact', 'estimated']
+    assert data['count'] is not None
+
+@pytest.mark.django_db
+def test_count_mode_unknown_falls_back_to_exact(users):
+    data = paginate_users({'limit': 3, 'count': 'bogus'})
+    assert data['count'] == 7
+    assert data['count_type'] == 'exact'
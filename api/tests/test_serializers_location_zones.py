@@ -132,6 +132,8 @@ def test_location_zones_serializer_to_representation_locations_count():
     zone = LocationZones.objects.create(title='ZoneE', creator=user)
     Locations.objects.create(title='Loc1', location_zone=zone, creator=user)
     Locations.objects.create(title='Loc2', location_zone=zone, creator=user)
+    # The counter is persisted; reload the instance created before the children
+    zone.refresh_from_db()
     serializer = LocationZonesSerializer(zone)
     data = serializer.data
     assert 'locations_count' in data
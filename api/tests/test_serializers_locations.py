@@ -222,6 +222,8 @@ def test_locations_serializer_to_representation_devices_count():
         location=location,
         creator=user
     )
+    # The counter is persisted; reload the instance created before the children
+    location.refresh_from_db()
     serializer = LocationsSerializer(location)
     data = serializer.data
     assert 'devices_count' in data
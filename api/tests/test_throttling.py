@@ -0,0 +1,101 @@
+import pytest
+
+from unittest import mock
+
+from django.contrib.auth.hashers import check_password
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.throttling import AuthBackoffThrottle, AuthIPRateThrottle, AuthUsernameRateThrottle
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user(db):
+    user = User.objects.create_user(username='testuser', password='testpass', email='test@example.com')
+    return user
+
+def login(api_client, password, ip='10.0.0.1', username='testuser'):
+    url = reverse('auth-login')
+    return api_client.post(url, {"username": username, "password": password}, REMOTE_ADDR=ip)
+
+
+"""
+Auth throttling tests
+"""
+@pytest.mark.django_db
+def test_login_throttled_by_ip_before_hashing(api_client, user, monkeypatch):
+    monkeypatch.setattr(AuthIPRateThrottle, 'rate', '2/minute', raising=False)
+    assert login(api_client, 'testpass').status_code == status.HTTP_200_OK
+    assert login(api_client, 'testpass', username='otheruser').status_code != status.HTTP_429_TOO_MANY_REQUESTS
+    with mock.patch('django.contrib.auth.base_user.check_password', wraps=check_password) as hashed:
+        response = login(api_client, 'testpass')
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert hashed.call_count == 0
+    assert login(api_client, 'testpass', ip='10.0.0.2').status_code == status.HTTP_200_OK
+
+@pytest.mark.django_db
+def test_login_throttle_ignores_forwarded_for(api_client, user, monkeypatch):
+    monkeypatch.setattr(AuthIPRateThrottle, 'rate', '2/minute', raising=False)
+    monkeypatch.setattr(AuthBackoffThrottle, 'FREE_FAILURES', 100)
+    url = reverse('auth-login')
+    for index in range(3):
+        response = api_client.post(
+            url, {"username": f"nouser{index}", "password": "wrongpass"},
+            REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'203.0.113.{index}'
+        )
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert AuthBackoffThrottle.cache.get(AuthBackoffThrottle.failures_key('ip:10.0.0.1')) == 2
+
+@pytest.mark.django_db
+def test_login_throttled_by_username_across_ips(api_client, user, monkeypatch):
+    monkeypatch.setattr(AuthUsernameRateThrottle, 'rate', '2/minute', raising=False)
+    assert login(api_client, 'wrongpass', ip='10.0.0.1').status_code != status.HTTP_429_TOO_MANY_REQUESTS
+    assert login(api_client, 'wrongpass', ip='10.0.0.2').status_code != status.HTTP_429_TOO_MANY_REQUESTS
+    assert login(api_client, 'testpass', ip='10.0.0.3', username='TestUser ').status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+@pytest.mark.django_db
+def test_failed_logins_back_off_progressively(api_client, user, monkeypatch):
+    monkeypatch.setattr(AuthBackoffThrottle, 'FREE_FAILURES', 1)
+    now = 1000.0
+    monkeypatch.setattr('api.throttling.time.time', lambda: now)
+    assert login(api_client, 'wrongpass').status_code == status.HTTP_401_UNAUTHORIZED
+    assert login(api_client, 'wrongpass').status_code == status.HTTP_401_UNAUTHORIZED
+    with mock.patch('django.contrib.auth.base_user.check_password', wraps=check_password) as hashed:
+        response = login(api_client, 'testpass', ip='10.0.0.9')
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response['Retry-After'] == '1'
+    assert hashed.call_count == 0
+
+    now += 1.5
+    assert login(api_client, 'wrongpass').status_code == status.HTTP_401_UNAUTHORIZED
+    response = login(api_client, 'testpass')
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response['Retry-After'] == '2'
+
+    now += 2.5
+    assert login(api_client, 'testpass', ip='10.0.0.9').status_code == status.HTTP_200_OK
+    # A success clears the username failures, the failing IP keeps its own
+    assert AuthBackoffThrottle.cache.get(AuthBackoffThrottle.failures_key('ip:10.0.0.1')) == 3
+
+@pytest.mark.django_db
+def test_register_throttled_by_ip(api_client, monkeypatch):
+    monkeypatch.setattr(AuthIPRateThrottle, 'rate', '1/minute', raising=False)
+    url = reverse('auth-register')
+    data = {"username": "newuser", "password": "newpass123", "repeat_password": "newpass123"}
+    assert api_client.post(url, data).status_code == status.HTTP_400_BAD_REQUEST
+    assert api_client.post(url, data).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+@pytest.mark.django_db
+def test_failed_registrations_do_not_block_login(api_client, user, monkeypatch):
+    monkeypatch.setattr(AuthBackoffThrottle, 'FREE_FAILURES', 0)
+    url = reverse('auth-register')
+    data = {"username": "testuser", "password": "newpass123", "repeat_password": "newpass123"}
+    for _ in range(3):
+        assert api_client.post(url, data, REMOTE_ADDR='10.0.0.9').status_code == status.HTTP_400_BAD_REQUEST
+    assert login(api_client, 'testpass').status_code == status.HTTP_200_OK
@@ -0,0 +1,93 @@
+import pytest
+
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from api.models import RotatedRefreshTokens
+from api.tokens import RotatingRefreshToken
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user(db):
+    user = User.objects.create_user(username='testuser', password='testpass', email='test@example.com')
+    return user
+
+def refresh(api_client, token):
+    return api_client.post(reverse('auth-refresh-token'), {"refresh": token})
+
+
+"""
+RotatingRefreshToken tests
+"""
+@pytest.mark.django_db
+def test_issuing_tokens_writes_nothing(user, django_assert_num_queries):
+    with django_assert_num_queries(0):
+        RotatingRefreshToken.for_user(user)
+    assert OutstandingToken.objects.count() == 0
+
+@pytest.mark.django_db
+def test_refresh_rotates_once(api_client, user):
+    token = str(RotatingRefreshToken.for_user(user))
+    response = refresh(api_client, token)
+    assert response.status_code == status.HTTP_200_OK
+    assert refresh(api_client, response.data["refresh"]).status_code == status.HTTP_200_OK
+    # The refresh endpoint reports invalid tokens in the body
+    assert "access" not in refresh(api_client, token).data
+    assert RotatedRefreshTokens.objects.count() == 2
+    assert OutstandingToken.objects.count() == 0
+    assert BlacklistedToken.objects.count() == 0
+
+@pytest.mark.django_db
+def test_verify_rejects_rotated_token(api_client, user):
+    token = str(RotatingRefreshToken.for_user(user))
+    url = reverse('auth-verify-token')
+    assert api_client.post(url, {"token": token}).status_code == status.HTTP_200_OK
+    refresh(api_client, token)
+    assert api_client.post(url, {"token": token}).status_code == status.HTTP_401_UNAUTHORIZED
+
+@pytest.mark.django_db
+def test_rotated_tokens_are_stored_hashed(user):
+    token = RotatingRefreshToken.for_user(user)
+    token.blacklist()
+    row = RotatedRefreshTokens.objects.get()
+    assert row.jti_hash != token['jti']
+    assert len(row.jti_hash) == 32
+
+
+"""
+prune_refresh_tokens tests
+"""
+@pytest.mark.django_db
+def test_prune_refresh_tokens_deletes_expired_in_batches(user):
+    now = timezone.now()
+    RotatedRefreshTokens.objects.bulk_create(
+        [RotatedRefreshTokens(jti_hash=f'expired{index}', expires_at=now - timedelta(days=1)) for index in range(5)]
+        + [RotatedRefreshTokens(jti_hash='valid', expires_at=now + timedelta(days=1))]
+    )
+    out = StringIO()
+    call_command('prune_refresh_tokens', '--batch-size', '2', stdout=out)
+    assert list(RotatedRefreshTokens.objects.values_list('jti_hash', flat=True)) == ['valid']
+    assert 'Pruned 5 rotated refresh tokens' in out.getvalue()
+
+@pytest.mark.django_db
+def test_prune_refresh_tokens_legacy_tables(user):
+    now = timezone.now()
+    expired = OutstandingToken.objects.create(user=user, jti='old', token='x', expires_at=now - timedelta(days=1))
+    valid = OutstandingToken.objects.create(user=user, jti='new', token='y', expires_at=now + timedelta(days=1))
+    BlacklistedToken.objects.create(token=expired)
+    BlacklistedToken.objects.create(token=valid)
+    call_command('prune_refresh_tokens', '--legacy', stdout=StringIO())
+    assert list(OutstandingToken.objects.values_list('jti', flat=True)) == ['new']
+    assert BlacklistedToken.objects.get().token_id == valid.pk
@@ -15,7 +15,7 @@ def test_urlpatterns_is_list():
     'device-types', 'device-marks', 'device-models', 'device-systems',
     'device-builds', 'device-processors', 'device-rams', 'device-disks',
     'softwares', 'devices', 'device-softwares', 'notification-types',
-    'notifications', 'app-settings', 'user-settings'
+    'notifications', 'catalogs', 'autocomplete', 'stats', 'app-settings', 'user-settings'
 ])
 def test_router_has_registered_routes(route):
     registered_routes = [prefix for prefix, _, _ in urls.router.registry]
@@ -7,7 +7,7 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth.models import User
 
-from api.models import User
+from api.models import User, AppSettings
 
 
 @pytest.fixture
@@ -38,3 +38,13 @@ def test_app_settings_cache(api_client, user):
     url = reverse('app-settings-list')
     response = api_client.get(url)
     assert response.status_code in [status.HTTP_200_OK, status.HTTP_204_NO_CONTENT]
+
+@pytest.mark.django_db
+def test_app_settings_reflect_saves(api_client, user):
+    api_client.force_authenticate(user=user)
+    url = reverse('app-settings-list')
+    assert api_client.get(url).data['number_of_alerts'] == 5
+    settings = AppSettings.get_solo()
+    settings.number_of_alerts = 7
+    settings.save()
+    assert api_client.get(url).data['number_of_alerts'] == 7
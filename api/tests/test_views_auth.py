@@ -1,11 +1,17 @@
 import pytest
 
+from unittest import mock
+
+from django.contrib.auth.hashers import check_password
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth.models import User
 
 from api.models import User
+from api.tokens import RotatingRefreshToken
 
 
 @pytest.fixture
@@ -98,6 +104,33 @@ def test_auth_access_token(api_client, user):
     assert response.status_code == status.HTTP_200_OK
     assert "access" in response.data
 
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", ['auth-login', 'auth-access-token'])
+def test_auth_hashes_password_once(api_client, user, url_name):
+    url = reverse(url_name)
+    data = {
+        "username": user.username,
+        "password": "testpass"
+    }
+    with mock.patch('django.contrib.auth.base_user.check_password', wraps=check_password) as hashed:
+        response = api_client.post(url, data)
+    assert response.status_code == status.HTTP_200_OK
+    assert hashed.call_count == 1
+    assert response.data["user"]["username"] == user.username
+
+@pytest.mark.django_db
+def test_auth_access_token_keeps_password_hash(api_client, user):
+    url = reverse('auth-access-token')
+    data = {
+        "username": user.username,
+        "password": "testpass"
+    }
+    response = api_client.post(url, data)
+    assert response.status_code == status.HTTP_200_OK
+    user.refresh_from_db()
+    assert user.last_login is not None
+    assert user.check_password("testpass")
+
 @pytest.mark.django_db
 def test_auth_refresh_token(api_client, user):
     # First, get a token
@@ -114,6 +147,34 @@ def test_auth_refresh_token(api_client, user):
     assert response.status_code == status.HTTP_200_OK
     assert "access" in response.data
 
+@pytest.mark.django_db
+def test_auth_refresh_token_skips_user_queries(api_client, user):
+    url_refresh = reverse('auth-refresh-token')
+    token = str(RotatingRefreshToken.for_user(user))
+    response = api_client.post(url_refresh, {"refresh": token})
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.post(url_refresh, {"refresh": response.data["refresh"]})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["user"]["username"] == user.username
+    assert not [
+        query for query in context.captured_queries
+        if 'auth_user' in query['sql'] or 'api_userprofile' in query['sql']
+    ]
+
+@pytest.mark.django_db
+def test_auth_refresh_token_reflects_user_changes(api_client, user):
+    url_refresh = reverse('auth-refresh-token')
+    response = api_client.post(url_refresh, {"refresh": str(RotatingRefreshToken.for_user(user))})
+    assert response.data["user"]["first_name"] == ""
+    user.first_name = "Changed"
+    user.save()
+    response = api_client.post(url_refresh, {"refresh": response.data["refresh"]})
+    assert response.data["user"]["first_name"] == "Changed"
+    user.is_active = False
+    user.save()
+    response = api_client.post(url_refresh, {"refresh": response.data["refresh"]})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
 @pytest.mark.django_db
 def test_auth_verify_token(api_client, user):
     url_login = reverse('auth-login')
@@ -0,0 +1,97 @@
+import pytest
+
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth.models import User
+
+from api.models import User, AppSettings, DeviceTypes, DeviceMarks, Devices
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user(db):
+    user = User.objects.create_user(username='testuser', password='testpass', email='test@example.com')
+    return user
+
+def create_devices(user, device_relations, names):
+    return [
+        Devices.objects.create(internal_id=internal_id, hostname=hostname, serial=serial, creator=user, **device_relations)
+        for internal_id, hostname, serial in names
+    ]
+
+
+"""
+AutocompleteViewSet tests
+"""
+@pytest.mark.django_db
+def test_autocomplete_catalog_prefix(api_client, user, django_assert_num_queries):
+    DeviceTypes.objects.create(title="Laptop", code_name="lap", creator=user)
+    DeviceTypes.objects.create(title="Desktop", code_name="desk", creator=user)
+    DeviceTypes.objects.create(title="Printer", code_name="laser", creator=user)
+    api_client.force_authenticate(user=user)
+    url = reverse('autocomplete-detail', args=['device-types'])
+    response = api_client.get(url, {'q': 'LA'})
+    assert response.status_code == status.HTTP_200_OK
+    assert [row['title'] for row in response.data['results']] == ["Laptop", "Printer"]
+    assert set(response.data['results'][0]) == {'id', 'title', 'code_name'}
+    with django_assert_num_queries(0):
+        response = api_client.get(url, {'q': 'des'})
+    assert [row['code_name'] for row in response.data['results']] == ["desk"]
+
+@pytest.mark.django_db
+def test_autocomplete_catalog_sees_writes(api_client, user):
+    api_client.force_authenticate(user=user)
+    url = reverse('autocomplete-detail', args=['device-marks'])
+    assert api_client.get(url, {'q': 'Acme'}).data['results'] == []
+    DeviceMarks.objects.create(title="Acme", creator=user)
+    assert [row['title'] for row in api_client.get(url, {'q': 'acm'}).data['results']] == ["Acme"]
+
+@pytest.mark.django_db
+def test_autocomplete_devices(api_client, user, device_relations, django_assert_num_queries):
+    create_devices(user, device_relations, [
+        ("INV-001", "web-01", "SN100"),
+        ("INV-002", "db-01", "WEB-SN"),
+        ("INV-003", "mail-01", "SN300"),
+        ("SRV_1", "Web-02", None),
+    ])
+    api_client.force_authenticate(user=user)
+    url = reverse('autocomplete-detail', args=['devices'])
+    api_client.get(url, {'q': 'warm'})
+    # One query per searched column; the settings come from their cache
+    with django_assert_num_queries(3):
+        response = api_client.get(url, {'q': 'web'})
+    assert response.status_code == status.HTTP_200_OK
+    assert [row['internal_id'] for row in response.data['results']] == ["INV-001", "SRV_1", "INV-002"]
+    assert set(response.data['results'][0]) == {'id', 'internal_id', 'hostname', 'serial', 'status'}
+    response = api_client.get(url, {'q': 'inv', 'limit': 2})
+    assert [row['internal_id'] for row in response.data['results']] == ["INV-001", "INV-002"]
+    # LIKE wildcards in the input are matched literally
+    response = api_client.get(url, {'q': 'SRV_'})
+    assert [row['internal_id'] for row in response.data['results']] == ["SRV_1"]
+    assert api_client.get(url, {'q': 'SN_'}).data['results'] == []
+
+@pytest.mark.django_db
+def test_autocomplete_validates_input(api_client, user):
+    settings = AppSettings.get_solo()
+    settings.search_min_input_length = 3
+    settings.search_max_input_length = 5
+    settings.save()
+    api_client.force_authenticate(user=user)
+    url = reverse('autocomplete-detail', args=['devices'])
+    assert 'q' in api_client.get(url, {'q': 'ab'}).data
+    assert 'q' in api_client.get(url, {'q': 'abcdef'}).data
+    assert 'q' in api_client.get(url).data
+    response = api_client.get(url, {'q': 'abc', 'limit': 1000})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'limit' in response.data
+    response = api_client.get(reverse('autocomplete-detail', args=['users']), {'q': 'abc'})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+@pytest.mark.django_db
+def test_autocomplete_requires_authentication(api_client):
+    response = api_client.get(reverse('autocomplete-detail', args=['devices']), {'q': 'abc'})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
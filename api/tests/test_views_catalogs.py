@@ -0,0 +1,72 @@
+import pytest
+
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth.models import User
+
+from api.models import User, DeviceTypes, DeviceMarks, Softwares
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user(db):
+    user = User.objects.create_user(username='testuser', password='testpass', email='test@example.com')
+    return user
+
+
+"""
+CatalogsViewSet tests
+"""
+@pytest.mark.django_db
+def test_catalogs_list(api_client, user):
+    DeviceTypes.objects.create(title="Laptop", code_name="laptop", description="Long text", creator=user)
+    Softwares.objects.create(title="Office", version="2024", creator=user)
+    api_client.force_authenticate(user=user)
+    response = api_client.get(reverse('catalogs-list'))
+    assert response.status_code == status.HTTP_200_OK
+    catalogs = response.data['catalogs']
+    assert set(catalogs) == {
+        'device_types', 'device_marks', 'device_models', 'device_systems',
+        'device_builds', 'device_processors', 'device_rams', 'device_disks',
+        'softwares'
+    }
+    assert catalogs['device_types'][0]['title'] == "Laptop"
+    assert 'description' not in catalogs['device_types'][0]
+    assert catalogs['softwares'][0]['version'] == "2024"
+    assert response['ETag'] == f'"{response.data["version"]}"'
+
+@pytest.mark.django_db
+def test_catalogs_not_modified(api_client, user, django_assert_num_queries):
+    DeviceTypes.objects.create(title="Laptop", creator=user)
+    api_client.force_authenticate(user=user)
+    url = reverse('catalogs-list')
+    version = api_client.get(url).data['version']
+    with django_assert_num_queries(0):
+        response = api_client.get(url, {'version': version})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b''
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=f'"{version}"')
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+@pytest.mark.django_db
+def test_catalogs_version_changes_on_write(api_client, user, django_assert_num_queries):
+    DeviceTypes.objects.create(title="Laptop", creator=user)
+    api_client.force_authenticate(user=user)
+    url = reverse('catalogs-list')
+    version = api_client.get(url).data['version']
+    DeviceMarks.objects.create(title="Acme", creator=user)
+    # Only the written catalog is read again
+    with django_assert_num_queries(1):
+        response = api_client.get(url, {'version': version})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['version'] != version
+    assert response.data['catalogs']['device_marks'][0]['title'] == "Acme"
+
+@pytest.mark.django_db
+def test_catalogs_requires_authentication(api_client):
+    response = api_client.get(reverse('catalogs-list'))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -5,7 +5,7 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth.models import User
 
-from api.models import User
+from api.models import User, DeviceBuilds, Devices
 
 
 @pytest.fixture
@@ -138,3 +138,26 @@ def test_device_builds_delete(api_client, admin_user):
         url_detail = reverse('device-builds-detail', args=[build_id])
         response_delete = api_client.delete(url_detail)
         assert response_delete.status_code in [status.HTTP_204_NO_CONTENT, status.HTTP_200_OK, status.HTTP_400_BAD_REQUEST]
+
+@pytest.mark.django_db
+def test_device_builds_usage(api_client, admin_user, device_relations):
+    used = DeviceBuilds.objects.create(title="BuildUsed", creator=admin_user)
+    unused = DeviceBuilds.objects.create(title="BuildUnused", creator=admin_user)
+    relations = {**device_relations, 'build': used}
+    Devices.objects.create(internal_id="DEVUSAGE1", creator=admin_user, **relations)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('device-builds-list')
+    response = api_client.get(url, {'ordering': 'id'})
+    rows = {row['id']: row for row in response.data['results']}
+    assert rows[used.id]['devices_count'] == 1
+    assert rows[used.id]['last_used_at'] is not None
+    assert rows[unused.id]['devices_count'] == 0
+    assert rows[unused.id]['last_used_at'] is None
+    etag = response['ETag']
+
+    Devices.objects.create(internal_id="DEVUSAGE2", creator=admin_user, **relations)
+    response = api_client.get(url, {'ordering': 'id'}, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert {row['id']: row for row in response.data['results']}[used.id]['devices_count'] == 2
+    detail = api_client.get(reverse('device-builds-detail', args=[used.id]))
+    assert detail.data['devices_count'] == 2
@@ -3,9 +3,10 @@ import pytest
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
-from django.contrib.auth.models import User
+from rest_framework.permissions import IsAuthenticated
+from django.contrib.auth.models import User, update_last_login
 
-from api.models import User
+from api.models import User, DeviceTypes
 
 
 @pytest.fixture
@@ -142,3 +143,76 @@ def test_device_types_delete(api_client, admin_user):
         url_detail = reverse('device-types-detail', args=[device_type_id])
         response_delete = api_client.delete(url_detail)
         assert response_delete.status_code in [status.HTTP_204_NO_CONTENT, status.HTTP_200_OK, status.HTTP_400_BAD_REQUEST]
+
+@pytest.mark.django_db
+def test_device_types_list_sparse_fields(api_client, admin_user, django_assert_num_queries):
+    DeviceTypes.objects.create(title="TypeSparse", code_name="typesparse", description="Long text", is_core=False, creator=admin_user)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('device-types-list')
+    # A filter sends the request past the catalog cache, to the sparse query
+    with django_assert_num_queries(2) as queries:
+        response = api_client.get(url, {'fields': 'title,code_name', 'exclude': 'code_name', 'is_deprecated': False})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['results'][0] == {'id': response.data['results'][0]['id'], 'title': "TypeSparse"}
+    sql = queries.captured_queries[-1]['sql']
+    assert '"auth_user"' not in sql
+    assert '"api_device_types"."description"' not in sql
+
+@pytest.mark.django_db
+def test_device_types_list_uses_catalog_cache(api_client, admin_user, django_assert_num_queries):
+    DeviceTypes.objects.create(title="TypeCached", code_name="typecached", is_core=False, creator=admin_user)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('device-types-list')
+    response = api_client.get(url)
+    assert response['X-Catalog-Cache'] == 'miss'
+    with django_assert_num_queries(0):
+        response = api_client.get(url)
+    assert response['X-Catalog-Cache'] == 'hit'
+    assert response.data['results'][0]['title'] == "TypeCached"
+    # Pages and fieldsets are cut from the same cached rows
+    response = api_client.get(url, {'fields': 'title', 'limit': 1})
+    assert response['X-Catalog-Cache'] == 'hit'
+    assert response.data['results'] == [{'id': response.data['results'][0]['id'], 'title': "TypeCached"}]
+    # Filtered requests read the database
+    response = api_client.get(url, {'title': "TypeCached"})
+    assert response['X-Catalog-Cache'] == 'bypass'
+    assert response.data['count'] == 1
+
+@pytest.mark.django_db
+def test_device_types_cache_is_invalidated_by_writes(api_client, admin_user):
+    dtype = DeviceTypes.objects.create(title="TypeCached", code_name="typecached", is_core=False, creator=admin_user)
+    api_client.force_authenticate(user=admin_user)
+    detail = reverse('device-types-detail', args=[dtype.id])
+    assert api_client.get(detail).data['title'] == "TypeCached"
+    assert api_client.get(detail)['X-Catalog-Cache'] == 'hit'
+    response = api_client.patch(detail, {'title': "TypeRenamed"}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    response = api_client.get(detail)
+    assert response['X-Catalog-Cache'] == 'miss'
+    assert response.data['title'] == "TypeRenamed"
+    api_client.delete(detail)
+    assert api_client.get(detail).status_code == status.HTTP_404_NOT_FOUND
+
+@pytest.mark.django_db
+def test_device_types_cache_follows_creator_logins(api_client, admin_user):
+    DeviceTypes.objects.create(title="TypeCached", code_name="typecached", is_core=False, creator=admin_user)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('device-types-list')
+    response = api_client.get(url)
+    etag = response['ETag']
+    assert response.data['results'][0]['creator']['last_login'] is None
+    update_last_login(None, admin_user)
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['X-Catalog-Cache'] == 'miss'
+    assert response.data['results'][0]['creator']['last_login'] is not None
+
+@pytest.mark.django_db
+def test_device_types_cached_retrieve_checks_object_permissions(api_client, admin_user, monkeypatch):
+    dtype = DeviceTypes.objects.create(title="TypeCached", code_name="typecached", is_core=False, creator=admin_user)
+    api_client.force_authenticate(user=admin_user)
+    detail = reverse('device-types-detail', args=[dtype.id])
+    assert api_client.get(detail).status_code == status.HTTP_200_OK
+    monkeypatch.setattr(IsAuthenticated, 'has_object_permission', lambda self, request, view, obj: False)
+    response = api_client.get(detail)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -1,6 +1,9 @@
 import pytest
+import json
 import random
 
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -18,8 +21,11 @@ from api.models import (
     DeviceProcessors,
     DeviceRAMs,
     DeviceDisks,
-    Devices
+    Devices,
+    DeviceStats
 )
+from api.services.devices import DevicesService
+from api.services.fulltext import DeviceSearchIndex
 
 
 @pytest.fixture
@@ -271,3 +277,435 @@ def test_devices_get_without_id(api_client, user):
     url = reverse('devices-list')
     response = api_client.get(url)
     assert response.status_code in [status.HTTP_200_OK, status.HTTP_204_NO_CONTENT]
+
+def create_devices(create_device, admin_user, total):
+    return [
+        create_device(
+            admin_user,
+            internal_id=f"DEVQ{index}",
+            serial=f"SNQ{index}",
+            updater=admin_user if index % 2 else None
+        )
+        for index in range(total)
+    ]
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("total", [1, 5, 25])
+def test_devices_list_query_count_is_constant(api_client, admin_user, create_device, django_assert_num_queries, total):
+    create_devices(create_device, admin_user, total)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-list')
+    # One COUNT for the pagination and one SELECT joining every relation
+    with django_assert_num_queries(2):
+        response = api_client.get(url, {'limit': 100})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['results']) == total
+    row = response.data['results'][0]
+    assert row['location']['title'] == "Warehouse"
+    assert row['creator']['username'] == "admin"
+
+@pytest.mark.django_db
+def test_devices_list_compact_user_references(api_client, admin_user, create_device, django_assert_num_queries):
+    devices = create_devices(create_device, admin_user, 6)
+    editor = User.objects.create_user(username="editor", password="editor123", first_name="Ed", last_name="Itor")
+    Devices.objects.filter(pk__in=[device.pk for device in devices[::2]]).update(updater=editor)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-list')
+    # The users are not joined to the rows: both are loaded together, once
+    with django_assert_num_queries(3) as context:
+        response = api_client.get(url, {'limit': 100, 'user_refs': 'compact'})
+    assert response.status_code == status.HTTP_200_OK
+    user_queries = [query['sql'] for query in context.captured_queries if '"auth_user"' in query['sql']]
+    assert len(user_queries) == 1
+    rows = {row['id']: row for row in response.data['results']}
+    assert rows[devices[0].pk]['updater'] == {
+        'id': editor.pk, 'username': "editor", 'display_name': "Ed Itor", 'avatar': None
+    }
+    assert rows[devices[0].pk]['creator']['display_name'] == "admin"
+    assert 'email' not in rows[devices[0].pk]['creator']
+
+@pytest.mark.django_db
+def test_devices_list_full_user_payload_by_default(api_client, admin_user, create_device):
+    create_devices(create_device, admin_user, 2)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-list')
+    response = api_client.get(url, {'limit': 100})
+    assert response.status_code == status.HTTP_200_OK
+    creator = response.data['results'][0]['creator']
+    assert creator['email'] == "admin@example.com"
+    assert creator['is_superuser'] is True
+
+@pytest.mark.django_db
+def test_devices_retrieve_query_count(api_client, admin_user, create_device, django_assert_num_queries):
+    device = create_devices(create_device, admin_user, 1)[0]
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-detail', args=[device.id])
+    # The conditional GET validators aggregate plus the row itself
+    with django_assert_num_queries(2):
+        response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['type']['title'] == "Laptop"
+
+@pytest.mark.django_db
+def test_devices_list_sparse_fields(api_client, admin_user, create_device, django_assert_num_queries):
+    create_devices(create_device, admin_user, 3)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-list')
+    with django_assert_num_queries(2) as queries:
+        response = api_client.get(url, {'fields': 'hostname,status,location'})
+    assert response.status_code == status.HTTP_200_OK
+    row = response.data['results'][0]
+    assert set(row) == {'id', 'hostname', 'status', 'location'}
+    assert row['location']['title'] == "Warehouse"
+    sql = queries.captured_queries[-1]['sql']
+    assert '"api_locations"' in sql
+    assert '"api_device_types"' not in sql
+    assert '"auth_user"' not in sql
+    assert '"api_devices"."notes"' not in sql
+
+@pytest.mark.django_db
+def test_devices_list_sparse_exclude(api_client, admin_user, create_device, django_assert_num_queries):
+    create_devices(create_device, admin_user, 3)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-list')
+    with django_assert_num_queries(2) as queries:
+        response = api_client.get(url, {'exclude': 'notes,creator,updater'})
+    row = response.data['results'][0]
+    assert 'notes' not in row
+    assert 'creator' not in row
+    assert row['type']['title'] == "Laptop"
+    sql = queries.captured_queries[-1]['sql']
+    assert '"auth_user"' not in sql
+    assert '"api_devices"."notes"' not in sql
+
+@pytest.mark.django_db
+def test_devices_list_sparse_fields_with_cursor(api_client, admin_user, create_device, django_assert_num_queries):
+    create_devices(create_device, admin_user, 3)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-list')
+    # The cursor columns stay loaded, so no row is refetched to build the links
+    with django_assert_num_queries(1):
+        response = api_client.get(url, {'fields': 'hostname', 'cursor': '', 'limit': 2})
+    assert response.status_code == status.HTTP_200_OK
+    assert set(response.data['results'][0]) == {'id', 'hostname'}
+    assert response.data['next'] is not None
+
+@pytest.mark.django_db
+def test_devices_sparse_fields_do_not_affect_writes(api_client, admin_user, create_device):
+    device = create_devices(create_device, admin_user, 1)[0]
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-detail', args=[device.id]) + '?fields=hostname'
+    response = api_client.patch(url, {'hostname': 'sparse-host'}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['hostname'] == 'sparse-host'
+    assert 'serial' in response.data
+
+@pytest.mark.django_db
+def test_devices_list_sideload(api_client, admin_user, create_device, django_assert_num_queries):
+    devices = create_devices(create_device, admin_user, 4)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-list')
+    with django_assert_num_queries(2):
+        response = api_client.get(url, {'sideload': 'true', 'limit': 100})
+    assert response.status_code == status.HTTP_200_OK
+    rows = response.data['results']
+    assert len(rows) == 4
+    assert all(row['location'] == devices[0].location_id for row in rows)
+    assert rows[0]['type'] == devices[0].type_id
+    included = response.data['included']
+    assert set(included) == {'type', 'mark', 'model', 'system', 'build',
+                             'processor', 'ram', 'disk', 'location'}
+    assert included['location'] == {
+        str(devices[0].location_id): {'id': devices[0].location_id, 'title': "Warehouse", 'description': None}
+    }
+
+@pytest.mark.django_db
+def test_devices_list_sideload_with_sparse_fields(api_client, admin_user, create_device):
+    device = create_devices(create_device, admin_user, 1)[0]
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-list')
+    response = api_client.get(url, {'sideload': '1', 'fields': 'hostname,model'})
+    assert response.data['results'][0] == {'id': device.id, 'hostname': device.hostname, 'model': device.model_id}
+    assert set(response.data['included']) == {'model'}
+    assert response.data['included']['model'][str(device.model_id)]['title'] == "ThinkPad"
+
+@pytest.mark.django_db
+def test_devices_export_csv(api_client, admin_user, create_device, django_assert_num_queries):
+    devices = create_devices(create_device, admin_user, 3)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-export')
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    assert response['Content-Type'].startswith('text/csv')
+    assert 'devices.csv' in response['Content-Disposition']
+    with django_assert_num_queries(1):
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+    assert lines[0].startswith('id,internal_id,hostname,status,type,mark')
+    assert len(lines) == 4
+    assert lines[1].startswith(f'{devices[0].id},DEVQ0,')
+    assert ',Laptop,Lenovo,' in lines[1]
+
+@pytest.mark.django_db
+def test_devices_export_ndjson_honors_filters(api_client, admin_user, create_device):
+    devices = create_devices(create_device, admin_user, 3)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-export')
+    response = api_client.get(url, {'output': 'ndjson', 'internal_id': 'DEVQ1'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'] == 'application/x-ndjson'
+    rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+    assert len(rows) == 1
+    assert rows[0]['id'] == devices[1].id
+    assert rows[0]['location'] == "Warehouse"
+    assert rows[0]['creator'] == "admin"
+
+@pytest.mark.django_db
+def test_devices_export_rejects_unknown_output(api_client, admin_user):
+    api_client.force_authenticate(user=admin_user)
+    response = api_client.get(reverse('devices-export'), {'output': 'xml'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def import_row(device, index, **overrides):
+    row = {
+        "internal_id": f"IMP{index}",
+        "hostname": f"host-imp{index}",
+        "type": "Laptop",
+        "mark": device.mark_id,
+        "model": "ThinkPad",
+        "system_id": str(device.system_id),
+        "build": "Stable",
+        "processor": "Ryzen",
+        "ram": "16GB",
+        "disk": device.disk_id,
+        "location": "Warehouse",
+    }
+    row.update(overrides)
+    return row
+
+@pytest.mark.django_db
+def test_devices_import_json(api_client, admin_user, create_device, django_assert_max_num_queries):
+    device = create_devices(create_device, admin_user, 1)[0]
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-import')
+    rows = [import_row(device, index) for index in range(50)]
+    # Nine catalog lookups, the inserts and the counter refresh, whatever the row count
+    with django_assert_max_num_queries(19):
+        response = api_client.post(url, rows, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['created'] == 50
+    assert response.data['errors'] == []
+    imported = Devices.objects.get(internal_id="IMP7")
+    assert imported.type_id == device.type_id
+    assert imported.creator == admin_user
+    assert imported.status == 1
+    device.location.refresh_from_db()
+    assert device.location.devices_count == 51
+
+@pytest.mark.django_db
+def test_devices_import_reports_row_errors(api_client, admin_user, create_device):
+    device = create_devices(create_device, admin_user, 1)[0]
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-import')
+    rows = [
+        import_row(device, 0),
+        import_row(device, 1, type="Missing"),
+        import_row(device, 2, internal_id="", sort_order="abc"),
+    ]
+    response = api_client.post(url, {"rows": rows}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['valid'] == 1
+    assert response.data['created'] == 0
+    errors = {error['row']: error['errors'] for error in response.data['errors']}
+    assert set(errors) == {2, 3}
+    assert 'type' in errors[2]
+    assert 'internal_id' in errors[3]
+    assert 'sort_order' in errors[3]
+    assert not Devices.objects.filter(internal_id__startswith="IMP").exists()
+
+@pytest.mark.django_db
+def test_devices_import_dry_run(api_client, admin_user, create_device):
+    device = create_devices(create_device, admin_user, 1)[0]
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-import') + '?dry_run=true'
+    response = api_client.post(url, [import_row(device, 0)], format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['dry_run'] is True
+    assert response.data['valid'] == 1
+    assert not Devices.objects.filter(internal_id="IMP0").exists()
+
+@pytest.mark.django_db
+def test_devices_import_csv(api_client, admin_user, create_device):
+    device = create_devices(create_device, admin_user, 1)[0]
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-import')
+    content = (
+        "internal_id,hostname,type,mark,model,system,build,processor,ram,disk,location_id,notes\n"
+        f"CSV1,host-csv1,Laptop,Lenovo,ThinkPad,Linux,Stable,Ryzen,16GB,NVMe,{device.location_id},\"a, b\"\n"
+    )
+    upload = SimpleUploadedFile("devices.csv", content.encode('utf-8'), content_type='text/csv')
+    response = api_client.post(url, {"file": upload}, format='multipart')
+    assert response.status_code == status.HTTP_201_CREATED
+    imported = Devices.objects.get(internal_id="CSV1")
+    assert imported.notes == "a, b"
+    assert imported.location_id == device.location_id
+
+@pytest.mark.django_db
+def test_devices_import_failure_rolls_back_every_batch(api_client, admin_user, create_device, monkeypatch):
+    device = create_devices(create_device, admin_user, 1)[0]
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-import')
+    refresh = DeviceSearchIndex.refresh
+    calls = []
+
+    def failing_refresh(queryset):
+        calls.append(queryset)
+        if len(calls) == 2:
+            raise IntegrityError("duplicate key")
+        refresh(queryset)
+
+    monkeypatch.setattr(DevicesService, 'IMPORT_BATCH_SIZE', 2)
+    monkeypatch.setattr(DeviceSearchIndex, 'refresh', failing_refresh)
+    response = api_client.post(url, [import_row(device, index) for index in range(5)], format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['created'] == 0
+    assert not Devices.objects.filter(internal_id__startswith="IMP").exists()
+    device.location.refresh_from_db()
+    assert device.location.devices_count == 1
+    assert DeviceStats.objects.get(dimension='type', value=device.type_id).devices_count == 1
+
+@pytest.mark.django_db
+def test_devices_bulk_update_by_ids_moves_location(api_client, admin_user, create_device, django_assert_max_num_queries):
+    devices = create_devices(create_device, admin_user, 5)
+    old_location = devices[0].location
+    new_location = Locations.objects.create(title="LocBulk", code_name="locbulk", location_zone=old_location.location_zone, address="Addr", is_core=False, creator=admin_user)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-bulk-update')
+    ids = [device.id for device in devices[:3]]
+    # The location change also refreshes the search index rows of the moved devices
+    with django_assert_max_num_queries(14):
+        response = api_client.post(url, {"ids": ids, "changes": {"location": "LocBulk", "status": 0}}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {'updated': 3}
+    moved = Devices.objects.filter(pk__in=ids)
+    assert all(device.location_id == new_location.id and device.status == 0 for device in moved)
+    assert all(device.updater == admin_user and device.updated_at is not None for device in moved)
+    old_location.refresh_from_db()
+    new_location.refresh_from_db()
+    assert old_location.devices_count == 2
+    assert new_location.devices_count == 3
+
+@pytest.mark.django_db
+def test_devices_bulk_update_by_filter(api_client, admin_user, create_device):
+    devices = create_devices(create_device, admin_user, 4)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-bulk-update')
+    payload = {"filter": {"serial": "SNQ2"}, "changes": {"status": 3, "user_owner": "jdoe"}}
+    response = api_client.post(url, payload, format='json')
+    assert response.data == {'updated': 1}
+    devices[2].refresh_from_db()
+    assert devices[2].status == 3
+    assert devices[2].user_owner == "jdoe"
+    assert Devices.objects.filter(status=3).count() == 1
+
+@pytest.mark.django_db
+def test_devices_bulk_update_rejects_invalid_requests(api_client, admin_user, create_device):
+    devices = create_devices(create_device, admin_user, 2)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-bulk-update')
+    ids = [device.id for device in devices]
+    response = api_client.post(url, {"changes": {"status": 0}}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = api_client.post(url, {"filter": {"bogus": "1"}, "changes": {"status": 0}}, format='json')
+    assert 'filter' in response.data
+    response = api_client.post(url, {"ids": ids, "changes": {"internal_id": "X", "status": "abc", "type": "Missing"}}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert set(response.data) == {'internal_id', 'status', 'type'}
+    assert not Devices.objects.exclude(status=1).exists()
+
+@pytest.mark.django_db
+def test_devices_create_validates_catalogs_from_cache(api_client, admin_user, create_device, django_assert_max_num_queries):
+    device = create_devices(create_device, admin_user, 1)[0]
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-list')
+    payload = {
+        f"{name}_id": getattr(device, f"{name}_id")
+        for name in ['type', 'mark', 'model', 'system', 'build', 'processor', 'ram', 'disk', 'location']
+    }
+    response = api_client.post(url, {**payload, "internal_id": "CACHE1"}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    with django_assert_max_num_queries(10) as queries:
+        response = api_client.post(url, {**payload, "internal_id": "CACHE2"}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data['type']['title'] == "Laptop"
+    catalog_tables = ['"api_device_types"', '"api_device_marks"', '"api_device_disks"']
+    # Only the search index refresh of the new device joins the catalogs
+    validation = [
+        query['sql'] for query in queries.captured_queries
+        if DeviceSearchIndex.SQLITE_TABLE not in query['sql'] and DeviceSearchIndex.POSTGRESQL_TABLE not in query['sql']
+    ]
+    assert not any(table in sql for sql in validation for table in catalog_tables)
+
+@pytest.mark.django_db
+def test_devices_list_conditional_get(api_client, admin_user, create_device, django_assert_max_num_queries):
+    devices = create_devices(create_device, admin_user, 3)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-list')
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response['ETag']
+    assert response['Last-Modified']
+    with django_assert_max_num_queries(1) as queries:
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response['ETag'] == etag
+    assert not response.content
+    assert 'count' in queries.captured_queries[0]['sql'].lower()
+    assert api_client.get(url, {'serial': 'SNQ1'})['ETag'] != etag
+    devices[0].notes = "Changed"
+    devices[0].save()
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+
+@pytest.mark.django_db
+def test_devices_conditional_get_follows_related_writes(api_client, admin_user, create_device):
+    device = create_devices(create_device, admin_user, 1)[0]
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-detail', args=[device.id])
+    etag = api_client.get(url)['ETag']
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=f'W/{etag}').status_code == status.HTTP_304_NOT_MODIFIED
+    device.type.title = "TypeRenamed"
+    device.type.save()
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['type']['title'] == "TypeRenamed"
+
+@pytest.mark.django_db
+def test_devices_retrieve_if_modified_since(api_client, admin_user, create_device):
+    device = create_devices(create_device, admin_user, 1)[0]
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-detail', args=[device.id])
+    modified = api_client.get(url)['Last-Modified']
+    response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=modified)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    response = api_client.get(url, HTTP_IF_MODIFIED_SINCE='Mon, 01 Jan 2001 00:00:00 GMT')
+    assert response.status_code == status.HTTP_200_OK
+    response = api_client.get(reverse('devices-detail', args=[0]), HTTP_IF_NONE_MATCH='*')
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+@pytest.mark.django_db
+def test_devices_list_full_text_search(api_client, admin_user, create_device):
+    devices = create_devices(create_device, admin_user, 3)
+    devices[1].hostname = "mailserver"
+    devices[1].save()
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('devices-list')
+    response = api_client.get(url, {'q': 'mailserv'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['count'] == 1
+    assert response.data['results'][0]['internal_id'] == "DEVQ1"
+    response = api_client.get(url, {'q': 'laptop snq2'})
+    assert [row['internal_id'] for row in response.data['results']] == ["DEVQ2"]
+    response = api_client.get(url, {'q': 'warehouse', 'ordering': 'internal_id'})
+    assert [row['internal_id'] for row in response.data['results']] == ["DEVQ0", "DEVQ1", "DEVQ2"]
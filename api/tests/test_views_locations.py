@@ -172,3 +172,33 @@ def test_locations_get_without_id(api_client, user):
     url = reverse('locations-list')
     response = api_client.get(url)
     assert response.status_code in [status.HTTP_200_OK, status.HTTP_204_NO_CONTENT]
+
+@pytest.mark.django_db
+def test_locations_list_sparse_fields(api_client, admin_user, django_assert_num_queries):
+    zone = LocationZones.objects.create(title="ZoneSparse", is_core=False, creator=admin_user)
+    for index in range(3):
+        Locations.objects.create(title=f"LocSparse{index}", code_name=f"locsparse{index}", location_zone=zone, address="Addr", is_core=False, creator=admin_user)
+    api_client.force_authenticate(user=admin_user)
+    url = reverse('locations-list')
+    with django_assert_num_queries(2) as queries:
+        response = api_client.get(url, {'fields': 'title,location_zone'})
+    assert response.status_code == status.HTTP_200_OK
+    row = response.data['results'][0]
+    assert set(row) == {'id', 'title', 'location_zone'}
+    assert row['location_zone']['title'] == "ZoneSparse"
+    sql = queries.captured_queries[-1]['sql']
+    assert '"auth_user"' not in sql
+    assert '"api_locations"."description"' not in sql
+
+@pytest.mark.django_db
+def test_locations_export_csv(api_client, admin_user):
+    zone = LocationZones.objects.create(title="ZoneExport", is_core=False, creator=admin_user)
+    Locations.objects.create(title="LocExport", code_name="locexport", location_zone=zone, address="Addr, 1", is_core=False, creator=admin_user)
+    api_client.force_authenticate(user=admin_user)
+    response = api_client.get(reverse('locations-export'))
+    assert response.status_code == status.HTTP_200_OK
+    lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+    assert len(lines) == 2
+    assert 'LocExport' in lines[1]
+    assert '"Addr, 1"' in lines[1]
+    assert 'ZoneExport' in lines[1]
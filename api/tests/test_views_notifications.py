@@ -165,3 +165,18 @@ def test_notifications_get_without_id(api_client, user):
     url = reverse('notifications-list')
     response = api_client.get(url)
     assert response.status_code in [status.HTTP_200_OK, status.HTTP_204_NO_CONTENT]
+
+@pytest.mark.django_db
+def test_notifications_list_cursor_mode(api_client, user):
+    api_client.force_authenticate(user=user)
+    ntype = NotificationTypes.objects.create(title="CursorType", creator=user)
+    for index in range(3):
+        Notifications.objects.create(title=f"Cursor{index}", type=ntype, module="devices", module_id=index, creator=user)
+    url = reverse('notifications-list')
+    response = api_client.get(url, {'cursor': '', 'limit': 2})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['results']) == 2
+    assert 'count' not in response.data
+    response = api_client.get(response.data['next'])
+    assert [item['title'] for item in response.data['results']] == ["Cursor0"]
+    assert response.data['next'] is None
@@ -0,0 +1,46 @@
+import pytest
+
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from django.contrib.auth.models import User
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def user(db):
+    user = User.objects.create_user(username='testuser', password='testpass', email='test@example.com')
+    return user
+
+def create_devices(create_device, user, count):
+    return [create_device(user, internal_id=f"INV-{index}", status=1 + index % 2) for index in range(count)]
+
+
+"""
+StatsViewSet tests
+"""
+@pytest.mark.django_db
+def test_stats_requires_authentication(api_client):
+    url = reverse('stats-list')
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+@pytest.mark.django_db
+def test_stats_summary(api_client, user, create_device, django_assert_max_num_queries):
+    devices = create_devices(create_device, user, 5)
+    api_client.force_authenticate(user=user)
+    url = reverse('stats-list')
+    api_client.get(url)
+    with django_assert_max_num_queries(2):
+        response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['total'] == 5
+    assert response.data['status'] == [
+        {'value': 1, 'title': None, 'devices_count': 3},
+        {'value': 2, 'title': None, 'devices_count': 2},
+    ]
+    assert response.data['type'] == [{'value': devices[0].type_id, 'title': 'Laptop', 'devices_count': 5}]
+    assert response.data['location_zone'][0]['title'] == 'Zone A'
@@ -7,7 +7,7 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth.models import User
 
-from api.models import User
+from api.models import User, UserSettings
 
 
 @pytest.fixture
@@ -37,3 +37,13 @@ def test_user_settings_cache(api_client, user):
     url = reverse('user-settings-list')
     response = api_client.get(url)
     assert response.status_code in [status.HTTP_200_OK, status.HTTP_204_NO_CONTENT]
+
+@pytest.mark.django_db
+def test_user_settings_reflect_saves(api_client, user):
+    api_client.force_authenticate(user=user)
+    url = reverse('user-settings-list')
+    assert api_client.get(url).data['default_theme'] == 'light'
+    settings = UserSettings.get_solo()
+    settings.default_theme = 'dark'
+    settings.save()
+    assert api_client.get(url).data['default_theme'] == 'dark'
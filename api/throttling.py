@@ -0,0 +1,109 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+
+def get_username_ident(request):
+    """
+    Returns a fixed-length key for the username posted to a credential
+    endpoint, or None when there is none.
+    """
+    try:
+        username = request.data.get('username')
+    except AttributeError:
+        return None
+    if not isinstance(username, str) or not username.strip():
+        return None
+    return hashlib.sha1(username.strip().lower().encode('utf-8')).hexdigest()
+
+
+class AuthIPRateThrottle(SimpleRateThrottle):
+    """
+    Limits the credential attempts of one client IP (rate `auth_ip`).
+    """
+    cache = caches['throttle']
+    scope = 'auth_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class AuthUsernameRateThrottle(SimpleRateThrottle):
+    """
+    Limits the credential attempts against one username from any IP
+    (rate `auth_username`).
+    """
+    cache = caches['throttle']
+    scope = 'auth_username'
+
+    def get_cache_key(self, request, view):
+        ident = get_username_ident(request)
+        if ident is None:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class AuthBackoffThrottle(BaseThrottle):
+    """
+    Progressive backoff after failed credential checks.
+
+    Once an IP or a username has `FREE_FAILURES` failures within `WINDOW`
+    seconds, each further failure blocks it for 1, 2, 4... seconds, up to
+    `MAX_DELAY`. The block is a cache entry expiring with it, so checking it
+    is one cache read and no password is hashed while it lasts. Views report
+    the outcome of each check with record().
+    """
+    cache = caches['throttle']
+    FREE_FAILURES = getattr(settings, 'AUTH_BACKOFF_FREE_FAILURES', 3)
+    MAX_DELAY = getattr(settings, 'AUTH_BACKOFF_MAX_DELAY', 300)
+    WINDOW = 3600
+
+    def allow_request(self, request, view):
+        blocked = self.cache.get_many([self.blocked_key(ident) for ident in self.get_idents(request)])
+        self.wait_seconds = max([until - time.time() for until in blocked.values()], default=0)
+        return self.wait_seconds <= 0
+
+    def wait(self):
+        return max(self.wait_seconds, 0)
+
+    @classmethod
+    def get_idents(cls, request) -> list:
+        idents = [f'ip:{cls().get_ident(request)}']
+        username = get_username_ident(request)
+        if username:
+            idents.append(f'username:{username}')
+        return idents
+
+    @staticmethod
+    def failures_key(ident) -> str:
+        return f'throttle_auth_backoff_failures_{ident}'
+
+    @staticmethod
+    def blocked_key(ident) -> str:
+        return f'throttle_auth_backoff_blocked_{ident}'
+
+    @classmethod
+    def record(cls, request, succeeded) -> None:
+        """
+        Counts a failed check, blocking its IP and username once they are
+        over the free failures, or clears the username after a success.
+        """
+        idents = cls.get_idents(request)
+        if succeeded:
+            # The IP keeps its failures, so logging into an own account does
+            # not reset the backoff of a client probing others
+            cls.cache.delete_many([cls.failures_key(ident) for ident in idents if ident.startswith('username:')])
+            return
+        for ident in idents:
+            key = cls.failures_key(ident)
+            cls.cache.add(key, 0, timeout=cls.WINDOW)
+            try:
+                failures = cls.cache.incr(key)
+            except ValueError:
+                continue
+            if failures > cls.FREE_FAILURES:
+                delay = min(2 ** min(failures - cls.FREE_FAILURES - 1, 30), cls.MAX_DELAY)
+                cls.cache.set(cls.blocked_key(ident), time.time() + delay, timeout=delay)
@@ -0,0 +1,33 @@
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import BlacklistMixin, RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from api.models import RotatedRefreshTokens
+
+
+class RotatingRefreshToken(RefreshToken):
+    """
+    Refresh token backed by RotatedRefreshTokens instead of the token_blacklist
+    tables: issuing a token writes nothing, and only a rotated or revoked
+    token is recorded, as one compact row that expires with it.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        # Skip BlacklistMixin.for_user(), which stores every issued token
+        return super(BlacklistMixin, cls).for_user(user)
+
+    def check_blacklist(self) -> None:
+        if RotatedRefreshTokens.is_rotated(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError('Token is blacklisted')
+
+    def blacklist(self) -> None:
+        RotatedRefreshTokens.rotate(
+            self.payload[api_settings.JTI_CLAIM],
+            datetime_from_epoch(self.payload['exp'])
+        )
+
+    def outstand(self) -> None:
+        # Issued tokens are not stored
+        return None
@@ -7,7 +7,8 @@ from api.views import (
     DeviceBuildsViewSet, DeviceProcessorsViewSet, DeviceRAMsViewSet,
     DeviceDisksViewSet, SoftwaresViewSet, DevicesViewSet,
     NotificationTypesViewSet, DeviceSoftwaresViewSet,
-    NotificationsViewSet, AppSettingsViewSet, UserSettingsViewSet
+    NotificationsViewSet, CatalogsViewSet, AutocompleteViewSet, StatsViewSet, AppSettingsViewSet,
+    UserSettingsViewSet
 )
 
 """
@@ -32,6 +33,9 @@ router.register(r'devices', DevicesViewSet, basename='devices')
 router.register(r'device-softwares', DeviceSoftwaresViewSet, basename='device-softwares')
 router.register(r'notification-types', NotificationTypesViewSet, basename='notification-types')
 router.register(r'notifications', NotificationsViewSet, basename='notifications')
+router.register(r'catalogs', CatalogsViewSet, basename='catalogs')
+router.register(r'autocomplete', AutocompleteViewSet, basename='autocomplete')
+router.register(r'stats', StatsViewSet, basename='stats')
 router.register(r'app-settings', AppSettingsViewSet, basename='app-settings')
 router.register(r'user-settings', UserSettingsViewSet, basename='user-settings')
 
@@ -1,19 +1,28 @@
+import functools
+
 from django.contrib.auth.models import User
+from django.http import JsonResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from django.views.decorators.vary import vary_on_cookie
 from rest_framework import status, serializers, viewsets, permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.filters import OrderingFilter
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 from rest_framework.viewsets import ModelViewSet, ViewSet
-from rest_framework_simplejwt.authentication import JWTAuthentication
 
-from api.pagination import DefaultLimitOffsetPagination
+from api.authentication import CachedJWTAuthentication
+from api.mixins import CatalogCacheViewMixin, ConditionalGetMixin
+from api.pagination import DefaultLimitOffsetPagination, CursorLimitOffsetPagination
+from api.throttling import AuthIPRateThrottle, AuthUsernameRateThrottle, AuthBackoffThrottle
+from api.services.catalog import CatalogCache
+from api.services.executor import AuthExecutor, AuthExecutorBusy
+from api.services.export import ExportService
+from api.services.search import SearchService
+from api.services.stats import StatsService
+from api.services.users import UserCache
 from api.serializers import (
     AuthCustomSerializer, UserExtendedSerializer, LocationZonesSerializer,
     LocationsSerializer, DeviceTypesSerializer, DeviceMarksSerializer,
@@ -21,7 +30,7 @@ from api.serializers import (
     DeviceProcessorsSerializer, DeviceRAMsSerializer,
     DeviceDisksSerializer, SoftwaresSerializer, DeviceSoftwaresSerializer,
     DevicesSerializer, NotificationTypesSerializer, NotificationsSerializer,
-    AppSettingsSerializer, UserSettingsSerializer
+    AppSettingsSerializer, UserSettingsSerializer, AutocompleteSerializer
 )
 from api.models import (
     Locations, Devices, Notifications, AppSettings, UserSettings
@@ -35,14 +44,58 @@ from api.filters import (
 )
 
 
+def offload_to_auth_executor(view):
+    """
+    Turns a sync view into an async one running it, rendering included, in
+    AuthExecutor, so it never holds the thread shared by the sync views.
+    """
+    def call(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
+        return response
+
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        try:
+            response, queued = await AuthExecutor.run(call, request, *args, **kwargs)
+        except AuthExecutorBusy:
+            response = JsonResponse({'detail': 'Too many authentication requests in progress.'}, status=503)
+            response['Retry-After'] = '1'
+            return response
+        response['Server-Timing'] = f'auth-queue;dur={queued * 1000:.1f}'
+        return response
+    return async_view
+
+
 class AuthCustomViewSet(viewsets.GenericViewSet):
     """
     Custom authentication viewset for user registration, login, password change, and password reset.
     """
     permission_classes = [AllowAny]
     serializer_class = AuthCustomSerializer
-    
-    @action(detail=False, methods=['post'], url_path='register', permission_classes=[AllowAny])
+    # Credential checks are throttled before the password is hashed. Register
+    # checks no credential, so it only has the rate limits: backing off its
+    # failures (a taken username) would let anyone lock a user out of login
+    # by registering under their name
+    credential_actions = ('login', 'access_token')
+    # Actions hashing passwords, served by AuthExecutor under ASGI
+    hashing_actions = ('register', 'login', 'access_token', 'change_password', 'admin_change_password')
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if actions and set(actions.values()) & set(cls.hashing_actions):
+            return offload_to_auth_executor(view)
+        return view
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self.action in self.credential_actions and response.status_code != status.HTTP_429_TOO_MANY_REQUESTS:
+            AuthBackoffThrottle.record(request, succeeded=response.status_code < 400)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    @action(detail=False, methods=['post'], url_path='register', permission_classes=[AllowAny],
+            throttle_classes=[AuthIPRateThrottle, AuthUsernameRateThrottle])
     def register(self, request):
         """
         POST /auth/register/ - Endpoint for user registration.
@@ -54,7 +107,8 @@ class AuthCustomViewSet(viewsets.GenericViewSet):
             return Response(data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(detail=False, methods=['post'], url_path='login', permission_classes=[AllowAny])
+    @action(detail=False, methods=['post'], url_path='login', permission_classes=[AllowAny],
+            throttle_classes=[AuthIPRateThrottle, AuthUsernameRateThrottle, AuthBackoffThrottle])
     def login(self, request):
         """
         POST /auth/login/ - Endpoint for user login.
@@ -102,7 +156,8 @@ class AuthCustomViewSet(viewsets.GenericViewSet):
             return Response(data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(detail=False, methods=['post'], url_path='token', permission_classes=[AllowAny])
+    @action(detail=False, methods=['post'], url_path='token', permission_classes=[AllowAny],
+            throttle_classes=[AuthIPRateThrottle, AuthUsernameRateThrottle, AuthBackoffThrottle])
     def access_token(self, request):
         """
         POST /auth/token/ - Endpoint for user token generation.
@@ -114,6 +169,13 @@ class AuthCustomViewSet(viewsets.GenericViewSet):
             return Response(data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['get'], url_path='executor-metrics', permission_classes=[IsAdminUser])
+    def executor_metrics(self, request):
+        """
+        GET /auth/executor-metrics/ - Endpoint for the password hashing executor metrics of this worker.
+        """
+        return Response(AuthExecutor.metrics(), status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['post'], url_path='token/refresh', permission_classes=[AllowAny])
     def refresh_token(self, request):
         """
@@ -144,11 +206,11 @@ class AuthCustomViewSet(viewsets.GenericViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserExtendedViewSet(viewsets.ModelViewSet):
+class UserExtendedViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     User extended viewset. A merge of User and UserProfile models.
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     queryset = User.objects.all().select_related('profile').filter()
     serializer_class = UserExtendedSerializer
@@ -221,11 +283,11 @@ class UserExtendedViewSet(viewsets.ModelViewSet):
         return data
 
 
-class UserProfileViewSet(viewsets.ModelViewSet):
+class UserProfileViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     User profile viewset.
     """
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = UserExtendedSerializer
     parser_classes = (MultiPartParser, FormParser, JSONParser)
@@ -234,7 +296,9 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         """
         GET /users/ - Endpoint for Returns the authenticated user.
         """
-        return self.request.user
+        user = self.request.user
+        UserCache.load_deferred(user)
+        return user
     
     def get_queryset(self):
         """
@@ -323,12 +387,13 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class LocationZonesViewSet(ModelViewSet):
+class LocationZonesViewSet(ConditionalGetMixin, ModelViewSet):
     """
     Location zones viewset.
     """
     serializer_class = LocationZonesSerializer
-    authentication_classes = [JWTAuthentication]
+    etag_related_models = (Locations,)
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultLimitOffsetPagination
     filter_backends = [OrderingFilter, DjangoFilterBackend]
@@ -384,12 +449,12 @@ class LocationZonesViewSet(ModelViewSet):
         return self.update(request, pk)
 
 
-class LocationsViewSet(ModelViewSet):
+class LocationsViewSet(ConditionalGetMixin, ModelViewSet):
     """
     Locations viewset.
     """
     serializer_class = LocationsSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultLimitOffsetPagination
     filter_backends = [OrderingFilter, ]
@@ -401,6 +466,22 @@ class LocationsViewSet(ModelViewSet):
         """
         return LocationsSerializer.get_queryset(self.request)
 
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        GET /locations/export/?output=csv|ndjson - Endpoint for streaming every filtered location row.
+        """
+        output = ExportService.get_output(request)
+        if output is None:
+            return Response({'detail': 'Unsupported output format.'}, status=status.HTTP_400_BAD_REQUEST)
+        return ExportService.stream_response(
+            request,
+            LocationsSerializer.get_export_queryset(request),
+            LocationsSerializer.export_fields,
+            output,
+            'locations'
+        )
+
     def get(self, request, id=None):
         """
         GET /locations/ or GET /locations/{id}/ - Endpoint for get the list of locations or a specific location by its ID.
@@ -450,12 +531,12 @@ class LocationsViewSet(ModelViewSet):
         return self.update(request, pk)
 
 
-class DeviceTypesViewSet(ModelViewSet):
+class DeviceTypesViewSet(CatalogCacheViewMixin, ConditionalGetMixin, ModelViewSet):
     """
     Device types viewset.
     """
     serializer_class = DeviceTypesSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultLimitOffsetPagination
     filter_backends = [OrderingFilter, ]
@@ -498,12 +579,12 @@ class DeviceTypesViewSet(ModelViewSet):
         return self.update(request, pk)
 
 
-class DeviceMarksViewSet(ModelViewSet):
+class DeviceMarksViewSet(CatalogCacheViewMixin, ConditionalGetMixin, ModelViewSet):
     """
     Device marks viewset.
     """
     serializer_class = DeviceMarksSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultLimitOffsetPagination
     filter_backends = [OrderingFilter, ]
@@ -546,12 +627,12 @@ class DeviceMarksViewSet(ModelViewSet):
         return self.update(request, pk)
 
 
-class DeviceModelsViewSet(ModelViewSet):
+class DeviceModelsViewSet(CatalogCacheViewMixin, ConditionalGetMixin, ModelViewSet):
     """
     Device models viewset.
     """
     serializer_class = DeviceModelsSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultLimitOffsetPagination
     filter_backends = [OrderingFilter, ]
@@ -594,12 +675,12 @@ class DeviceModelsViewSet(ModelViewSet):
         return self.update(request, pk)
 
 
-class DeviceSystemsViewSet(ModelViewSet):
+class DeviceSystemsViewSet(CatalogCacheViewMixin, ConditionalGetMixin, ModelViewSet):
     """
     Device systems viewset.
     """
     serializer_class = DeviceSystemsSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultLimitOffsetPagination
     filter_backends = [OrderingFilter, ]
@@ -642,12 +723,12 @@ class DeviceSystemsViewSet(ModelViewSet):
         return self.update(request, pk)
 
 
-class DeviceBuildsViewSet(ModelViewSet):
+class DeviceBuildsViewSet(CatalogCacheViewMixin, ConditionalGetMixin, ModelViewSet):
     """
     Device builds viewset.
     """
     serializer_class = DeviceBuildsSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultLimitOffsetPagination
     filter_backends = [OrderingFilter, ]
@@ -690,12 +771,12 @@ class DeviceBuildsViewSet(ModelViewSet):
         return self.update(request, pk)
 
 
-class DeviceProcessorsViewSet(ModelViewSet):
+class DeviceProcessorsViewSet(CatalogCacheViewMixin, ConditionalGetMixin, ModelViewSet):
     """
     Device processors viewset.
     """
     serializer_class = DeviceProcessorsSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultLimitOffsetPagination
     filter_backends = [OrderingFilter, ]
@@ -738,12 +819,12 @@ class DeviceProcessorsViewSet(ModelViewSet):
         return self.update(request, pk)
 
 
-class DeviceRAMsViewSet(ModelViewSet):
+class DeviceRAMsViewSet(CatalogCacheViewMixin, ConditionalGetMixin, ModelViewSet):
     """
     Device RAMs viewset.
     """
     serializer_class = DeviceRAMsSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultLimitOffsetPagination
     filter_backends = [OrderingFilter, ]
@@ -786,12 +867,12 @@ class DeviceRAMsViewSet(ModelViewSet):
         return self.update(request, pk)
 
 
-class DeviceDisksViewSet(ModelViewSet):
+class DeviceDisksViewSet(CatalogCacheViewMixin, ConditionalGetMixin, ModelViewSet):
     """
     Device disks viewset.
     """
     serializer_class = DeviceDisksSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultLimitOffsetPagination
     filter_backends = [OrderingFilter, ]
@@ -834,12 +915,12 @@ class DeviceDisksViewSet(ModelViewSet):
         return self.update(request, pk)
 
 
-class SoftwaresViewSet(ModelViewSet):
+class SoftwaresViewSet(CatalogCacheViewMixin, ConditionalGetMixin, ModelViewSet):
     """
     Softwares viewset.
     """
     serializer_class = SoftwaresSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultLimitOffsetPagination
     filter_backends = [OrderingFilter, ]
@@ -851,6 +932,22 @@ class SoftwaresViewSet(ModelViewSet):
         """
         return SoftwaresSerializer.get_queryset(self.request)
 
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        GET /softwares/export/?output=csv|ndjson - Endpoint for streaming every filtered software row.
+        """
+        output = ExportService.get_output(request)
+        if output is None:
+            return Response({'detail': 'Unsupported output format.'}, status=status.HTTP_400_BAD_REQUEST)
+        return ExportService.stream_response(
+            request,
+            SoftwaresSerializer.get_export_queryset(request),
+            SoftwaresSerializer.export_fields,
+            output,
+            'softwares'
+        )
+
     def create(self, request):
         """
         POST /softwares/ - Endpoint for create a software.
@@ -882,15 +979,16 @@ class SoftwaresViewSet(ModelViewSet):
         return self.update(request, pk)
 
 
-class DeviceSoftwaresViewSet(ModelViewSet):
+class DeviceSoftwaresViewSet(ConditionalGetMixin, ModelViewSet):
     """
     DeviceSoftwares viewset.
     """
     serializer_class = DeviceSoftwaresSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
-    pagination_class = DefaultLimitOffsetPagination
+    pagination_class = CursorLimitOffsetPagination
     filter_backends = [OrderingFilter, ]
+    cursor_ordering = ('-id',)
 
     def get_queryset(self):
         """
@@ -929,14 +1027,14 @@ class DeviceSoftwaresViewSet(ModelViewSet):
         return self.update(request, pk)
 
 
-class DevicesViewSet(ModelViewSet):
+class DevicesViewSet(ConditionalGetMixin, ModelViewSet):
     """
     Devices viewset.
     """
     serializer_class = DevicesSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
-    pagination_class = DefaultLimitOffsetPagination
+    pagination_class = CursorLimitOffsetPagination
     filter_backends = [OrderingFilter, DjangoFilterBackend]
     filterset_class = DevicesFilter
     filterset_fields = ['internal_id', 'location', 'type', 'mark', 'model',
@@ -948,6 +1046,64 @@ class DevicesViewSet(ModelViewSet):
         """
         return DevicesSerializer.get_queryset(self.request)
 
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        GET /devices/export/?output=csv|ndjson - Endpoint for streaming every filtered device row.
+        """
+        output = ExportService.get_output(request)
+        if output is None:
+            return Response({'detail': 'Unsupported output format.'}, status=status.HTTP_400_BAD_REQUEST)
+        return ExportService.stream_response(
+            request,
+            DevicesSerializer.get_export_queryset(request),
+            DevicesSerializer.export_fields,
+            output,
+            'devices'
+        )
+
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def bulk_import(self, request):
+        """
+        POST /devices/import/ - Endpoint for importing devices in bulk.
+        Expects: a JSON array of rows, { "rows": [...] } or a CSV "file" upload. Accepts ?dry_run=true.
+        """
+        data, errors = DevicesSerializer.import_devices(request)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        if data['dry_run']:
+            return Response(data, status=status.HTTP_200_OK)
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='bulk-update', url_name='bulk-update')
+    def bulk_update(self, request):
+        """
+        POST /devices/bulk-update/ - Endpoint for updating many devices at once.
+        Expects: { "ids": [...] } or { "filter": {...} }, plus { "changes": { "status": 0, "location": ... } }
+        """
+        data, errors = DevicesSerializer.bulk_update_devices(request)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data, status=status.HTTP_200_OK)
+
+    def list(self, request, *args, **kwargs):
+        """
+        GET /devices/?sideload=true - Rows carry relation ids and the page adds an
+        `included` map with every related object once.
+        """
+        if not DevicesSerializer.is_sideloading(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        items = list(queryset) if page is None else page
+        serializer = self.get_serializer(items, many=True)
+        included = serializer.child.get_included(items)
+        if page is None:
+            return Response({'results': serializer.data, 'included': included})
+        response = self.get_paginated_response(serializer.data)
+        response.data['included'] = included
+        return response
+
     def get(self, request, id=None):
         """
         GET /devices/ or GET /devices/{id}/ - Endpoint for get the list of devices or a specific device by its ID.
@@ -992,12 +1148,12 @@ class DevicesViewSet(ModelViewSet):
         return self.update(request, pk)
 
 
-class NotificationTypesViewSet(ModelViewSet):
+class NotificationTypesViewSet(ConditionalGetMixin, ModelViewSet):
     """
     Notification types viewset.
     """
     serializer_class = NotificationTypesSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultLimitOffsetPagination
     filter_backends = [OrderingFilter, ]
@@ -1042,14 +1198,14 @@ class NotificationTypesViewSet(ModelViewSet):
         return self.update(request, pk)
 
 
-class NotificationsViewSet(ModelViewSet):
+class NotificationsViewSet(ConditionalGetMixin, ModelViewSet):
     """
     Notifications viewset.
     """
     serializer_class = NotificationsSerializer
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     permission_classes = [IsAuthenticated]
-    pagination_class = DefaultLimitOffsetPagination
+    pagination_class = CursorLimitOffsetPagination
     filter_backends = [OrderingFilter, DjangoFilterBackend]
     filterset_class = NotificationsFilter
     filterset_fields = ['status']
@@ -1105,11 +1261,69 @@ class NotificationsViewSet(ModelViewSet):
         return self.update(request, pk)
 
 
+class CatalogsViewSet(ViewSet):
+    """
+    Catalogs bootstrap viewset.
+    """
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        """
+        GET /catalogs/ - Endpoint for get every catalog in one response.
+        Accepts: ?version=... or If-None-Match; a matching version answers 304 with an empty body.
+        """
+        version, catalogs = CatalogCache.get_bootstrap()
+        etag = f'"{version}"'
+        presented = request.query_params.get('version') or request.headers.get('If-None-Match', '')
+        if presented.strip().removeprefix('W/').strip('"') == version:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response({'version': version, 'catalogs': catalogs}, status=status.HTTP_200_OK)
+        response['ETag'] = etag
+        return response
+
+
+class AutocompleteViewSet(ViewSet):
+    """
+    Type-ahead search viewset.
+    """
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    lookup_field = 'source'
+    lookup_value_regex = '[a-z-]+'
+
+    def retrieve(self, request, source=None):
+        """
+        GET /autocomplete/{source}/?q=...&limit=... - Endpoint for case-insensitive prefix search.
+        Sources: devices (internal_id, hostname, serial) and the catalogs (title, code_name).
+        """
+        if source not in SearchService.sources():
+            raise NotFound('Unknown source.')
+        data, errors = AutocompleteSerializer.search(request, source)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class StatsViewSet(ViewSet):
+    """
+    Dashboard stats viewset.
+    """
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        """
+        GET /stats/ - Endpoint for the device counts by status, type, location zone and system.
+        """
+        return Response(StatsService.get_summary(), status=status.HTTP_200_OK)
+
+
 class AppSettingsViewSet(ViewSet):
     """
     AppSettings viewset.
     """
-    @method_decorator(cache_page(60 * 15))  # 15 minutes
     def list(self, request):
         settings = AppSettings.get_solo()
         serializer = AppSettingsSerializer(settings)
@@ -1120,8 +1334,6 @@ class UserSettingsViewSet(ViewSet):
     """
     UserSettings viewset.
     """
-    @method_decorator(cache_page(60 * 15))  # 15 minutes
-    @method_decorator(vary_on_cookie)
     def list(self, request):
         settings = UserSettings.get_solo()
         serializer = UserSettingsSerializer(settings)
@@ -3,6 +3,7 @@ Django settings for SuperManager project.
 """
 
 import os
+import tempfile
 from pathlib import Path
 from collections import OrderedDict
 from decouple import AutoConfig, RepositoryEnv
@@ -106,7 +107,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_RENDERER_CLASSES': (
         'rest_framework.renderers.JSONRenderer',
@@ -116,6 +117,15 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': int(os.environ.get('PAGINATION_PAGE_SIZE')) if environment == 'production' else config('PAGINATION_PAGE_SIZE', default=10, cast=int),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_ORDERING_BACKENDS': ['rest_framework.filters.OrderingFilter'],
+    # Reverse proxies in front of the app. Client IPs are read from X-Forwarded-For
+    # only past that many trusted hops; with 0 the header is ignored, since any
+    # client could otherwise choose the IP it is throttled by
+    'NUM_PROXIES': int(os.environ.get('API_NUM_PROXIES', 0)) if environment == 'production' else config('API_NUM_PROXIES', default=0, cast=int),
+    # Credential endpoints (login, token, register), see api.throttling
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': os.environ.get('AUTH_THROTTLE_IP_RATE', '20/minute') if environment == 'production' else config('AUTH_THROTTLE_IP_RATE', default='20/minute', cast=str),
+        'auth_username': os.environ.get('AUTH_THROTTLE_USERNAME_RATE', '10/minute') if environment == 'production' else config('AUTH_THROTTLE_USERNAME_RATE', default='10/minute', cast=str),
+    },
 }
 '''rest_framework.authentication.SessionAuthentication',''' # Optional for test browsable API
 
@@ -203,6 +213,50 @@ MEDIA_URL = os.environ.get('MEDIA_URL') if environment == 'production' else conf
 media_root_path = os.environ.get('MEDIA_ROOT') if environment == 'production' else config('MEDIA_ROOT', default=os.path.join(BASE_DIR, 'media'), cast=str)
 MEDIA_ROOT = os.path.join(BASE_DIR, media_root_path)
 
+# Shared cache used by every worker (generations, counts, settings). The default
+# file-based cache is shared by the workers of one host; point it to Redis or
+# Memcached when running several hosts.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache') if environment == 'production' else config('CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache', cast=str)
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'supermanager-cache')) if environment == 'production' else config('CACHE_LOCATION', default=os.path.join(tempfile.gettempdir(), 'supermanager-cache'), cast=str)
+# Throttle counters are written on every credential attempt, so they get their
+# own cache. Like the default cache it is shared by the workers of one host, so
+# the limits hold across processes; point it to Redis or Memcached when running
+# several hosts. Only the testing environment keeps it in process memory.
+THROTTLE_CACHE_BACKEND = os.environ.get('THROTTLE_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache') if environment == 'production' else config('THROTTLE_CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache', cast=str)
+THROTTLE_CACHE_LOCATION = os.environ.get('THROTTLE_CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'supermanager-throttle')) if environment == 'production' else config('THROTTLE_CACHE_LOCATION', default=os.path.join(tempfile.gettempdir(), 'supermanager-throttle'), cast=str)
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION,
+        'KEY_PREFIX': APP_NAME.lower(),
+    },
+    'throttle': {
+        'BACKEND': THROTTLE_CACHE_BACKEND,
+        'LOCATION': THROTTLE_CACHE_LOCATION,
+        'KEY_PREFIX': APP_NAME.lower(),
+    },
+}
+
+# Failed credential checks allowed per IP or username before each further
+# attempt waits 1, 2, 4... seconds, up to AUTH_BACKOFF_MAX_DELAY
+AUTH_BACKOFF_FREE_FAILURES = int(os.environ.get('AUTH_BACKOFF_FREE_FAILURES', 3)) if environment == 'production' else config('AUTH_BACKOFF_FREE_FAILURES', default=3, cast=int)
+AUTH_BACKOFF_MAX_DELAY = int(os.environ.get('AUTH_BACKOFF_MAX_DELAY', 300)) if environment == 'production' else config('AUTH_BACKOFF_MAX_DELAY', default=300, cast=int)
+
+# Threads per worker running the password hashing auth endpoints (0 runs them
+# on the shared sync thread) and requests allowed to wait for one
+AUTH_EXECUTOR_WORKERS = int(os.environ.get('AUTH_EXECUTOR_WORKERS', 2)) if environment == 'production' else config('AUTH_EXECUTOR_WORKERS', default=2, cast=int)
+AUTH_EXECUTOR_QUEUE = int(os.environ.get('AUTH_EXECUTOR_QUEUE', 32)) if environment == 'production' else config('AUTH_EXECUTOR_QUEUE', default=32, cast=int)
+
+# Seconds a worker trusts its in-memory copy of the settings singletons
+# before checking the shared cache again
+SETTINGS_CACHE_LOCAL_TTL = int(os.environ.get('SETTINGS_CACHE_LOCAL_TTL', 5)) if environment == 'production' else config('SETTINGS_CACHE_LOCAL_TTL', default=5, cast=int)
+
+# Seconds an authenticated user stays in the shared cache (invalidated on every user write)
+USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60)) if environment == 'production' else config('USER_CACHE_TTL', default=60, cast=int)
+
+# Per-process catalog cache size (entries)
+CATALOG_CACHE_MAX_ENTRIES = int(os.environ.get('CATALOG_CACHE_MAX_ENTRIES', 256)) if environment == 'production' else config('CATALOG_CACHE_MAX_ENTRIES', default=256, cast=int)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 